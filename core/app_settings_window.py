@@ -13,12 +13,24 @@ from pathlib import Path
 
 from PySide6.QtWidgets import (
     QWidget, QVBoxLayout, QCheckBox, QPushButton, 
-    QLabel, QGroupBox, QMessageBox, QHBoxLayout, QTextEdit
+    QLabel, QGroupBox, QMessageBox, QHBoxLayout, QPlainTextEdit, QComboBox,
+    QTableWidget, QTableWidgetItem, QHeaderView, QSpinBox
 )
-from PySide6.QtCore import Qt, QObject, Signal
-from PySide6.QtGui import QColor, QPalette, QTextCursor
+from PySide6.QtCore import Qt, QTimer
+from PySide6.QtGui import QColor, QPalette
 
 from core.version import APP_VERSION, REPO_OWNER, REPO_NAME
+from core.log_service import get_log_service, LEVELS
+from core.perf_stats import PAINT_STATS, TimerWakeups, collect_counters
+from core.stall_watchdog import get_stall_watchdog, DEFAULT_THRESHOLD_MS, MIN_THRESHOLD_MS
+from core.tracing import get_tracer
+from core.profiling import get_profiler, PROFILE_DEFAULT_S
+
+# Консоль DevTools: сколько строк держать и как часто подтягивать новые
+CONSOLE_MAX_LINES = 2000
+CONSOLE_FLUSH_MS = 250
+# Как часто обновлять панель производительности
+PERF_REFRESH_MS = 1000
 
 class UpdateWindows(QWidget):
     """
@@ -47,37 +59,6 @@ class UpdateWindows(QWidget):
 
 
 
-# === Класс для перехвата логов ===
-class LogStream(QObject):
-    """
-    Перехватывает stdout/stderr.
-    1. Пишет в реальную консоль (print работает как обычно).
-    2. Отправляет сигнал с текстом для отображения в GUI.
-    """
-    append_log = Signal(str)
-
-    def __init__(self):
-        super().__init__()
-        # Сохраняем оригинальный поток вывода (консоль)
-        self.terminal = sys.stdout
-
-    def write(self, message):
-        # 1. Пишем в реальную консоль (чтобы лог был виден в терминале)
-        try:
-            self.terminal.write(message)
-            self.terminal.flush()
-        except Exception:
-            pass
-        
-        # 2. Отправляем в GUI
-        self.append_log.emit(str(message))
-
-    def flush(self):
-        try:
-            self.terminal.flush()
-        except Exception:
-            pass
-
 # ==========================================
 # Окно инструментов разработчика (DevTools)
 # ==========================================
@@ -89,6 +70,9 @@ class Dev_menu(QWidget):
         self.resize(700, 500)
         self._init_ui()
         self._init_logger()
+        self._init_perf()
+        self._init_watchdog()
+        self._init_profiler()
 
     def _init_ui(self):
         layout = QVBoxLayout(self)
@@ -107,6 +91,10 @@ class Dev_menu(QWidget):
         btn_cache = QPushButton("Сброс кэша")
         btn_cache.clicked.connect(self._clear_cache)
         tools_layout.addWidget(btn_cache)
+
+        btn_delete_all = QPushButton("Удалить все виджеты")
+        btn_delete_all.clicked.connect(self._delete_all_widgets)
+        tools_layout.addWidget(btn_delete_all)
         
         # 3. Тест ошибки
         btn_crash = QPushButton("Simulate Error")
@@ -130,13 +118,114 @@ class Dev_menu(QWidget):
         grp_exp.setLayout(v_exp)
         layout.addWidget(grp_exp)
 
+        # --- Производительность ---
+        grp_perf = QGroupBox("Производительность")
+        v_perf = QVBoxLayout(grp_perf)
+        perf_opts = QHBoxLayout()
+        self.cb_perf = QCheckBox("Собирать статистику")
+        self.cb_perf.toggled.connect(self._toggle_perf)
+        perf_opts.addWidget(self.cb_perf)
+        self.cb_perf_overlay = QCheckBox("FPS на виджетах")
+        self.cb_perf_overlay.setChecked(PAINT_STATS.overlay)
+        self.cb_perf_overlay.toggled.connect(self._toggle_perf_overlay)
+        perf_opts.addWidget(self.cb_perf_overlay)
+        perf_opts.addStretch()
+        # Трасса для Perfetto: отрисовка, таймеры, сохранение конфига, .wgt, сеть
+        self.tracer = get_tracer()
+        self.btn_trace = QPushButton("● Запись трассы")
+        self.btn_trace.setCheckable(True)
+        self.btn_trace.setChecked(self.tracer.enabled)
+        self.btn_trace.toggled.connect(self._toggle_trace)
+        self.tracer.recording_changed.connect(self._on_trace_recording_changed)
+        perf_opts.addWidget(self.btn_trace)
+        btn_trace_save = QPushButton("Сохранить трассу")
+        btn_trace_save.clicked.connect(lambda: self.tracer.save())
+        perf_opts.addWidget(btn_trace_save)
+        v_perf.addLayout(perf_opts)
+
+        self.perf_table = QTableWidget(0, 6)
+        self.perf_table.setHorizontalHeaderLabels(["Виджет", "Тип", "Кадров", "p50, мс", "p99, мс", "FPS"])
+        self.perf_table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeToContents)
+        self.perf_table.horizontalHeader().setStretchLastSection(True)
+        self.perf_table.verticalHeader().setVisible(False)
+        self.perf_table.setEditTriggers(QTableWidget.NoEditTriggers)
+        self.perf_table.setMaximumHeight(160)
+        v_perf.addWidget(self.perf_table)
+        self.perf_label = QLabel()
+        self.perf_label.setStyleSheet("font-family: Consolas, 'Courier New', monospace; font-size: 11px;")
+        self.perf_label.setTextInteractionFlags(Qt.TextSelectableByMouse)
+        v_perf.addWidget(self.perf_label)
+        layout.addWidget(grp_perf)
+
+        # --- Зависания цикла событий ---
+        grp_stall = QGroupBox("Зависания интерфейса")
+        v_stall = QVBoxLayout(grp_stall)
+        stall_opts = QHBoxLayout()
+        self.cb_watchdog = QCheckBox("Следить")
+        stall_opts.addWidget(self.cb_watchdog)
+        stall_opts.addWidget(QLabel("Порог, мс:"))
+        self.sb_stall = QSpinBox()
+        self.sb_stall.setRange(MIN_THRESHOLD_MS, 10000)
+        self.sb_stall.setSingleStep(50)
+        stall_opts.addWidget(self.sb_stall)
+        stall_opts.addStretch()
+        self.stall_label = QLabel()
+        stall_opts.addWidget(self.stall_label)
+        v_stall.addLayout(stall_opts)
+
+        self.stall_table = QTableWidget(0, 3)
+        self.stall_table.setHorizontalHeaderLabels(["Время", "мс", "Где (наведите — стек)"])
+        self.stall_table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeToContents)
+        self.stall_table.horizontalHeader().setStretchLastSection(True)
+        self.stall_table.verticalHeader().setVisible(False)
+        self.stall_table.setEditTriggers(QTableWidget.NoEditTriggers)
+        self.stall_table.setMaximumHeight(120)
+        v_stall.addWidget(self.stall_table)
+        layout.addWidget(grp_stall)
+
+        # --- Профилирование (cProfile / tracemalloc) ---
+        grp_prof = QGroupBox("Профилирование")
+        h_prof = QHBoxLayout(grp_prof)
+        h_prof.addWidget(QLabel("Окно, с:"))
+        self.sb_profile = QSpinBox()
+        self.sb_profile.setRange(0, 3600)
+        self.sb_profile.setValue(PROFILE_DEFAULT_S)
+        self.sb_profile.setToolTip("0 — до повторного нажатия")
+        h_prof.addWidget(self.sb_profile)
+        self.btn_cpu = QPushButton("CPU (cProfile)")
+        self.btn_cpu.setCheckable(True)
+        h_prof.addWidget(self.btn_cpu)
+        self.btn_mem = QPushButton("Память (tracemalloc)")
+        self.btn_mem.setCheckable(True)
+        h_prof.addWidget(self.btn_mem)
+        self.btn_snapshot = QPushButton("Снимок памяти")
+        h_prof.addWidget(self.btn_snapshot)
+        btn_open_profiles = QPushButton("📂")
+        btn_open_profiles.setToolTip("Открыть папку с отчетами")
+        btn_open_profiles.clicked.connect(self._open_profiles_folder)
+        h_prof.addWidget(btn_open_profiles)
+        h_prof.addStretch()
+        layout.addWidget(grp_prof)
+
         # --- Консоль логов ---
-        layout.addWidget(QLabel("Live Console Output:"))
-        self.log_view = QTextEdit()
+        log_header = QHBoxLayout()
+        log_header.addWidget(QLabel("Live Console Output:"))
+        log_header.addStretch()
+        log_header.addWidget(QLabel("Уровень:"))
+        self.level_combo = QComboBox()
+        self.level_combo.addItems(list(LEVELS))
+        self.level_combo.setCurrentText("INFO")
+        self.level_combo.currentTextChanged.connect(self._on_level_changed)
+        log_header.addWidget(self.level_combo)
+        layout.addLayout(log_header)
+
+        self.log_view = QPlainTextEdit()
         self.log_view.setReadOnly(True)
-        self.log_view.setLineWrapMode(QTextEdit.NoWrap)
+        self.log_view.setLineWrapMode(QPlainTextEdit.NoWrap)
+        # Старые строки удаляются сами — память консоли не растет
+        self.log_view.setMaximumBlockCount(CONSOLE_MAX_LINES)
         self.log_view.setStyleSheet("""
-            QTextEdit {
+            QPlainTextEdit {
                 background-color: #0e0e0e; 
                 color: #00ff00; 
                 font-family: Consolas, 'Courier New', monospace;
@@ -151,25 +240,187 @@ class Dev_menu(QWidget):
         layout.addWidget(btn_close)
 
     def _init_logger(self):
-        # Перехватываем stdout только если это еще не сделано
-        if not hasattr(sys.stdout, "append_log"):
-            self.stream = LogStream()
-            sys.stdout = self.stream
-            sys.stderr = self.stream 
+        # stdout/stderr перехватывает LogService (обычно уже в main.py)
+        self.log_service = get_log_service()
+        self.log_service.install()
+        self._log_seq = 0
+        self._log_level = LEVELS[self.level_combo.currentText()]
+
+        # Новые строки забираем пачкой несколько раз в секунду, а не по сигналу на каждый print
+        self.log_timer = QTimer(self)
+        self.log_timer.setInterval(CONSOLE_FLUSH_MS)
+        self.log_timer.timeout.connect(self._flush_log)
+
+    def _init_perf(self):
+        self.wakeups = TimerWakeups()
+        self.perf_timer = QTimer(self)
+        self.perf_timer.setInterval(PERF_REFRESH_MS)
+        self.perf_timer.timeout.connect(self._refresh_perf)
+
+    def _init_watchdog(self):
+        self.watchdog = get_stall_watchdog()
+        self.cb_watchdog.setChecked(self.watchdog.running)
+        self.cb_watchdog.toggled.connect(self._toggle_watchdog)
+        self.sb_stall.setValue(self.wm.get_global_setting("stall_threshold_ms", DEFAULT_THRESHOLD_MS))
+        self.sb_stall.valueChanged.connect(self._set_stall_threshold)
+        for stall in self.watchdog.history:
+            self._add_stall_row(stall)
+        self._update_stall_summary()
+        self.watchdog.stall_detected.connect(self._on_stall)
+
+    def _toggle_watchdog(self, checked):
+        self.wm.set_global_setting("stall_watchdog", checked)
+        if checked:
+            self.watchdog.start()
         else:
-            self.stream = sys.stdout
-            
-        # FIX: Убрали disconnect, так как при создании окна сигнал всегда чист.
-        # Это убирает RuntimeWarning.
-        self.stream.append_log.connect(self._append_log_safe)
-
-    def _append_log_safe(self, text):
-        """Безопасное добавление текста в консоль."""
-        cursor = self.log_view.textCursor()
-        cursor.movePosition(QTextCursor.MoveOperation.End)
-        cursor.insertText(text)
-        self.log_view.setTextCursor(cursor)
-        self.log_view.ensureCursorVisible()
+            self.watchdog.stop()
+
+    def _set_stall_threshold(self, value):
+        self.wm.set_global_setting("stall_threshold_ms", value)
+        self.watchdog.set_threshold(value)
+
+    def _on_stall(self, stall):
+        self._add_stall_row(stall)
+        self._update_stall_summary()
+
+    def _add_stall_row(self, stall):
+        # Новые сверху, старше HISTORY_SIZE не держим — как и сам сторож
+        self.stall_table.insertRow(0)
+        cells = [time.strftime("%H:%M:%S", time.localtime(stall["started"])),
+                 f"{stall['duration_ms']:.0f}", stall["location"]]
+        for col, text in enumerate(cells):
+            item = QTableWidgetItem(text)
+            item.setToolTip(stall["stack"])
+            self.stall_table.setItem(0, col, item)
+        if self.stall_table.rowCount() > self.watchdog.history.maxlen:
+            self.stall_table.removeRow(self.stall_table.rowCount() - 1)
+
+    def _update_stall_summary(self):
+        s = self.watchdog.stats
+        self.stall_label.setText(f"Всего: {s['count']}, суммарно {s['total_ms'] / 1000:.1f} с, максимум {s['max_ms']:.0f} мс")
+
+    def _init_profiler(self):
+        self.profiler = get_profiler()
+        self.btn_cpu.toggled.connect(self._toggle_cpu_profile)
+        self.btn_mem.toggled.connect(self._toggle_memory_profile)
+        self.btn_snapshot.clicked.connect(self.profiler.snapshot_memory)
+        # Окно CPU-профиля закончилось само или запуск был из CHRONODASH_PROFILE
+        self.profiler.state_changed.connect(self._sync_profiler_buttons)
+        self._sync_profiler_buttons()
+
+    def _sync_profiler_buttons(self):
+        for btn, running in ((self.btn_cpu, self.profiler.cpu_running), (self.btn_mem, self.profiler.memory_running)):
+            btn.blockSignals(True)
+            btn.setChecked(running)
+            btn.blockSignals(False)
+        self.btn_snapshot.setEnabled(self.profiler.memory_running)
+
+    def _toggle_cpu_profile(self, checked):
+        if checked:
+            self.profiler.start_cpu(self.sb_profile.value() or None)
+        else:
+            self.profiler.stop_cpu()
+        self._sync_profiler_buttons()
+
+    def _toggle_memory_profile(self, checked):
+        if checked:
+            self.profiler.start_memory()
+        else:
+            self.profiler.stop_memory()
+        self._sync_profiler_buttons()
+
+    def _open_profiles_folder(self):
+        path = self.profiler.profile_dir
+        path.mkdir(parents=True, exist_ok=True)
+        try:
+            if platform.system() == "Windows":
+                os.startfile(str(path))
+            elif platform.system() == "Linux":
+                subprocess.Popen(["xdg-open", str(path)])
+        except Exception as e:
+            print(f"[DEV] Error opening folder: {e}")
+
+    def showEvent(self, event):
+        self._flush_log()
+        self.log_timer.start()
+        if self.cb_perf.isChecked():
+            self._toggle_perf(True)
+        super().showEvent(event)
+
+    def hideEvent(self, event):
+        # Скрытая консоль ничего не делает, строки ждут в кольцевом буфере
+        self.log_timer.stop()
+        # Статистика нужна, только пока на нее смотрят (оверлей на виджетах — отдельно)
+        self.perf_timer.stop()
+        self.wakeups.stop()
+        PAINT_STATS.enabled = False
+        super().hideEvent(event)
+
+    def _toggle_perf(self, checked):
+        PAINT_STATS.enabled = checked
+        if checked:
+            self.wakeups.start()
+            self.perf_timer.start()
+            self._refresh_perf()
+        else:
+            self.wakeups.stop()
+            self.perf_timer.stop()
+
+    def _toggle_trace(self, checked):
+        if checked:
+            self.tracer.start()
+        else:
+            self.tracer.stop()
+
+    def _on_trace_recording_changed(self, recording):
+        # Запись могли переключить сигналом SIGUSR2
+        self.btn_trace.blockSignals(True)
+        self.btn_trace.setChecked(recording)
+        self.btn_trace.blockSignals(False)
+
+    def _toggle_perf_overlay(self, checked):
+        PAINT_STATS.overlay = checked
+        for w in self.wm.widgets.values():
+            w.update()
+
+    def _refresh_perf(self):
+        PAINT_STATS.retain(self.wm.widgets)
+        rows = []
+        for wid, w in self.wm.widgets.items():
+            s = PAINT_STATS.summary(wid)
+            rows.append((w.cfg.get("name", wid[:4]), w.cfg.get("type", "?"),
+                         s["count"], f"{s['p50']:.2f}", f"{s['p99']:.2f}", f"{s['fps']:.1f}"))
+        # Самые дорогие по p99 — сверху
+        rows.sort(key=lambda r: float(r[4]), reverse=True)
+        self.perf_table.setRowCount(len(rows))
+        for row, values in enumerate(rows):
+            for col, value in enumerate(values):
+                self.perf_table.setItem(row, col, QTableWidgetItem(str(value)))
+
+        rate, top = self.wakeups.take_rate()
+        lines = [f"Пробуждений по таймерам: {rate:.1f}/с"
+                 + (" (" + ", ".join(f"{name} {r:.1f}" for name, r in top) + ")" if top else "")]
+        lines += [f"{name}: {value}" for name, value in collect_counters().items()]
+        if self.tracer.enabled:
+            lines.append(f"Событий в трассе: {len(self.tracer)}")
+        self.perf_label.setText("\n".join(lines))
+
+    def _on_level_changed(self, name):
+        self._log_level = LEVELS[name]
+        self.log_service.set_level(self._log_level)
+        self.log_view.clear()
+        self._log_seq = 0
+        self._flush_log()
+
+    def _flush_log(self):
+        self._log_seq, lines = self.log_service.since(self._log_seq, self._log_level)
+        if not lines: return
+        scrollbar = self.log_view.verticalScrollBar()
+        at_bottom = scrollbar.value() >= scrollbar.maximum() - 2
+        # В буфере могло накопиться больше, чем влезет в консоль
+        self.log_view.appendPlainText("\n".join(lines[-CONSOLE_MAX_LINES:]))
+        if at_bottom:
+            scrollbar.setValue(scrollbar.maximum())
 
     def _toggle_borders(self, checked):
         self.wm.debug_borders = checked
@@ -187,8 +438,22 @@ class Dev_menu(QWidget):
                     count += 1
                 except Exception as e:
                     print(f"[DEV] Error deleting {name}: {e}")
+        # Только каталог, в который пишет сам провайдер (config_path считается до setApplicationName)
+        from core.thumbnails import get_thumbnail_provider
+        thumbnails = get_thumbnail_provider()
+        thumbnails.clear()
+        count += thumbnails.clear_disk()
+        from core.geocoding import reset_location_cache
+        reset_location_cache()
         print(f"[DEV] Cache cleared. Files deleted: {count}")
 
+    def _delete_all_widgets(self):
+        reply = QMessageBox.question(self, "Удаление", "Удалить все виджеты безвозвратно?", QMessageBox.Yes | QMessageBox.No)
+        if reply != QMessageBox.Yes: return
+        count = len(self.wm.get_all_configs())
+        self.wm.delete_all_widgets()
+        print(f"[DEV] Deleted widgets: {count}")
+
     def _force_crash(self):
         print("[DEV] Simulating critical error...")
         try:
@@ -259,6 +524,12 @@ class AppSettingsWindow(QWidget):
         self.cb_autostart.setChecked(self.wm.get_global_setting("autostart", False))
         self.cb_autostart.toggled.connect(self._toggle_autostart)
         v_sys.addWidget(self.cb_autostart)
+
+        self.cb_snap = QCheckBox("Привязка к направляющим при редактировании")
+        self.cb_snap.setToolTip("Удерживайте Alt, чтобы временно отключить")
+        self.cb_snap.setChecked(self.wm.get_global_setting("snap_to_guides", True))
+        self.cb_snap.toggled.connect(lambda v: self.wm.set_global_setting("snap_to_guides", v))
+        v_sys.addWidget(self.cb_snap)
         
         btn_open_conf = QPushButton("📂 Открыть папку с конфигами")
         btn_open_conf.clicked.connect(self._open_config_folder)
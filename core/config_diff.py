@@ -0,0 +1,49 @@
+# ChronoDash - Base Widget
+# Copyright (C) 2025 Overl1te
+
+"""
+Точечные изменения конфигов виджетов.
+
+Конфиг — вложенный dict; изменение описывается набором путей через точку:
+{"x", "content.file_path"}. WidgetManager считает diff между снимком
+прошлого конфига и новым, а виджеты по путям решают, что пересчитывать:
+геометрию, параметры окна или контент.
+
+changed=None везде означает «неизвестно что» — т.е. применить все.
+"""
+
+import copy
+
+# Классы ключей
+GEOMETRY_KEYS = ("x", "y", "width", "height")
+WINDOW_KEYS = ("opacity", "always_on_top", "click_through")
+CONTENT_KEY = "content"
+
+
+def diff_paths(old, new, prefix: str = "") -> set:
+    """Пути ключей, которые добавлены, удалены или изменены (вложенные dict — рекурсивно)."""
+    changed = set()
+    for key in old.keys() | new.keys():
+        path = f"{prefix}{key}"
+        a, b = old.get(key), new.get(key)
+        if isinstance(a, dict) and isinstance(b, dict):
+            changed |= diff_paths(a, b, path + ".")
+        elif a != b or (key in old) != (key in new):
+            changed.add(path)
+    return changed
+
+
+def touches(changed, *paths) -> bool:
+    """Задет ли хоть один из путей (сам ключ, его потомок или предок)."""
+    if changed is None:
+        return True
+    for c in changed:
+        for p in paths:
+            if c == p or c.startswith(p + ".") or p.startswith(c + "."):
+                return True
+    return False
+
+
+def snapshot(cfg: dict) -> dict:
+    """Независимая копия конфига: настройки правят исходный dict на месте."""
+    return copy.deepcopy(cfg)
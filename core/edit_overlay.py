@@ -4,58 +4,75 @@
 """
 Оверлей для режима редактирования виджета.
 
-Полноэкранное прозрачное окно:
+По одному прозрачному окну на каждый экран (а не одно на объединение
+всех экранов — на нескольких 4K-мониторах это огромный буфер, а при
+несовпадающих по высоте мониторах часть окна висит в пустоте):
 - Затемняет экран
-- Показывает подсказку про ESC
+- Показывает подсказку про ESC (только на основном экране)
 - Перехватывает ESC
 - Полностью пропускает клики мыши к виджету под собой
+- Рисует направляющие привязки (перерисовывается только полоса вокруг линии)
+
+EditOverlaySet создает окна лениво, при первом входе в режим редактирования,
+и потом только прячет/показывает их. Подключение и отключение мониторов
+затрагивает только окно соответствующего экрана.
 """
 
-from PySide6.QtWidgets import QWidget, QLabel, QApplication
-from PySide6.QtCore import Qt, Signal, QRect
-from PySide6.QtGui import QColor, QPainter, QBrush, QFont
+from PySide6.QtWidgets import QWidget, QLabel
+from PySide6.QtCore import Qt, Signal, QRect, QLine, QPoint, QObject
+from PySide6.QtGui import QColor, QPainter, QBrush, QFont, QPen, QGuiApplication
+
+GUIDE_COLOR = QColor(255, 0, 170)
+DIM_COLOR = QColor(0, 0, 0, 150)
 
 
 class EditOverlay(QWidget):
     """
-    Оверлей, активный только в режиме редактирования.
+    Оверлей одного экрана, активный только в режиме редактирования.
     Позволяет перемещать и изменять размер виджета под собой.
     """
     stop_edit_signal = Signal()
+    # Ctrl+клик по оверлею (глобальная точка): выбрать виджет под курсором
+    select_at_signal = Signal(QPoint)
 
-    def __init__(self, editing_widget: QWidget):
+    def __init__(self, screen):
         super().__init__()
 
-        self.editing_widget = editing_widget
+        self.screen_ref = screen
+        self.editing_widget = None
+        self.hint_label = None    # Создается только на основном экране
+        self._guides = []  # QLine в координатах оверлея
 
         self.setWindowFlags(Qt.FramelessWindowHint | Qt.WindowStaysOnTopHint | Qt.Tool)
         self.setAttribute(Qt.WA_TranslucentBackground)
-
-        self._resize_to_all_screens()
-
-        # Подсказка
-        self.hint_label = QLabel("Для выхода нажмите ESC", self)
-        self.hint_label.setStyleSheet("""
-            QLabel {
-                color: white;
-                background-color: rgba(128, 128, 128, 120);
-                border-radius: 8px;
-                padding: 12px 20px;
-                font-size: 16px;
-                font-family: Segoe UI, Arial;
-            }
-        """)
-        self.hint_label.setFont(QFont("Segoe UI", 16, QFont.Bold))
-        self.hint_label.setAlignment(Qt.AlignCenter)
-        self.hint_label.setAttribute(Qt.WA_TransparentForMouseEvents, True)
-
-        self._position_hint_label()
-        self.hint_label.show()
-
-        # Захват клавиатуры для ESC
         self.setFocusPolicy(Qt.StrongFocus)
-        self.grabKeyboard()
-        self.show()
+
+        self.setScreen(screen)
+        self._sync_geometry()
+        screen.availableGeometryChanged.connect(self._sync_geometry)
+
+    def _sync_geometry(self):
+        self.setGeometry(self.screen_ref.availableGeometry())
+
+    def set_hint_visible(self, visible: bool):
+        if visible and self.hint_label is None:
+            self.hint_label = QLabel("Для выхода нажмите ESC", self)
+            self.hint_label.setStyleSheet("""
+                QLabel {
+                    color: white;
+                    background-color: rgba(128, 128, 128, 120);
+                    border-radius: 8px;
+                    padding: 12px 20px;
+                    font-size: 16px;
+                    font-family: Segoe UI, Arial;
+                }
+            """)
+            self.hint_label.setFont(QFont("Segoe UI", 16, QFont.Bold))
+            self.hint_label.setAlignment(Qt.AlignCenter)
+            self.hint_label.setAttribute(Qt.WA_TransparentForMouseEvents, True)
+            self._position_hint_label()
+        if self.hint_label is not None:
+            self.hint_label.setVisible(visible)
 
     def mouseMoveEvent(self, event):
         """
@@ -64,23 +81,12 @@ class EditOverlay(QWidget):
         """
         event.ignore()
 
-    def _resize_to_all_screens(self):
-        total_rect = QRect()
-        app = QApplication.instance()
-        for screen in app.screens():
-            total_rect = total_rect.united(screen.availableGeometry())
-
-        if total_rect.isEmpty():
-            total_rect = app.primaryScreen().availableGeometry()
-
-        self.setGeometry(total_rect)
-
     def _position_hint_label(self):
+        if self.hint_label is None: return
         label_width = 500
         label_height = 60
-        primary_geo = QApplication.primaryScreen().availableGeometry()
 
-        x = (primary_geo.width() - label_width) // 2
+        x = (self.width() - label_width) // 2
         y = 20
 
         self.hint_label.setGeometry(x, y, label_width, label_height)
@@ -89,11 +95,35 @@ class EditOverlay(QWidget):
         self._position_hint_label()
         super().resizeEvent(event)
 
+    def set_guides(self, guides):
+        """guides — [(ось, линия, lo, hi)] в глобальных координатах (см. SnapIndex.snap)."""
+        geo = self.geometry()
+        origin = geo.topLeft()
+        lines = []
+        for axis, line, lo, hi in guides:
+            if axis == "x":
+                ln = QLine(line - origin.x(), lo - origin.y(), line - origin.x(), hi - origin.y())
+            else:
+                ln = QLine(lo - origin.x(), line - origin.y(), hi - origin.x(), line - origin.y())
+            # Линии других экранов сюда не относятся
+            if QRect(ln.p1(), ln.p2()).normalized().adjusted(0, 0, 1, 1).intersects(self.rect()):
+                lines.append(ln)
+        if lines == self._guides: return
+
+        # Перерисовываем только старые и новые линии, а не весь экран
+        for ln in self._guides + lines:
+            self.update(QRect(ln.p1(), ln.p2()).normalized().adjusted(-2, -2, 2, 2))
+        self._guides = lines
+
     def paintEvent(self, event):
         painter = QPainter(self)
-        painter.setBrush(QBrush(QColor(0, 0, 0, 150)))
+        painter.setBrush(QBrush(DIM_COLOR))
         painter.setPen(Qt.NoPen)
-        painter.drawRect(self.rect())
+        painter.drawRect(event.rect())
+
+        if self._guides:
+            painter.setPen(QPen(GUIDE_COLOR, 1, Qt.DashLine))
+            painter.drawLines(self._guides)
 
     def keyPressEvent(self, event):
         if event.key() == Qt.Key_Escape:
@@ -107,7 +137,12 @@ class EditOverlay(QWidget):
         2. event.ignore() — позволяет событию пройти сквозь оверлей
         Без обоих — клики не доходят до BaseDesktopWidget!
         """
-        self.editing_widget.activateWindow()
+        if event.modifiers() & Qt.ControlModifier:
+            self.select_at_signal.emit(event.globalPosition().toPoint())
+            event.accept()
+            return
+        if self.editing_widget is not None:
+            self.editing_widget.activateWindow()
         event.ignore()  # Это обязательно!
 
     def closeEvent(self, event):
@@ -115,4 +150,92 @@ class EditOverlay(QWidget):
             self.releaseKeyboard()
         except:
             pass
-        super().closeEvent(event)
\ No newline at end of file
+        super().closeEvent(event)
+
+
+class EditOverlaySet(QObject):
+    """Оверлеи всех экранов как одно целое: показ, ESC, направляющие, горячее подключение мониторов."""
+    stop_edit_signal = Signal()
+    select_at_signal = Signal(QPoint)
+
+    def __init__(self):
+        super().__init__()
+        self._overlays = {}  # QScreen -> EditOverlay
+        self._editing_widget = None
+        self.active = False
+
+        app = QGuiApplication.instance()
+        app.screenAdded.connect(self._on_screen_added)
+        app.screenRemoved.connect(self._on_screen_removed)
+        app.primaryScreenChanged.connect(lambda _: self._assign_primary())
+
+    @property
+    def editing_widget(self):
+        return self._editing_widget
+
+    @editing_widget.setter
+    def editing_widget(self, widget):
+        self._editing_widget = widget
+        for overlay in self._overlays.values():
+            overlay.editing_widget = widget
+
+    def _overlay_for(self, screen) -> EditOverlay:
+        overlay = self._overlays.get(screen)
+        if overlay is None:
+            overlay = EditOverlay(screen)
+            overlay.editing_widget = self._editing_widget
+            overlay.stop_edit_signal.connect(self.stop_edit_signal)
+            overlay.select_at_signal.connect(self.select_at_signal)
+            self._overlays[screen] = overlay
+        return overlay
+
+    def _primary(self):
+        return self._overlays.get(QGuiApplication.primaryScreen())
+
+    def _assign_primary(self):
+        """Подсказка и захват клавиатуры — на оверлее основного экрана."""
+        if not self.active: return
+        primary = self._primary()
+        for overlay in self._overlays.values():
+            overlay.set_hint_visible(overlay is primary)
+        if primary is not None:
+            primary.grabKeyboard()
+
+    def show_for(self, editing_widget):
+        self.editing_widget = editing_widget
+        self.active = True
+        for screen in QGuiApplication.screens():
+            self._overlay_for(screen).show()
+        self._assign_primary()
+
+    def hide_all(self):
+        self.active = False
+        for overlay in self._overlays.values():
+            overlay.releaseKeyboard()
+            overlay.set_guides([])
+            overlay.hide()
+        self.editing_widget = None
+
+    def set_guides(self, guides):
+        for overlay in self._overlays.values():
+            if overlay.isVisible():
+                overlay.set_guides(guides)
+
+    def _on_screen_added(self, screen):
+        if self.active:
+            self._overlay_for(screen).show()
+            self._assign_primary()
+
+    def _on_screen_removed(self, screen):
+        overlay = self._overlays.pop(screen, None)
+        if overlay is not None:
+            overlay.close()
+            overlay.deleteLater()
+        self._assign_primary()
+
+    def close(self):
+        for overlay in self._overlays.values():
+            overlay.close()
+            overlay.deleteLater()
+        self._overlays.clear()
+        self.active = False
@@ -0,0 +1,177 @@
+# ChronoDash - Base Widget
+# Copyright (C) 2025 Overl1te
+
+"""
+Компактная модель прогноза погоды поверх numpy-массивов.
+
+Ответ Open-Meteo запрашивается с timeformat=unixtime и раскладывается
+в типизированные ряды (время — int64 секунды UTC, значения — float32),
+вместо списков строк и словарей. Это позволяет держать 16 дней прогноза
+с шагом 15 минут (~1500 точек на ряд) и искать текущий слот через
+np.searchsorted, без циклов Python на каждый кадр.
+"""
+
+import numpy as np
+
+# Open-Meteo отдает до 16 дней прогноза
+MAX_FORECAST_DAYS = 16
+
+RESOLUTION_HOURLY = "hourly"
+RESOLUTION_15MIN = "minutely_15"
+
+SERIES_FIELDS = "temperature_2m,precipitation,weather_code"
+DAILY_FIELDS = "temperature_2m_max,temperature_2m_min,sunrise,sunset"
+
+
+def _floats(values, n):
+    """Список из JSON (с null) → float32, недостающие значения — NaN."""
+    if not values:
+        return np.full(n, np.nan, dtype=np.float32)
+    return np.asarray(values, dtype=np.float32)
+
+
+def _degrees(values: np.ndarray) -> list[str]:
+    """Округленные температуры «T°»; пропуски (NaN) — «--»."""
+    finite = np.isfinite(values)
+    rounded = np.rint(np.where(finite, values, 0)).astype(np.int32)
+    return [f"{t}°" if ok else "--" for t, ok in zip(rounded.tolist(), finite.tolist())]
+
+
+def _codes(values, n):
+    arr = _floats(values, n)
+    return np.nan_to_num(arr, nan=-1).astype(np.int16)
+
+
+class ForecastSeries:
+    """Равномерный временной ряд: общая шкала времени и значения по ней."""
+
+    __slots__ = ("time", "temperature", "precipitation", "weather_code", "step")
+
+    def __init__(self, block: dict):
+        self.time = np.asarray(block.get("time", []), dtype=np.int64)
+        n = len(self.time)
+        self.temperature = _floats(block.get("temperature_2m"), n)
+        self.precipitation = _floats(block.get("precipitation"), n)
+        self.weather_code = _codes(block.get("weather_code"), n)
+        self.step = int(self.time[1] - self.time[0]) if n > 1 else 3600
+
+    def __len__(self):
+        return len(self.time)
+
+    def index_at(self, ts: float) -> int:
+        """Индекс слота, в который попадает момент ts (UTC, секунды)."""
+        if not len(self.time):
+            return 0
+        idx = int(np.searchsorted(self.time, ts, side="right")) - 1
+        return min(max(idx, 0), len(self.time) - 1)
+
+    def window(self, ts: float, count: int) -> slice:
+        """Срез из count слотов, начиная с текущего."""
+        start = self.index_at(ts)
+        return slice(start, min(len(self.time), start + count))
+
+
+class ForecastModel:
+    """
+    Разобранный ответ Open-Meteo.
+
+    current  — словарь текущих значений (несколько скаляров, массивы не нужны);
+    series   — основной ряд (почасовой или 15-минутный);
+    daily_*  — дневные ряды.
+    """
+
+    def __init__(self, data: dict, resolution: str = RESOLUTION_HOURLY):
+        self.utc_offset = int(data.get("utc_offset_seconds", 0))
+        self.current = data.get("current", {})
+        self.resolution = resolution if resolution in data else RESOLUTION_HOURLY
+        self.series = ForecastSeries(data.get(self.resolution, {}))
+
+        daily = data.get("daily", {})
+        self.daily_time = np.asarray(daily.get("time", []), dtype=np.int64)
+        n = len(self.daily_time)
+        self.daily_min = _floats(daily.get("temperature_2m_min"), n)
+        self.daily_max = _floats(daily.get("temperature_2m_max"), n)
+        self.sunrise = np.asarray(daily.get("sunrise") or np.zeros(n), dtype=np.int64)
+        self.sunset = np.asarray(daily.get("sunset") or np.zeros(n), dtype=np.int64)
+
+    @property
+    def nbytes(self) -> int:
+        s = self.series
+        arrays = (s.time, s.temperature, s.precipitation, s.weather_code,
+                  self.daily_time, self.daily_min, self.daily_max, self.sunrise, self.sunset)
+        return sum(a.nbytes for a in arrays)
+
+    def local_hhmm(self, ts) -> np.ndarray:
+        """Секунды UTC → массив (часы, минуты) в часовом поясе точки прогноза."""
+        local = (np.asarray(ts, dtype=np.int64) + self.utc_offset) % 86400
+        return np.stack((local // 3600, local % 3600 // 60), axis=-1)
+
+    def upcoming_labels(self, ts: float, count: int, step_s: int = 3600) -> list[str]:
+        """
+        Подписи «ЧЧ:ММ T°» для ближайших count точек с шагом step_s
+        (для 15-минутного ряда берем каждую 4-ю точку, чтобы шаг остался часовым).
+        """
+        s = self.series
+        stride = max(1, step_s // s.step)
+        sl = s.window(ts, count * stride)
+        times = s.time[sl][::stride][:count]
+        temps = _degrees(s.temperature[sl][::stride][:count])
+        hm = self.local_hhmm(times)
+        return [f"{h:02d}:{m:02d} {t}" for (h, m), t in zip(hm.tolist(), temps)]
+
+    def daily_labels(self, count: int = 3) -> list[str]:
+        """Подписи «ММ.ДД: min°..max°» для первых count дней."""
+        n = min(count, len(self.daily_time))
+        days = (self.daily_time[:n] + self.utc_offset).astype("datetime64[s]").astype("datetime64[D]")
+        mins = _degrees(self.daily_min[:n])
+        maxs = _degrees(self.daily_max[:n])
+        return [f"{str(d)[5:].replace('-', '.')}: {mn}..{mx}" for d, mn, mx in zip(days, mins, maxs)]
+
+
+def decimate_minmax(values: np.ndarray, buckets: int):
+    """
+    Min/max-децимация ряда до buckets корзин (обычно — ширина графика в пикселях).
+
+    Возвращает (индексы, значения) длиной не более 2*buckets: для каждой
+    корзины ее минимум и максимум, так что пики не теряются при сжатии.
+    NaN пропускаются; корзины из одних NaN выкидываются.
+    """
+    n = len(values)
+    if n == 0 or buckets <= 0:
+        return np.empty(0, dtype=np.float32), np.empty(0, dtype=np.float32)
+    if n <= 2 * buckets:
+        idx = np.arange(n, dtype=np.float32)
+        keep = ~np.isnan(values)
+        return idx[keep], values[keep]
+
+    edges = np.linspace(0, n, buckets + 1).astype(np.int64)[:-1]
+    with np.errstate(invalid="ignore"):
+        mins = np.fmin.reduceat(values, edges)
+        maxs = np.fmax.reduceat(values, edges)
+    # Точки корзины ставим на ее левую и правую границы
+    bounds = np.append(edges, n).astype(np.float32)
+    idx = np.empty(2 * buckets, dtype=np.float32)
+    idx[0::2] = bounds[:-1]
+    idx[1::2] = bounds[1:] - 1
+    vals = np.empty(2 * buckets, dtype=np.float32)
+    vals[0::2] = mins
+    vals[1::2] = maxs
+    keep = ~np.isnan(vals)
+    return idx[keep], vals[keep]
+
+
+def build_request_params(lat, lon, units, days=3, resolution=RESOLUTION_HOURLY) -> dict:
+    """Параметры запроса к Open-Meteo под ForecastModel."""
+    params = {
+        "latitude": lat, "longitude": lon,
+        "current": "temperature_2m,apparent_temperature,weather_code",
+        "hourly": SERIES_FIELDS,
+        "daily": DAILY_FIELDS,
+        "timezone": "auto",
+        "timeformat": "unixtime",
+        "forecast_days": max(1, min(MAX_FORECAST_DAYS, int(days))),
+        "temperature_unit": units,
+    }
+    if resolution == RESOLUTION_15MIN:
+        params[RESOLUTION_15MIN] = SERIES_FIELDS
+    return params
@@ -0,0 +1,307 @@
+# ChronoDash - Base Widget
+# Copyright (C) 2025 Overl1te
+
+"""
+Поиск города (геокодинг через Nominatim) с кэшем и ограничением частоты.
+
+- Ответы кэшируются в weather_location_cache.json (секция "geocode")
+  по нормализованному запросу: повторный поиск не ходит в сеть.
+- По кэшу строится префиксный индекс: подсказки при вводе
+  выдаются мгновенно и без запросов. Кэш ограничен MAX_CACHED_QUERIES
+  запросами и вытесняет давно не использованные (LRU).
+- Новый поиск от того же владельца отменяет его предыдущий запрос:
+  при наборе текста в сеть уходит только последний вариант.
+- Политика Nominatim — не больше 1 запроса в секунду, поэтому сетевые
+  запросы проходят через RateLimiter (ожидание — таймером в GUI-потоке,
+  рабочий поток пула не блокируется).
+"""
+
+import bisect
+import json
+import time
+from pathlib import Path
+
+import requests
+from PySide6.QtCore import QObject, QTimer, QStandardPaths
+from shiboken6 import isValid
+
+from core.io_service import get_io_service, PRIORITY_HIGH
+
+HEADERS = {"User-Agent": "ChronoDash/2.1 (github.com/Overl1te/ChronoDash)"}
+NOMINATIM_SEARCH_URL = "https://nominatim.openstreetmap.org/search"
+
+CACHE_FILE_NAME = "weather_location_cache.json"
+SEARCH_LIMIT = 5
+MIN_REQUEST_INTERVAL_S = 1.0
+MAX_CACHED_QUERIES = 200
+
+
+def normalize_query(text: str) -> str:
+    """«  Нижний   Новгород » → «нижний новгород»."""
+    return " ".join(text.casefold().split())
+
+
+class LocationCache:
+    """
+    JSON-файл с секциями: {"geocode": {...}, ...}.
+    Живет в GUI-потоке, пишется целиком (файл маленький).
+    """
+
+    def __init__(self, path: Path):
+        self.path = path
+        self.data = {}
+        self._load()
+
+    def _load(self):
+        if not self.path.exists(): return
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            if isinstance(data, dict):
+                self.data = data
+        except Exception as e:
+            print(f"[LocationCache] Load error: {e}")
+
+    def section(self, name: str) -> dict:
+        return self.data.setdefault(name, {})
+
+    def save(self):
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.path, "w", encoding="utf-8") as f:
+                json.dump(self.data, f, ensure_ascii=False)
+        except Exception as e:
+            print(f"[LocationCache] Save error: {e}")
+
+    def clear(self):
+        self.data = {}
+
+
+class RateLimiter:
+    """Выдает слоты не чаще одного в interval_s секунд."""
+
+    def __init__(self, interval_s: float):
+        self.interval_s = interval_s
+        self._next_slot = 0.0
+
+    def reserve(self) -> float:
+        """Занимает ближайший слот и возвращает, сколько секунд до него ждать."""
+        now = time.monotonic()
+        slot = max(now, self._next_slot)
+        self._next_slot = slot + self.interval_s
+        return slot - now
+
+
+class PrefixIndex:
+    """Отсортированный список (ключ, результат) с поиском по префиксу через bisect."""
+
+    def __init__(self):
+        self._keys = []
+        self._items = []
+
+    def add(self, key: str, item: dict):
+        pos = bisect.bisect_left(self._keys, key)
+        # Не дублируем одно и то же место под одним ключом
+        while pos < len(self._keys) and self._keys[pos] == key:
+            if self._items[pos] == item: return
+            pos += 1
+        self._keys.insert(pos, key)
+        self._items.insert(pos, item)
+
+    def lookup(self, prefix: str, limit: int) -> list[dict]:
+        out = []
+        pos = bisect.bisect_left(self._keys, prefix)
+        while pos < len(self._keys) and len(out) < limit and self._keys[pos].startswith(prefix):
+            if self._items[pos] not in out:
+                out.append(self._items[pos])
+            pos += 1
+        return out
+
+
+def _fetch_places(query: str) -> list[dict]:
+    """Выполняется в рабочем потоке. Параметры экранирует requests."""
+    r = requests.get(
+        NOMINATIM_SEARCH_URL,
+        params={"q": query, "format": "json", "limit": SEARCH_LIMIT},
+        headers=HEADERS, timeout=5
+    )
+    r.raise_for_status()
+    return [
+        {"name": d.get("display_name", ""), "lat": float(d["lat"]), "lon": float(d["lon"])}
+        for d in r.json()
+    ]
+
+
+class _PendingQuery:
+    """Сетевой запрос в ожидании слота или ответа и все, кто ждет его результат."""
+
+    __slots__ = ("waiters", "timer", "task")
+
+    def __init__(self):
+        self.waiters = []   # (on_result, on_error, owner)
+        self.timer = None   # QTimer до слота RateLimiter
+        self.task = None    # IOTask после отправки
+
+    def cancel(self):
+        if self.timer is not None:
+            self.timer.stop()
+            self.timer.deleteLater()
+        if self.task is not None:
+            self.task.cancel()
+
+
+class GeocodingService(QObject):
+    def __init__(self, cache: LocationCache, max_queries: int = MAX_CACHED_QUERIES):
+        super().__init__()
+        self.cache = cache
+        self.max_queries = max_queries
+        self.limiter = RateLimiter(MIN_REQUEST_INTERVAL_S)
+        self.index = PrefixIndex()
+        self.stats = {"hits": 0, "misses": 0, "cancelled": 0, "evicted": 0}
+        self._pending = {}      # запрос → _PendingQuery
+        self._by_owner = {}     # владелец → его последний запрос в ожидании
+        self._evict()
+        self._rebuild_index()
+
+    def _entries(self) -> dict:
+        return self.cache.section("geocode")
+
+    def _index_places(self, query, places):
+        for place in places:
+            self.index.add(query, place)
+            self.index.add(normalize_query(place["name"]), place)
+
+    def _rebuild_index(self):
+        self.index = PrefixIndex()
+        for query, places in self._entries().items():
+            self._index_places(query, places)
+
+    def _touch(self, query):
+        # Словарь хранит порядок вставки: в конце — самые свежие запросы
+        entries = self._entries()
+        entries[query] = entries.pop(query)
+
+    def _evict(self) -> bool:
+        entries = self._entries()
+        evicted = False
+        while len(entries) > self.max_queries:
+            del entries[next(iter(entries))]
+            self.stats["evicted"] += 1
+            evicted = True
+        return evicted
+
+    def suggest(self, text: str, limit: int = SEARCH_LIMIT) -> list[dict]:
+        """Мгновенные подсказки из кэша (без сети)."""
+        prefix = normalize_query(text)
+        if not prefix: return []
+        return self.index.lookup(prefix, limit)
+
+    def search(self, text: str, on_result, on_error=None, owner=None):
+        """
+        Ищет места по запросу. on_result(list[dict]) вызывается в GUI-потоке:
+        сразу — если ответ есть в кэше, иначе после запроса к Nominatim.
+        owner — QObject, после удаления которого колбэки не вызываются;
+        его предыдущий незавершенный поиск отменяется.
+        """
+        query = normalize_query(text)
+        if owner is not None:
+            self._abandon(owner, keep=query)
+        if not query:
+            on_result([])
+            return
+        cached = self._entries().get(query)
+        if cached is not None:
+            self.stats["hits"] += 1
+            self._touch(query)
+            on_result(cached)
+            return
+
+        self.stats["misses"] += 1
+        if owner is not None:
+            self._by_owner[owner] = query
+        pending = self._pending.get(query)
+        if pending is not None:
+            pending.waiters.append((on_result, on_error, owner))
+            return
+        pending = self._pending[query] = _PendingQuery()
+        pending.waiters.append((on_result, on_error, owner))
+
+        pending.timer = QTimer(self)
+        pending.timer.setSingleShot(True)
+        pending.timer.timeout.connect(lambda: self._send(query))
+        pending.timer.start(int(self.limiter.reserve() * 1000))
+
+    def _send(self, query):
+        pending = self._pending.get(query)
+        if pending is None: return
+        pending.timer.deleteLater()
+        pending.timer = None
+        pending.task = get_io_service().submit(
+            _fetch_places, query,
+            on_result=lambda places: self._on_places(query, places),
+            on_error=lambda e: self._on_failed(query, e),
+            priority=PRIORITY_HIGH, owner=self, tag="geocode"
+        )
+
+    def _abandon(self, owner, keep=None):
+        """Снимает владельца с его прошлого запроса; запрос без ожидающих отменяется."""
+        query = self._by_owner.pop(owner, None)
+        if query is None or query == keep: return
+        pending = self._pending.get(query)
+        if pending is None: return
+        pending.waiters = [w for w in pending.waiters if w[2] is not owner]
+        if not pending.waiters:
+            pending.cancel()
+            del self._pending[query]
+            self.stats["cancelled"] += 1
+
+    def _take_waiters(self, query):
+        pending = self._pending.pop(query, None)
+        if pending is None: return []
+        for _, _, owner in pending.waiters:
+            if self._by_owner.get(owner) == query:
+                del self._by_owner[owner]
+        return pending.waiters
+
+    def _on_places(self, query, places):
+        self._entries()[query] = places
+        if self._evict():
+            self._rebuild_index()
+        else:
+            self._index_places(query, places)
+        self.cache.save()
+        for on_result, _, owner in self._take_waiters(query):
+            if owner is None or isValid(owner):
+                on_result(places)
+
+    def _on_failed(self, query, error):
+        print(f"[Geocoding] Search error for '{query}': {error}")
+        for _, on_error, owner in self._take_waiters(query):
+            if on_error and (owner is None or isValid(owner)):
+                on_error(error)
+
+
+_cache = None
+_service = None
+
+
+def get_location_cache() -> LocationCache:
+    global _cache
+    if _cache is None:
+        config_dir = Path(QStandardPaths.writableLocation(QStandardPaths.AppConfigLocation))
+        _cache = LocationCache(config_dir / CACHE_FILE_NAME)
+    return _cache
+
+
+def get_geocoding_service() -> GeocodingService:
+    global _service
+    if _service is None:
+        _service = GeocodingService(get_location_cache())
+    return _service
+
+
+def reset_location_cache():
+    """Забывает кэш в памяти (после удаления файла из DevTools)."""
+    global _cache, _service
+    _cache = None
+    _service = None
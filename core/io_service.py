@@ -0,0 +1,170 @@
+# ChronoDash - Base Widget
+# Copyright (C) 2025 Overl1te
+
+"""
+Единый сервис фонового ввода-вывода.
+
+Вместо отдельного threading.Thread на каждый сетевой запрос все задачи
+идут через один ограниченный QThreadPool:
+  - глобальный лимит одновременных задач (MAX_WORKERS);
+  - приоритеты (пользовательский поиск > погода > проверка обновлений);
+  - результат и ошибка доставляются в GUI-поток через сигнал,
+    поэтому колбэки могут спокойно трогать виджеты.
+
+Пример:
+    get_io_service().submit(fetch, url, on_result=self._apply, owner=self)
+"""
+
+import itertools
+from core.tracing import span
+from PySide6.QtCore import QObject, QRunnable, QThreadPool, Signal, Slot
+
+try:
+    from shiboken6 import isValid as _qt_is_valid
+except ImportError:  # pragma: no cover - shiboken всегда идет вместе с PySide6
+    def _qt_is_valid(obj):
+        return True
+
+# Одновременно выполняется не больше MAX_WORKERS задач, остальные ждут в очереди
+MAX_WORKERS = 4
+
+# Приоритеты: чем больше число, тем раньше задача покинет очередь
+PRIORITY_LOW = 0       # Фоновые вещи (проверка обновлений)
+PRIORITY_NORMAL = 5    # Данные виджетов (погода, иконки)
+PRIORITY_HIGH = 10     # То, чего пользователь ждет прямо сейчас (поиск города)
+
+
+class IOTask(QRunnable):
+    """
+    Одна задача в пуле. Выполняет fn(*args, **kwargs) в рабочем потоке,
+    а результат отдает сервису, который вызовет колбэки уже в GUI-потоке.
+    """
+
+    def __init__(self, service, fn, args, kwargs, on_result, on_error, owner, tag):
+        super().__init__()
+        # Ссылку на задачу держит сервис, Qt не должен удалять ее сам
+        self.setAutoDelete(False)
+        self.task_id = next(service._ids)
+        self.service = service
+        self.fn = fn
+        self.args = args
+        self.kwargs = kwargs
+        self.on_result = on_result
+        self.on_error = on_error
+        self.owner = owner
+        self.tag = tag
+        self.cancelled = False
+
+    def run(self):
+        if self.cancelled:
+            self.service._deliver.emit(self, None, None)
+            return
+        try:
+            # Сетевые запросы и прочий I/O — на дорожке рабочего потока
+            with span(self.tag or getattr(self.fn, "__name__", "task"), "io"):
+                result = self.fn(*self.args, **self.kwargs)
+        except Exception as e:
+            self.service._deliver.emit(self, None, e)
+        else:
+            self.service._deliver.emit(self, result, None)
+
+    def cancel(self):
+        """
+        Отменяет задачу: если она еще в очереди — убирает ее из пула,
+        если уже выполняется — колбэки просто не будут вызваны.
+        """
+        if self.cancelled:
+            return
+        self.cancelled = True
+        if self.service._pool.tryTake(self):
+            self.service._forget(self)
+
+
+class IOService(QObject):
+    # (задача, результат, исключение) — эмитится из рабочего потока,
+    # слот выполняется в потоке сервиса (GUI) через queued connection
+    _deliver = Signal(object, object, object)
+
+    def __init__(self, max_workers: int = MAX_WORKERS):
+        super().__init__()
+        self._pool = QThreadPool()
+        self._pool.setMaxThreadCount(max_workers)
+        self._ids = itertools.count(1)
+        self._tasks = {}
+        self.stats = {"submitted": 0, "completed": 0, "failed": 0, "cancelled": 0}
+        self._deliver.connect(self._on_deliver)
+
+    @property
+    def in_flight(self) -> int:
+        """Количество задач в очереди и в работе."""
+        return len(self._tasks)
+
+    def submit(self, fn, *args, on_result=None, on_error=None,
+               priority=PRIORITY_NORMAL, owner=None, tag=None, **kwargs) -> IOTask:
+        """
+        Ставит fn(*args, **kwargs) в очередь пула.
+
+        on_result(result) / on_error(exc) вызываются в GUI-потоке.
+        owner — QObject, после удаления которого колбэки не вызываются.
+        """
+        task = IOTask(self, fn, args, kwargs, on_result, on_error, owner, tag)
+        self._tasks[task.task_id] = task
+        self.stats["submitted"] += 1
+        self._pool.start(task, priority)
+        return task
+
+    def cancel_tag(self, tag):
+        """Отменяет все задачи с указанным тегом."""
+        for task in list(self._tasks.values()):
+            if task.tag == tag:
+                task.cancel()
+
+    def shutdown(self, timeout_ms: int = 2000):
+        """Снимает очередь и ждет завершения уже запущенных задач."""
+        for task in list(self._tasks.values()):
+            task.cancelled = True
+        self._pool.clear()
+        self._pool.waitForDone(timeout_ms)
+        self._tasks.clear()
+
+    def _forget(self, task):
+        if self._tasks.pop(task.task_id, None) is not None:
+            self.stats["cancelled"] += 1
+
+    @Slot(object, object, object)
+    def _on_deliver(self, task, result, error):
+        if self._tasks.pop(task.task_id, None) is None:
+            return
+        if task.cancelled:
+            self.stats["cancelled"] += 1
+            return
+        if task.owner is not None and not _qt_is_valid(task.owner):
+            return
+
+        if error is not None:
+            self.stats["failed"] += 1
+            if task.on_error:
+                task.on_error(error)
+            else:
+                print(f"[IOService] Task {task.tag or task.task_id} failed: {error}")
+            return
+
+        self.stats["completed"] += 1
+        if task.on_result:
+            with span(f"{task.tag or 'task'}.result", "io"):
+                task.on_result(result)
+
+
+_service = None
+
+
+def get_io_service() -> IOService:
+    """
+    Возвращает общий экземпляр сервиса (создается при первом обращении).
+
+    Первый вызов должен быть из GUI-потока: туда будут приходить результаты.
+    """
+    global _service
+    if _service is None:
+        _service = IOService()
+    return _service
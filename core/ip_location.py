@@ -0,0 +1,152 @@
+# ChronoDash - Base Widget
+# Copyright (C) 2025 Overl1te
+
+"""
+Автоопределение местоположения по IP.
+
+Все провайдеры опрашиваются одновременно через IOService; побеждает первый
+валидный ответ, остальные задачи отменяются. Результат кэшируется
+в weather_location_cache.json (секция "ip") на IP_CACHE_TTL_S, поэтому
+при повторных запусках сети не нужно вовсе.
+
+Если все провайдеры упали — берем устаревший кэш, а без него DEFAULT_LOCATION;
+такой ответ помечен "fallback": True, и виджет переспрашивает при следующем обновлении.
+"""
+
+import time
+
+import requests
+from PySide6.QtCore import QObject
+from shiboken6 import isValid
+
+from core.io_service import get_io_service, PRIORITY_NORMAL
+from core.geocoding import HEADERS, get_location_cache
+
+# Провайдеры: (имя, URL). Все отдают JSON с координатами текущего IP.
+PROVIDERS = [
+    ("ipapi", "https://ipapi.co/json/"),
+    ("reallyfreegeoip", "https://reallyfreegeoip.org/json/"),
+    ("apip", "https://apip.cc/json"),
+]
+
+IP_CACHE_TTL_S = 6 * 60 * 60
+PROVIDER_TIMEOUT_S = 4
+
+# Москва — прежнее поведение виджета погоды
+DEFAULT_LOCATION = {"lat": 55.75, "lon": 37.61, "city": "", "source": "default"}
+
+
+def parse_location(data: dict):
+    """
+    Достает координаты из ответа любого провайдера.
+    Возвращает {"lat", "lon", "city"} или None, если ответ бесполезен.
+    """
+    if not isinstance(data, dict):
+        return None
+    lat = data.get("latitude", data.get("lat"))
+    lon = data.get("longitude", data.get("lon", data.get("lng")))
+    try:
+        lat, lon = float(lat), float(lon)
+    except (TypeError, ValueError):
+        return None
+    # (0, 0) — типичная «заглушка» при ошибке провайдера
+    if not (-90 <= lat <= 90 and -180 <= lon <= 180) or (lat == 0 and lon == 0):
+        return None
+    return {"lat": lat, "lon": lon, "city": str(data.get("city") or "")}
+
+
+def _fetch_provider(name: str, url: str):
+    """Выполняется в рабочем потоке."""
+    r = requests.get(url, headers=HEADERS, timeout=PROVIDER_TIMEOUT_S)
+    r.raise_for_status()
+    loc = parse_location(r.json())
+    if loc is None:
+        raise ValueError(f"{name}: нет координат в ответе")
+    loc["source"] = name
+    return loc
+
+
+class IPLocationResolver(QObject):
+    def __init__(self, cache):
+        super().__init__()
+        self.cache = cache
+        self._waiters = []   # (on_result, owner) — ждут текущую гонку
+        self._tasks = []
+        self._failed = 0
+
+    def _entry(self) -> dict:
+        return self.cache.section("ip")
+
+    def cached(self, allow_stale: bool = False):
+        entry = self._entry()
+        if "lat" not in entry:
+            return None
+        if not allow_stale and time.time() - entry.get("ts", 0) >= IP_CACHE_TTL_S:
+            return None
+        return {k: entry[k] for k in ("lat", "lon", "city", "source") if k in entry}
+
+    def resolve(self, on_result, owner=None):
+        """
+        on_result(location) вызывается в GUI-потоке всегда — при неудаче
+        с устаревшим кэшем или DEFAULT_LOCATION и флагом "fallback".
+        """
+        loc = self.cached()
+        if loc is not None:
+            on_result(loc)
+            return
+
+        self._waiters.append((on_result, owner))
+        if self._tasks:
+            return  # Гонка уже идет — просто ждем ее итог
+
+        self._failed = 0
+        service = get_io_service()
+        self._tasks = [
+            service.submit(
+                _fetch_provider, name, url,
+                on_result=self._on_winner, on_error=self._on_provider_error,
+                priority=PRIORITY_NORMAL, owner=self, tag="iplocate"
+            )
+            for name, url in PROVIDERS
+        ]
+
+    def _on_winner(self, loc):
+        if not self._tasks:
+            return
+        # Первый валидный ответ — остальные провайдеры больше не нужны
+        for task in self._tasks:
+            task.cancel()
+        self._tasks = []
+        entry = self._entry()
+        entry.clear()
+        entry.update(loc, ts=time.time())
+        self.cache.save()
+        print(f"[IPLocation] {loc['source']}: {loc['lat']:.2f}, {loc['lon']:.2f} {loc['city']}")
+        self._notify(loc)
+
+    def _on_provider_error(self, error):
+        print(f"[IPLocation] Provider error: {error}")
+        self._failed += 1
+        if self._tasks and self._failed >= len(self._tasks):
+            self._tasks = []
+            loc = self.cached(allow_stale=True) or dict(DEFAULT_LOCATION)
+            loc["fallback"] = True
+            self._notify(loc)
+
+    def _notify(self, loc):
+        waiters, self._waiters = self._waiters, []
+        for on_result, owner in waiters:
+            if owner is None or isValid(owner):
+                on_result(loc)
+
+
+_resolver = None
+
+
+def get_ip_location_resolver() -> IPLocationResolver:
+    global _resolver
+    cache = get_location_cache()
+    # Кэш могли сбросить из DevTools — тогда резолвер пересоздаем
+    if _resolver is None or _resolver.cache is not cache:
+        _resolver = IPLocationResolver(cache)
+    return _resolver
@@ -0,0 +1,204 @@
+# ChronoDash - Base Widget
+# Copyright (C) 2025 Overl1te
+
+"""
+Логирование приложения.
+
+Весь вывод (и logging, и обычные print — stdout/stderr перехватываются
+построчно) проходит через стандартный logging с уровнями и попадает в:
+  - реальную консоль;
+  - кольцевой буфер в памяти на RING_SIZE строк (старые вытесняются);
+  - файл <config_dir>/chronodash.log с ротацией по размеру.
+
+GUI ничего не получает на каждую запись: консоль в DevTools сама забирает
+новые строки из буфера по таймеру (см. LogService.since).
+
+Пример:
+    log = logging.getLogger("chronodash.widgets")
+    log.debug("Config saved")   # В консоль DevTools попадет только при уровне DEBUG
+"""
+
+import logging
+import sys
+import threading
+from collections import deque
+from logging.handlers import RotatingFileHandler
+from pathlib import Path
+
+from PySide6.QtCore import QStandardPaths
+
+RING_SIZE = 5000                  # Строк в памяти
+LOG_FILE_NAME = "chronodash.log"
+LOG_FILE_MAX_BYTES = 1024 * 1024  # Размер файла до ротации
+LOG_FILE_BACKUPS = 3              # chronodash.log.1 ... .3
+LOG_FORMAT = "%(asctime)s %(levelname)-7s %(message)s"
+LOG_DATE_FORMAT = "%H:%M:%S"
+
+ROOT_LOGGER = "chronodash"
+LEVELS = {
+    "DEBUG": logging.DEBUG,
+    "INFO": logging.INFO,
+    "WARNING": logging.WARNING,
+    "ERROR": logging.ERROR,
+}
+
+
+class RingBufferHandler(logging.Handler):
+    """Последние capacity строк; у каждой — порядковый номер для инкрементального чтения."""
+
+    def __init__(self, capacity=RING_SIZE):
+        super().__init__()
+        self._records = deque(maxlen=capacity)  # (seq, levelno, строка)
+        self._seq = 0
+
+    def emit(self, record):
+        try:
+            line = self.format(record)
+        except Exception:
+            self.handleError(record)
+            return
+        # emit вызывается под self.lock (см. logging.Handler.handle)
+        self._seq += 1
+        self._records.append((self._seq, record.levelno, line))
+
+    def since(self, seq, level=logging.NOTSET):
+        """(последний номер, [строки новее seq с уровнем не ниже level])."""
+        with self.lock:
+            last = self._seq
+            if seq >= last:
+                return last, []
+            records = list(self._records)
+        # Новые записи — в хвосте; идем с конца, пока не встретим уже прочитанные
+        start = len(records)
+        while start > 0 and records[start - 1][0] > seq:
+            start -= 1
+        return last, [line for _, levelno, line in records[start:] if levelno >= level]
+
+    def clear(self):
+        with self.lock:
+            self._records.clear()
+
+
+class StdStreamToLog:
+    """
+    Замена sys.stdout/sys.stderr: собирает строки (print пишет текст и '\\n'
+    отдельными вызовами, а из разных потоков — вперемешку, поэтому буфер у
+    каждого потока свой) и отдает их в logging целыми.
+    """
+
+    def __init__(self, logger, level, original):
+        self.logger = logger
+        self.level = level
+        self.original = original
+        self._local = threading.local()
+
+    def write(self, message):
+        if not message: return 0
+        buf = getattr(self._local, "buf", "") + str(message)
+        *lines, self._local.buf = buf.split("\n")
+        for line in lines:
+            if line.strip():
+                self.logger.log(self.level, line.rstrip())
+        return len(message)
+
+    def flush(self):
+        buf = getattr(self._local, "buf", "")
+        if buf.strip():
+            self._local.buf = ""
+            self.logger.log(self.level, buf.rstrip())
+
+    def isatty(self):
+        return False
+
+    @property
+    def encoding(self):
+        return getattr(self.original, "encoding", "utf-8")
+
+
+class LogService:
+    def __init__(self, log_path: Path):
+        self.log_path = log_path
+        self.logger = logging.getLogger(ROOT_LOGGER)
+        self.logger.setLevel(logging.DEBUG)
+        self.logger.propagate = False
+        self.formatter = logging.Formatter(LOG_FORMAT, LOG_DATE_FORMAT)
+
+        self.ring = RingBufferHandler()
+        self.ring.setFormatter(self.formatter)
+        self.logger.addHandler(self.ring)
+
+        self.file_handler = None
+        self.console_handler = None
+        self._level = logging.INFO
+        self.installed = False
+
+    def install(self):
+        """Подключить консоль и файл и перехватить stdout/stderr (повторные вызовы ничего не делают)."""
+        if self.installed: return
+        self.installed = True
+
+        # Консоль пишет в настоящий stderr, иначе print уйдет по кругу
+        self.console_handler = logging.StreamHandler(sys.__stderr__ or sys.stderr)
+        self.console_handler.setFormatter(self.formatter)
+        self.logger.addHandler(self.console_handler)
+
+        try:
+            self.log_path.parent.mkdir(parents=True, exist_ok=True)
+            self.file_handler = RotatingFileHandler(
+                self.log_path, maxBytes=LOG_FILE_MAX_BYTES, backupCount=LOG_FILE_BACKUPS, encoding="utf-8"
+            )
+            self.file_handler.setFormatter(self.formatter)
+            self.logger.addHandler(self.file_handler)
+        except OSError as e:
+            self.logger.error(f"[Log] Cannot open log file {self.log_path}: {e}")
+
+        self.set_level(self._level)
+
+        stdout_log = self.logger.getChild("stdout")
+        stderr_log = self.logger.getChild("stderr")
+        sys.stdout = StdStreamToLog(stdout_log, logging.INFO, sys.stdout)
+        sys.stderr = StdStreamToLog(stderr_log, logging.ERROR, sys.stderr)
+
+    def uninstall(self):
+        if not self.installed: return
+        self.installed = False
+        for stream_name in ("stdout", "stderr"):
+            stream = getattr(sys, stream_name)
+            if isinstance(stream, StdStreamToLog):
+                stream.flush()
+                setattr(sys, stream_name, stream.original)
+        for handler in (self.console_handler, self.file_handler):
+            if handler is not None:
+                self.logger.removeHandler(handler)
+                handler.close()
+        self.console_handler = self.file_handler = None
+
+    @property
+    def level(self):
+        return self._level
+
+    def set_level(self, level):
+        """Порог для консоли и файла. В кольцевой буфер пишется все, фильтрует уже просмотрщик."""
+        self._level = level
+        for handler in (self.console_handler, self.file_handler):
+            if handler is not None:
+                handler.setLevel(level)
+
+    def since(self, seq, level=logging.NOTSET):
+        return self.ring.since(seq, level)
+
+
+_service = None
+
+
+def get_log_service() -> LogService:
+    global _service
+    if _service is None:
+        config_dir = Path(QStandardPaths.writableLocation(QStandardPaths.AppConfigLocation))
+        _service = LogService(config_dir / LOG_FILE_NAME)
+    return _service
+
+
+def get_logger(name: str) -> logging.Logger:
+    """Логгер подсистемы: get_logger("widgets") -> "chronodash.widgets"."""
+    return logging.getLogger(f"{ROOT_LOGGER}.{name}")
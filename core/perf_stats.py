@@ -0,0 +1,173 @@
+# ChronoDash - Base Widget
+# Copyright (C) 2025 Overl1te
+
+"""
+Счетчики производительности для панели в DevTools.
+
+- PaintStats: длительность paintEvent каждого виджета (последние PAINT_WINDOW
+  кадров) — количество, p50/p99, FPS. Пишется только пока панель открыта
+  или включен оверлей на виджетах.
+- TimerWakeups: сколько раз в секунду просыпается цикл событий по таймерам
+  (фильтр событий на приложении, ставится только на время измерения).
+- collect_counters(): запросы в сети, кэши, переключения флагов окон, RSS.
+"""
+
+import time
+from collections import deque, Counter
+
+from PySide6.QtCore import QObject, QEvent, QCoreApplication
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+PAINT_WINDOW = 240      # Сколько последних отрисовок учитывать в перцентилях
+FPS_WINDOW_S = 2.0      # За какое окно считать FPS
+
+
+def percentile(sorted_values, q):
+    if not sorted_values: return 0.0
+    idx = min(len(sorted_values) - 1, int(round(q * (len(sorted_values) - 1))))
+    return sorted_values[idx]
+
+
+class PaintStats:
+    def __init__(self):
+        self.enabled = False
+        self.overlay = False   # Рисовать FPS и время кадра поверх виджетов
+        self._durations = {}   # id -> deque(мс)
+        self._stamps = {}      # id -> deque(время окончания кадра)
+        self._counts = Counter()
+
+    @property
+    def active(self):
+        return self.enabled or self.overlay
+
+    def record(self, wid, started, finished):
+        durations = self._durations.get(wid)
+        if durations is None:
+            durations = self._durations[wid] = deque(maxlen=PAINT_WINDOW)
+            self._stamps[wid] = deque(maxlen=PAINT_WINDOW)
+        durations.append((finished - started) * 1000)
+        self._stamps[wid].append(finished)
+        self._counts[wid] += 1
+
+    def fps(self, wid, now=None):
+        stamps = self._stamps.get(wid)
+        if not stamps: return 0.0
+        now = time.perf_counter() if now is None else now
+        recent = sum(1 for t in stamps if now - t <= FPS_WINDOW_S)
+        return recent / FPS_WINDOW_S
+
+    def last_ms(self, wid):
+        durations = self._durations.get(wid)
+        return durations[-1] if durations else 0.0
+
+    def summary(self, wid):
+        values = sorted(self._durations.get(wid, ()))
+        return {
+            "count": self._counts[wid],
+            "p50": percentile(values, 0.5),
+            "p99": percentile(values, 0.99),
+            "fps": self.fps(wid),
+        }
+
+    def forget(self, wid):
+        self._durations.pop(wid, None)
+        self._stamps.pop(wid, None)
+        self._counts.pop(wid, None)
+
+    def retain(self, wids):
+        """Забыть удаленные виджеты."""
+        for wid in self._durations.keys() - set(wids):
+            self.forget(wid)
+
+    def clear(self):
+        self._durations.clear()
+        self._stamps.clear()
+        self._counts.clear()
+
+
+class TimerWakeups(QObject):
+    """Считает QEvent.Timer по всему GUI-потоку и по классам получателей."""
+
+    def __init__(self):
+        super().__init__()
+        self.total = 0
+        self.by_source = Counter()
+        self._installed = False
+        self._since = time.perf_counter()
+
+    def start(self):
+        if self._installed: return
+        QCoreApplication.instance().installEventFilter(self)
+        self._installed = True
+        self.reset()
+
+    def stop(self):
+        if not self._installed: return
+        QCoreApplication.instance().removeEventFilter(self)
+        self._installed = False
+
+    def reset(self):
+        self.total = 0
+        self.by_source.clear()
+        self._since = time.perf_counter()
+
+    def eventFilter(self, obj, event):
+        if event.type() == QEvent.Timer:
+            self.total += 1
+            # Одноразовые singleShot-таймеры приходят внутреннему объекту Qt — берем его владельца
+            owner = obj.parent() or obj
+            self.by_source[type(owner).__name__] += 1
+        return False
+
+    def take_rate(self):
+        """(пробуждений в секунду, [(источник, в секунду)]) с прошлого вызова."""
+        elapsed = max(time.perf_counter() - self._since, 1e-6)
+        rate = self.total / elapsed
+        top = [(name, n / elapsed) for name, n in self.by_source.most_common(5)]
+        self.reset()
+        return rate, top
+
+
+def _ratio(hits, total):
+    return f"{hits / total * 100:.0f}% ({hits}/{total})" if total else "—"
+
+
+def collect_counters() -> dict:
+    """Снимок глобальных счетчиков; сервисы, которые еще не создавались, не трогаем."""
+    from core.io_service import get_io_service
+    from core.thumbnails import get_thumbnail_provider
+    from core import geocoding, window_attacher
+    from widgets.base_widget import FLAG_SWITCH_STATS
+
+    io = get_io_service()
+    counters = {
+        "Запросы в работе": io.in_flight,
+        "I/O задачи": ", ".join(f"{k}={v}" for k, v in io.stats.items()),
+    }
+
+    t = get_thumbnail_provider().stats
+    lookups = t["memory_hits"] + t["disk_hits"] + t["renders"]
+    counters["Миниатюры (память)"] = _ratio(t["memory_hits"], lookups)
+    counters["Миниатюры (диск)"] = _ratio(t["disk_hits"], t["disk_hits"] + t["renders"])
+
+    if geocoding._service is not None:
+        g = geocoding._service.stats
+        counters["Геокодинг (кэш)"] = _ratio(g["hits"], g["hits"] + g["misses"])
+    if window_attacher._tracker is not None:
+        w = window_attacher._tracker.stats
+        counters["Поиск окон (кэш)"] = _ratio(w["cache_hits"], w["lookups"])
+
+    for kind, s in FLAG_SWITCH_STATS.items():
+        avg = s["total_ms"] / s["count"] if s["count"] else 0.0
+        counters[f"Флаги окна ({kind})"] = f"{s['count']} × {avg:.1f} мс"
+
+    if psutil is not None:
+        counters["RSS"] = f"{psutil.Process().memory_info().rss / (1024 * 1024):.1f} МБ"
+    return counters
+
+
+PAINT_STATS = PaintStats()
@@ -0,0 +1,265 @@
+# ChronoDash - Base Widget
+# Copyright (C) 2025 Overl1te
+
+"""
+Профилирование без перезапуска: cProfile и tracemalloc по запросу.
+
+- CPU: cProfile на GUI-потоке на заданное окно (или до остановки).
+  Результат — cpu-*.prof (snakeviz, `python -m pstats`) и cpu-*.txt
+  с топом функций по суммарному времени.
+- Память: tracemalloc; каждый снимок пишется в mem-*.txt — топ строк и файлов
+  по объему, а начиная со второго — еще и разница с предыдущим снимком
+  (утечки видны как постоянный рост в одном widgets/*_widget.py).
+
+Файлы — в <config_dir>/profiles/. Обработка статистики и запись идут
+в пуле IOService, чтобы не подвешивать интерфейс.
+
+Переменная окружения CHRONODASH_PROFILE включает профилирование при запуске:
+    CHRONODASH_PROFILE=cpu        — CPU на PROFILE_DEFAULT_S секунд
+    CHRONODASH_PROFILE=cpu=120    — CPU на 120 секунд
+    CHRONODASH_PROFILE=mem        — tracemalloc с запуска
+    CHRONODASH_PROFILE=cpu=60,mem — и то, и другое
+"""
+
+import cProfile
+import io
+import os
+import pstats
+import time
+import tracemalloc
+from pathlib import Path
+
+from PySide6.QtCore import QObject, QTimer, Signal, QStandardPaths
+
+from core.io_service import get_io_service, PRIORITY_LOW
+
+PROFILE_ENV = "CHRONODASH_PROFILE"
+PROFILE_DIR_NAME = "profiles"
+PROFILE_DEFAULT_S = 30
+TOP_N = 30                  # Строк в текстовых отчетах
+TRACEMALLOC_FRAMES = 10     # Глубина стека аллокаций
+
+# Аллокации самого профилировщика в отчет не попадают.
+# Фильтруем уже сгруппированную статистику: Snapshot.filter_traces на сотнях
+# тысяч трасс работает десятки секунд.
+_EXCLUDED_FILES = {
+    __file__,
+    tracemalloc.__file__,
+    "<frozen importlib._bootstrap>",
+    "<frozen importlib._bootstrap_external>",
+    "<unknown>",
+}
+
+
+def _write_cpu_report(profile, prof_path: Path, txt_path: Path):
+    """Выполняется в рабочем потоке."""
+    prof_path.parent.mkdir(parents=True, exist_ok=True)
+    profile.dump_stats(str(prof_path))
+    out = io.StringIO()
+    stats = pstats.Stats(profile, stream=out)
+    stats.sort_stats(pstats.SortKey.CUMULATIVE).print_stats(TOP_N)
+    stats.sort_stats(pstats.SortKey.TIME).print_stats(TOP_N)
+    txt_path.write_text(out.getvalue(), encoding="utf-8")
+    return str(prof_path)
+
+
+def _line_stats(snapshot) -> dict:
+    """(файл, строка) -> (байт, блоков)."""
+    stats = {}
+    for stat in snapshot.statistics("lineno"):
+        frame = stat.traceback[0]
+        if frame.filename not in _EXCLUDED_FILES:
+            stats[(frame.filename, frame.lineno)] = (stat.size, stat.count)
+    return stats
+
+
+def _by_file(line_stats: dict) -> dict:
+    files = {}
+    for (filename, _), (size, count) in line_stats.items():
+        total = files.get(filename, (0, 0))
+        files[filename] = (total[0] + size, total[1] + count)
+    return files
+
+
+def _top(stats: dict, fmt):
+    ranked = sorted(stats.items(), key=lambda item: item[1][0], reverse=True)[:TOP_N]
+    return [f"{size / 1024:10.1f} KiB {count:8d} blocks  {fmt(key)}" for key, (size, count) in ranked]
+
+
+def _top_diff(current: dict, previous: dict, fmt):
+    diff = {}
+    for key in current.keys() | previous.keys():
+        size, count = current.get(key, (0, 0))
+        old_size, old_count = previous.get(key, (0, 0))
+        if size != old_size or count != old_count:
+            diff[key] = (size - old_size, count - old_count)
+    ranked = sorted(diff.items(), key=lambda item: abs(item[1][0]), reverse=True)[:TOP_N]
+    return [f"{size / 1024:+10.1f} KiB {count:+8d} blocks  {fmt(key)}" for key, (size, count) in ranked]
+
+
+def _write_memory_report(snapshot, previous, path: Path):
+    """
+    Выполняется в рабочем потоке. previous — статистика прошлого снимка
+    (сам снимок не храним: он занимает столько же, сколько все трассы).
+    Возвращает (путь, статистика этого снимка).
+    """
+    lines_now = _line_stats(snapshot)
+    del snapshot
+    files_now = _by_file(lines_now)
+    line_fmt = lambda key: f"{key[0]}:{key[1]}"
+    file_fmt = lambda key: key
+
+    current, peak = tracemalloc.get_traced_memory()
+    report = [f"Traced: {current / 1024 / 1024:.1f} MiB, peak {peak / 1024 / 1024:.1f} MiB"]
+    report += ["", f"=== Top {TOP_N} files ==="] + _top(files_now, file_fmt)
+    report += ["", f"=== Top {TOP_N} lines ==="] + _top(lines_now, line_fmt)
+    if previous is not None:
+        report += ["", f"=== Diff vs previous snapshot: top {TOP_N} files ==="]
+        report += _top_diff(files_now, _by_file(previous), file_fmt)
+        report += ["", f"=== Diff vs previous snapshot: top {TOP_N} lines ==="]
+        report += _top_diff(lines_now, previous, line_fmt)
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text("\n".join(report) + "\n", encoding="utf-8")
+    return str(path), lines_now
+
+
+class Profiler(QObject):
+    # (вид — "cpu" / "mem", путь к отчету)
+    report_saved = Signal(str, str)
+    # Состояние изменилось (для кнопок DevTools)
+    state_changed = Signal()
+
+    def __init__(self, profile_dir: Path):
+        super().__init__()
+        self.profile_dir = profile_dir
+        self._profile = None
+        self._cpu_started = 0.0
+        self._last_stats = None        # Статистика прошлого снимка памяти для diff
+        self._snapshot_busy = False
+
+        self._cpu_timer = QTimer(self)
+        self._cpu_timer.setSingleShot(True)
+        self._cpu_timer.timeout.connect(self.stop_cpu)
+
+    def _stamp(self):
+        return time.strftime("%Y%m%d-%H%M%S")
+
+    # --- CPU ---
+    @property
+    def cpu_running(self):
+        return self._profile is not None
+
+    def start_cpu(self, duration_s=None):
+        """Профиль GUI-потока; duration_s=None — до вызова stop_cpu()."""
+        if self.cpu_running: return
+        profile = cProfile.Profile()
+        try:
+            profile.enable()
+        except ValueError as e:
+            # Уже работает другой профилировщик (например, запуск под python -m cProfile)
+            print(f"[Profiler] Cannot start cProfile: {e}")
+            return
+        self._profile = profile
+        self._cpu_started = time.monotonic()
+        if duration_s:
+            self._cpu_timer.start(int(duration_s * 1000))
+        print("[Profiler] CPU profiling started" + (f" for {duration_s} s" if duration_s else ""))
+        self.state_changed.emit()
+
+    def stop_cpu(self):
+        if not self.cpu_running: return
+        self._cpu_timer.stop()
+        profile, self._profile = self._profile, None
+        profile.disable()
+        elapsed = time.monotonic() - self._cpu_started
+        stamp = self._stamp()
+        prof_path = self.profile_dir / f"cpu-{stamp}.prof"
+        print(f"[Profiler] CPU profiling stopped after {elapsed:.1f} s")
+        get_io_service().submit(
+            _write_cpu_report, profile, prof_path, prof_path.with_suffix(".txt"),
+            on_result=lambda path: self._on_saved("cpu", path),
+            on_error=lambda e: print(f"[Profiler] CPU report error: {e}"),
+            priority=PRIORITY_LOW, owner=self, tag="profile:cpu"
+        )
+        self.state_changed.emit()
+
+    # --- Память ---
+    @property
+    def memory_running(self):
+        return tracemalloc.is_tracing()
+
+    def start_memory(self):
+        if self.memory_running: return
+        tracemalloc.start(TRACEMALLOC_FRAMES)
+        self._last_stats = None
+        print("[Profiler] tracemalloc started")
+        self.state_changed.emit()
+
+    def stop_memory(self):
+        if not self.memory_running: return
+        tracemalloc.stop()
+        self._last_stats = None
+        print("[Profiler] tracemalloc stopped")
+        self.state_changed.emit()
+
+    def snapshot_memory(self):
+        """Снимок + отчет (с разницей относительно прошлого снимка)."""
+        if not self.memory_running:
+            print("[Profiler] tracemalloc is not running")
+            return
+        if self._snapshot_busy:
+            print("[Profiler] Previous memory report is still being written")
+            return
+        self._snapshot_busy = True
+        snapshot = tracemalloc.take_snapshot()
+        get_io_service().submit(
+            _write_memory_report, snapshot, self._last_stats, self.profile_dir / f"mem-{self._stamp()}.txt",
+            on_result=self._on_memory_report,
+            on_error=self._on_memory_error,
+            priority=PRIORITY_LOW, owner=self, tag="profile:mem"
+        )
+
+    def _on_memory_report(self, result):
+        path, stats = result
+        self._snapshot_busy = False
+        if self.memory_running:
+            self._last_stats = stats
+        self._on_saved("mem", path)
+
+    def _on_memory_error(self, e):
+        self._snapshot_busy = False
+        print(f"[Profiler] Memory report error: {e}")
+
+    def _on_saved(self, kind, path):
+        print(f"[Profiler] Report saved: {path}")
+        self.report_saved.emit(kind, path)
+
+    def start_from_env(self):
+        """Разбор CHRONODASH_PROFILE (см. описание модуля)."""
+        spec = os.environ.get(PROFILE_ENV, "").strip().lower()
+        if not spec: return
+        for item in spec.split(","):
+            name, _, value = item.strip().partition("=")
+            if name == "cpu":
+                try:
+                    duration = float(value) if value else PROFILE_DEFAULT_S
+                except ValueError:
+                    print(f"[Profiler] Bad {PROFILE_ENV} value: {item}")
+                    continue
+                self.start_cpu(duration)
+            elif name in ("mem", "memory"):
+                self.start_memory()
+            elif name:
+                print(f"[Profiler] Unknown {PROFILE_ENV} item: {item}")
+
+
+_profiler = None
+
+
+def get_profiler() -> Profiler:
+    global _profiler
+    if _profiler is None:
+        config_dir = Path(QStandardPaths.writableLocation(QStandardPaths.AppConfigLocation))
+        _profiler = Profiler(config_dir / PROFILE_DIR_NAME)
+    return _profiler
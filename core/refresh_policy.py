@@ -0,0 +1,52 @@
+# ChronoDash - Base Widget
+# Copyright (C) 2025 Overl1te
+
+"""
+Адаптивная политика периодического обновления данных виджета.
+
+- В штатном режиме — обычный интервал из настроек.
+- После ошибок — экспоненциальная пауза с джиттером, чтобы N виджетов
+  не долбили упавший API синхронно.
+- Данные считаются устаревшими, если с последнего успеха прошло больше интервала.
+
+Решение «пропустить ли обновление» (скрыт виджет, отошел пользователь)
+принимает сам виджет — политика только считает задержки.
+"""
+
+import random
+import time
+
+RETRY_BASE_S = 60          # Первая повторная попытка через минуту
+MAX_BACKOFF_S = 60 * 60    # Дальше часа не откладываем
+JITTER = 0.2               # ±20% к задержке
+
+
+class RefreshPolicy:
+    def __init__(self, interval_s: float, retry_base_s: float = RETRY_BASE_S,
+                 max_backoff_s: float = MAX_BACKOFF_S, jitter: float = JITTER):
+        self.interval_s = interval_s
+        self.retry_base_s = retry_base_s
+        self.max_backoff_s = max_backoff_s
+        self.jitter = jitter
+        self.failures = 0
+        self.last_success = None  # time.monotonic() последнего успешного обновления
+
+    def record_success(self):
+        self.failures = 0
+        self.last_success = time.monotonic()
+
+    def record_failure(self):
+        self.failures += 1
+
+    def next_delay(self) -> float:
+        """Сколько секунд ждать до следующей попытки."""
+        if self.failures == 0:
+            base = self.interval_s
+        else:
+            base = min(self.max_backoff_s, self.retry_base_s * 2 ** (self.failures - 1))
+        return base * random.uniform(1.0 - self.jitter, 1.0 + self.jitter)
+
+    def is_stale(self) -> bool:
+        if self.last_success is None:
+            return True
+        return time.monotonic() - self.last_success >= self.interval_s
@@ -52,6 +52,7 @@ def get_default_config(type_id: str) -> dict:
         "width": 300,
         "height": 200,
         "opacity": 1.0,
+        "always_on_top": True,
         "click_through": True,
         "attach_to_window": {"enabled": False}
     }
@@ -0,0 +1,118 @@
+# ChronoDash - Base Widget
+# Copyright (C) 2025 Overl1te
+
+"""
+Состояние пользовательской сессии: простой (idle) и блокировка экрана.
+
+Используется виджетами с фоновыми обновлениями, чтобы не ходить в сеть,
+пока пользователь отошел от компьютера или экран заблокирован.
+Если определить состояние не получается — считаем, что пользователь активен.
+"""
+
+import ctypes
+import ctypes.util
+import platform
+
+_SYSTEM = platform.system()
+
+if _SYSTEM == "Windows":
+    from ctypes import wintypes
+
+    class _LASTINPUTINFO(ctypes.Structure):
+        _fields_ = [("cbSize", wintypes.UINT), ("dwTime", wintypes.DWORD)]
+
+    _DESKTOP_SWITCHDESKTOP = 0x0100
+
+    _kernel32 = ctypes.WinDLL("kernel32")
+    # По умолчанию ctypes считает результат знаковым int
+    _kernel32.GetTickCount.restype = wintypes.DWORD
+
+    def get_idle_seconds() -> float:
+        """Секунды с последнего ввода с клавиатуры или мыши."""
+        try:
+            info = _LASTINPUTINFO()
+            info.cbSize = ctypes.sizeof(info)
+            if not ctypes.windll.user32.GetLastInputInfo(ctypes.byref(info)):
+                return 0.0
+            # Оба счетчика 32-битные и переполняются раз в ~49.7 суток
+            millis = (_kernel32.GetTickCount() - info.dwTime) & 0xFFFFFFFF
+            return millis / 1000.0
+        except Exception:
+            return 0.0
+
+    def is_session_locked() -> bool:
+        """Заблокирован ли экран (на защищенный рабочий стол переключиться нельзя)."""
+        try:
+            user32 = ctypes.windll.user32
+            hdesk = user32.OpenInputDesktop(0, False, _DESKTOP_SWITCHDESKTOP)
+            if not hdesk:
+                return True
+            try:
+                return not user32.SwitchDesktop(hdesk)
+            finally:
+                user32.CloseDesktop(hdesk)
+        except Exception:
+            return False
+
+elif _SYSTEM == "Linux":
+
+    class _XScreenSaverInfo(ctypes.Structure):
+        _fields_ = [
+            ("window", ctypes.c_ulong),
+            ("state", ctypes.c_int),
+            ("kind", ctypes.c_int),
+            ("til_or_since", ctypes.c_ulong),
+            ("idle", ctypes.c_ulong),
+            ("eventMask", ctypes.c_ulong),
+        ]
+
+    _SCREENSAVER_ON = 1
+    _xss = None  # (libX11, libXss, display) или False, если расширения нет
+
+    def _query_xss():
+        global _xss
+        if _xss is None:
+            _xss = False
+            try:
+                x11 = ctypes.cdll.LoadLibrary(ctypes.util.find_library("X11") or "libX11.so.6")
+                xss = ctypes.cdll.LoadLibrary(ctypes.util.find_library("Xss") or "libXss.so.1")
+                x11.XOpenDisplay.restype = ctypes.c_void_p
+                x11.XDefaultRootWindow.argtypes = [ctypes.c_void_p]
+                x11.XDefaultRootWindow.restype = ctypes.c_ulong
+                xss.XScreenSaverAllocInfo.restype = ctypes.POINTER(_XScreenSaverInfo)
+                xss.XScreenSaverQueryInfo.argtypes = [
+                    ctypes.c_void_p, ctypes.c_ulong, ctypes.POINTER(_XScreenSaverInfo)
+                ]
+                display = x11.XOpenDisplay(None)
+                if display:
+                    _xss = (x11, xss, display, xss.XScreenSaverAllocInfo())
+            except Exception:
+                _xss = False
+        if not _xss:
+            return None
+        x11, xss, display, info = _xss
+        if not xss.XScreenSaverQueryInfo(display, x11.XDefaultRootWindow(display), info):
+            return None
+        return info.contents
+
+    def get_idle_seconds() -> float:
+        """Секунды с последнего ввода (через расширение MIT-SCREEN-SAVER)."""
+        info = _query_xss()
+        return info.idle / 1000.0 if info else 0.0
+
+    def is_session_locked() -> bool:
+        """Активен ли скринсейвер (большинство DE блокируют экран вместе с ним)."""
+        info = _query_xss()
+        return bool(info and info.state == _SCREENSAVER_ON)
+
+else:
+    def get_idle_seconds() -> float:
+        return 0.0
+
+    def is_session_locked() -> bool:
+        return False
+
+
+def is_user_away(idle_threshold_s: float) -> bool:
+    """Пользователь отошел: экран заблокирован или нет ввода дольше порога."""
+    return is_session_locked() or get_idle_seconds() >= idle_threshold_s
@@ -0,0 +1,112 @@
+# ChronoDash - Base Widget
+# Copyright (C) 2025 Overl1te
+
+"""
+Привязка редакторов настроек к конфигу выбранного виджета.
+
+Панель настроек строится один раз на тип виджета, а при смене выделения
+ConfigBinder.load(cfg) лишь переставляет значения в редакторах.
+Все изменения идут через binder(path, value) и попадают в тот конфиг,
+который привязан сейчас, — старые лямбды не могут записать в чужой виджет.
+
+Для модулей: render_qt_settings(layout, cfg, on_update) получает binder
+как on_update. Его по-прежнему можно просто вызывать, но редакторы лучше
+регистрировать через on_update.bind(...), а прочий UI обновлять
+в on_update.on_load(...).
+"""
+
+from PySide6.QtWidgets import QLineEdit, QSpinBox, QDoubleSpinBox, QSlider, QCheckBox, QComboBox
+
+
+def _editor_io(editor):
+    """(сигнал изменения, setter) для стандартных редакторов."""
+    if isinstance(editor, QLineEdit):
+        return editor.textChanged, lambda v: editor.setText(str(v))
+    if isinstance(editor, QCheckBox):
+        return editor.toggled, lambda v: editor.setChecked(bool(v))
+    if isinstance(editor, QSpinBox):
+        return editor.valueChanged, lambda v: editor.setValue(int(v))
+    if isinstance(editor, QDoubleSpinBox):
+        return editor.valueChanged, lambda v: editor.setValue(float(v))
+    if isinstance(editor, QSlider):
+        return editor.valueChanged, lambda v: editor.setValue(int(v))
+    if isinstance(editor, QComboBox):
+        return editor.currentTextChanged, lambda v: editor.setCurrentText(str(v))
+    raise TypeError(f"ConfigBinder: неподдерживаемый редактор {type(editor).__name__}")
+
+
+class ConfigBinder:
+    def __init__(self, on_change):
+        """on_change(cfg, path, value) — куда отправлять правки (очередь применения)."""
+        self._on_change = on_change
+        self.cfg = None
+        self.generation = 0      # Растет при каждой перепривязке
+        self._bindings = []      # (path, default, setter)
+        self._loaders = []
+        self._loading = False
+
+    def __call__(self, path, value):
+        # Во время load редакторы шлют сигналы о значениях, которые мы же и выставили
+        if self._loading or self.cfg is None: return
+        self._on_change(self.cfg, path, value)
+
+    def get(self, path, default=None, cfg=None):
+        root = target = self.cfg if cfg is None else cfg
+        for key in path.split('.'):
+            if not isinstance(target, dict) or key not in target:
+                return default(root) if callable(default) else default
+            target = target[key]
+        return target
+
+    def bind(self, editor, path, default=None, to_editor=None, from_editor=None):
+        """
+        Двусторонняя привязка редактора к пути конфига.
+        to_editor/from_editor — преобразования (например, 0..1 ↔ слайдер 0..100).
+        default может быть функцией от cfg.
+        """
+        signal, setter = _editor_io(editor)
+        signal.connect(lambda v: self(path, from_editor(v) if from_editor else v))
+        self._bindings.append((path, default, (lambda v: setter(to_editor(v))) if to_editor else setter))
+        if self.cfg is not None:
+            self._load_binding(path, default, self._bindings[-1][2])
+        return editor
+
+    def on_load(self, fn):
+        """fn(cfg) вызывается при каждой перепривязке — для подписей, кнопок и т.п."""
+        self._loaders.append(fn)
+        return fn
+
+    def for_current(self, fn):
+        """Обертка для асинхронных колбэков: после смены виджета она ничего не делает."""
+        generation = self.generation
+        def wrapper(*args, **kwargs):
+            if generation == self.generation:
+                return fn(*args, **kwargs)
+        return wrapper
+
+    def _load_binding(self, path, default, setter):
+        self._loading = True
+        try:
+            setter(self.get(path, default))
+        finally:
+            self._loading = False
+
+    def load(self, cfg, paths=None):
+        """Привязать к cfg (paths=None) или только перечитать значения для указанных путей."""
+        if paths is None:
+            self.cfg = cfg
+            self.generation += 1
+        self._loading = True
+        try:
+            for path, default, setter in self._bindings:
+                if paths is None or path in paths:
+                    setter(self.get(path, default))
+            if paths is None:
+                for fn in self._loaders:
+                    fn(cfg)
+        finally:
+            self._loading = False
+
+    def unbind(self):
+        self.cfg = None
+        self.generation += 1
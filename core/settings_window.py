@@ -1,27 +1,85 @@
 from PySide6.QtWidgets import (
-    QWidget, QVBoxLayout, QHBoxLayout, QListWidget, QTabWidget, 
+    QWidget, QVBoxLayout, QHBoxLayout, QListView, QTabWidget, 
     QLabel, QLineEdit, QSpinBox, QSlider, QCheckBox, QPushButton, 
-    QComboBox, QScrollArea, QMessageBox, QFrame, QSplitter, QFileDialog
+    QComboBox, QScrollArea, QMessageBox, QFrame, QSplitter, QFileDialog, QStackedWidget
 )
-from PySide6.QtCore import Qt
+from PySide6.QtCore import Qt, QObject, QTimer, QSize, QCoreApplication
+from pathlib import Path
 from core.registry import get_default_config, get_module, MODULES
+from core.config_diff import touches, GEOMETRY_KEYS
+from core.widget_list_model import WidgetListModel, WidgetFilterProxy, ID_ROLE
+from core.settings_binding import ConfigBinder
+from widgets.base_widget import VISUAL_KEYS
+
+# Пауза после последней правки, после которой изменения применяются и сохраняются
+APPLY_DELAY_MS = 400
+
+
+class ConfigApplyQueue(QObject):
+    """
+    Отложенное применение правок из настроек.
+
+    Каждая правка сразу пишется в cfg. Визуальные поля (прозрачность,
+    геометрия) показываются на виджете мгновенно. Полное применение
+    (update_config — для BuilderWidget это распаковка .wgt) и запись
+    widgets.json происходят один раз, когда правки стихли на APPLY_DELAY_MS.
+    Перед выходом из приложения очередь сбрасывается (aboutToQuit),
+    чтобы последняя правка не потерялась.
+    """
+
+    def __init__(self, widget_manager, delay_ms=APPLY_DELAY_MS):
+        super().__init__()
+        self.wm = widget_manager
+        self._pending = {}  # wid -> cfg
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setInterval(delay_ms)
+        self._timer.timeout.connect(self.flush)
+        app = QCoreApplication.instance()
+        if app is not None:
+            app.aboutToQuit.connect(self.flush)
+
+    def set_value(self, cfg, path, value):
+        keys = path.split('.')
+        target = cfg
+        for k in keys[:-1]: target = target.setdefault(k, {})
+        target[keys[-1]] = value
+
+        if path in VISUAL_KEYS:
+            self.wm.preview_widget_config(cfg["id"], cfg)
+        self._pending[cfg["id"]] = cfg
+        self._timer.start()
+
+    def flush(self):
+        """Применить и сохранить все накопленное (и при закрытии окна / смене виджета)."""
+        self._timer.stop()
+        pending, self._pending = self._pending, {}
+        if pending:
+            self.wm.update_widgets_config(pending)
+
 
 class SettingsWindow(QWidget):
     def __init__(self, widget_manager):
         super().__init__()
         self.wm = widget_manager
         self.current_widget_id = None
+        self.apply_queue = ConfigApplyQueue(widget_manager)
         
-        # Хранилище ссылок на поля ввода координат, чтобы обновлять их
-        self.geo_inputs = {} 
+        # Панели строятся один раз и перепривязываются к выбранному конфигу:
+        # вкладка «Общее» — одна на всех, «Контент» — по одной на тип виджета
+        self.general_binder = ConfigBinder(self._update_val)
+        self.content_panels = {}  # тип -> (страница, ConfigBinder) или None, если настроек нет
+        self.content_binder = None
         
         self.setWindowTitle("ChronoDash — Настройки")
         self.resize(1000, 650)
         self._init_ui()
-        self.refresh_list()
         
         # ПОДПИСКА НА ОБНОВЛЕНИЯ ОТ МЕНЕДЖЕРА
-        self.wm.widget_config_updated.connect(self._on_external_config_update)
+        # Поля геометрии обновляем только когда менялась геометрия текущего виджета
+        self.wm.widget_keys_changed.connect(self._on_external_keys_changed)
+        self.wm.widgets_changed.connect(self._on_widgets_changed)
+        self.wm.edit_mode_changed.connect(self._on_edit_mode_changed)
 
     def _init_ui(self):
         # ... (Код UI без изменений, копируем из предыдущего) ...
@@ -35,6 +93,7 @@ class SettingsWindow(QWidget):
         
         add_layout = QHBoxLayout()
         self.type_combo = QComboBox() 
+        self.type_combo.addItems([t for t in MODULES.keys() if t != "custom_builder"])
         btn_create = QPushButton("Создать")
         btn_create.clicked.connect(self._add_standard_widget)
         add_layout.addWidget(self.type_combo, 1)
@@ -47,9 +106,33 @@ class SettingsWindow(QWidget):
         self.btn_import.setVisible(False) 
         left_layout.addWidget(self.btn_import)
         
-        self.list_widget = QListWidget()
-        self.list_widget.currentRowChanged.connect(self._on_selection_changed)
-        left_layout.addWidget(self.list_widget)
+        # Поиск: по имени/типу + фильтр по типу
+        search_layout = QHBoxLayout()
+        self.search_edit = QLineEdit()
+        self.search_edit.setPlaceholderText("Поиск по имени или типу...")
+        self.search_edit.setClearButtonEnabled(True)
+        self.type_filter = QComboBox()
+        self.type_filter.addItem("Все типы", "")
+        for t in MODULES.keys():
+            self.type_filter.addItem(t, t)
+        search_layout.addWidget(self.search_edit, 1)
+        search_layout.addWidget(self.type_filter, 0)
+        left_layout.addLayout(search_layout)
+
+        self.list_model = WidgetListModel(self.wm, self)
+        self.list_proxy = WidgetFilterProxy(self)
+        self.list_proxy.setSourceModel(self.list_model)
+        self.search_edit.textChanged.connect(self.list_proxy.set_query)
+        self.type_filter.currentIndexChanged.connect(
+            lambda _: self.list_proxy.set_type(self.type_filter.currentData())
+        )
+
+        self.list_view = QListView()
+        self.list_view.setModel(self.list_proxy)
+        self.list_view.setUniformItemSizes(True)  # Без замера каждой строки — важно для тысяч виджетов
+        self.list_view.setIconSize(QSize(64, 36))
+        self.list_view.selectionModel().currentChanged.connect(self._on_selection_changed)
+        left_layout.addWidget(self.list_view)
         
         btn_layout = QHBoxLayout()
         self.btn_edit_mode = QPushButton("Режим перемещения")
@@ -65,175 +148,191 @@ class SettingsWindow(QWidget):
         splitter.addWidget(left_panel)
         
         self.right_panel = QTabWidget()
+        self.right_panel.addTab(self._build_general_tab(), "Общее")
+        self.content_stack = QStackedWidget()
+        self.right_panel.addTab(self.content_stack, "Контент")
+        self.right_panel.setVisible(False)  # Пока ничего не выбрано
         splitter.addWidget(self.right_panel)
         splitter.setSizes([300, 700])
 
-    # ... (refresh_list, _add_standard_widget, _import_custom_widget и др. без изменений) ...
-    def refresh_list(self):
-        current_row = self.list_widget.currentRow()
-        self.list_widget.clear()
-        configs = self.wm.get_all_configs()
-        for cfg in configs:
-            name = cfg.get("name", "Widget")
-            w_type = cfg.get("type", "?")
-            self.list_widget.addItem(f"{name}  [{w_type}]")
-        if current_row >= 0 and current_row < self.list_widget.count():
-            self.list_widget.setCurrentRow(current_row)
-        
-        self.type_combo.clear()
-        all_types = list(MODULES.keys())
-        use_builder = self.wm.get_global_setting("use_builder", False)
-        self.btn_import.setVisible(use_builder)
-        standard_types = [t for t in all_types if t != "custom_builder"]
-        self.type_combo.addItems(standard_types)
-
-    def _add_standard_widget(self):
-        w_type = self.type_combo.currentText()
-        if not w_type: return
-        template = get_default_config(w_type)
-        self.wm.create_widget_from_template(template)
-        self.refresh_list()
-        self.list_widget.setCurrentRow(self.list_widget.count() - 1)
-
-    def _import_custom_widget(self):
-        path, _ = QFileDialog.getOpenFileName(self, "Импорт виджета", "", "Chrono Widget (*.wgt *.json)")
-        if not path: return
-        from widgets.builder_widget import read_widget_metadata
-        root_data = read_widget_metadata(path)
-        if not root_data:
-            QMessageBox.warning(self, "Ошибка", "Не удалось прочитать файл виджета.")
-            return
-        template = get_default_config("custom_builder")
-        template["name"] = root_data.get("name", "Imported Widget")
-        template["width"] = int(root_data.get("width", 300))
-        template["height"] = int(root_data.get("height", 200))
-        template["content"]["file_path"] = path
-        self.wm.create_widget_from_template(template)
-        self.refresh_list()
-        self.list_widget.setCurrentRow(self.list_widget.count() - 1)
-
-    def _delete_widget(self):
-        if not self.current_widget_id: return
-        reply = QMessageBox.question(self, "Удаление", "Удалить виджет безвозвратно?", QMessageBox.Yes | QMessageBox.No)
-        if reply == QMessageBox.Yes:
-            self.wm.delete_widget(self.current_widget_id)
-            self.current_widget_id = None
-            self.right_panel.clear()
-            self.refresh_list()
-
-    def _toggle_edit_mode(self, active):
-        if not self.current_widget_id: 
-            self.btn_edit_mode.setChecked(False)
-            return
-        if active:
-            self.wm.enter_edit_mode(self.current_widget_id)
-            if self.wm.overlay:
-                self.wm.overlay.stop_edit_signal.connect(lambda: self.btn_edit_mode.setChecked(False))
-        else:
-            self.wm.exit_edit_mode()
-
-    def _on_selection_changed(self, row):
-        if row < 0: return
-        configs = self.wm.get_all_configs()
-        if row < len(configs):
-            cfg = configs[row]
-            self.current_widget_id = cfg["id"]
-            self._load_settings_tabs(cfg)
-
-    def _load_settings_tabs(self, cfg):
-        self.right_panel.clear()
-        self.geo_inputs = {} # Очищаем ссылки
-        
-        # TAB 1: Общее
+    def _build_general_tab(self):
+        bind = self.general_binder.bind
         tab_general = QWidget()
         layout_g = QVBoxLayout(tab_general)
         
         layout_g.addWidget(QLabel("Имя виджета:"))
-        entry_name = QLineEdit(cfg.get("name", ""))
-        entry_name.textChanged.connect(lambda v: self._update_val(cfg, "name", v, refresh_list=True))
-        layout_g.addWidget(entry_name)
+        layout_g.addWidget(bind(QLineEdit(), "name", ""))
         
         layout_g.addWidget(QLabel("Прозрачность:"))
         slider_op = QSlider(Qt.Horizontal)
         slider_op.setRange(10, 100)
-        slider_op.setValue(int(cfg.get("opacity", 1.0) * 100))
-        slider_op.valueChanged.connect(lambda v: self._update_val(cfg, "opacity", v / 100.0))
+        bind(slider_op, "opacity", 1.0, to_editor=lambda v: int(v * 100), from_editor=lambda v: v / 100.0)
         layout_g.addWidget(slider_op)
         
-        # ГЕОМЕТРИЯ
+        # ГЕОМЕТРИЯ (обновляется и при перетаскивании виджета — см. _on_external_keys_changed)
         coord_layout = QHBoxLayout()
-        for key in ["x", "y", "width", "height"]:
+        for key in GEOMETRY_KEYS:
             coord_layout.addWidget(QLabel(f"{key.upper()}:"))
             sb = QSpinBox()
             sb.setRange(-10000, 10000)
-            sb.setValue(int(cfg.get(key, 0)))
-            
-            # Сохраняем ссылку на SpinBox, чтобы потом обновлять его при драге
-            self.geo_inputs[key] = sb
-            
-            sb.valueChanged.connect(lambda v, k=key: self._update_val(cfg, k, v, refresh_geometry=True))
-            coord_layout.addWidget(sb)
+            coord_layout.addWidget(bind(sb, key, 0))
         layout_g.addLayout(coord_layout)
         
-        cb_top = QCheckBox("Поверх всех окон")
-        cb_top.setChecked(cfg.get("always_on_top", False))
-        cb_top.toggled.connect(lambda v: self._update_val(cfg, "always_on_top", v))
-        layout_g.addWidget(cb_top)
-        
-        cb_click = QCheckBox("Клик насквозь")
-        cb_click.setChecked(cfg.get("click_through", True))
-        cb_click.toggled.connect(lambda v: self._update_val(cfg, "click_through", v))
-        layout_g.addWidget(cb_click)
+        layout_g.addWidget(bind(QCheckBox("Поверх всех окон"), "always_on_top", True))
+        layout_g.addWidget(bind(QCheckBox("Клик насквозь"), "click_through", True))
         
         layout_g.addStretch()
-        self.right_panel.addTab(tab_general, "Общее")
-        
-        # TAB 2: Контент
-        module = get_module(cfg.get("type"))
+        return tab_general
+
+    def _content_panel(self, w_type):
+        """Панель «Контент» для типа: строится при первом выборе виджета этого типа."""
+        if w_type in self.content_panels:
+            return self.content_panels[w_type]
+        module = get_module(w_type)
+        panel = None
         if module and hasattr(module, "render_qt_settings"):
-            tab_content = QWidget()
+            binder = ConfigBinder(self._update_val)
             scroll = QScrollArea()
             scroll.setWidgetResizable(True)
             scroll.setFrameShape(QFrame.NoFrame)
             content_widget = QWidget()
             content_layout = QVBoxLayout(content_widget)
             
-            module.render_qt_settings(content_layout, cfg, lambda path, val: self._update_nested_val(cfg, path, val))
+            # cfg — только для начальных значений; все правки идут через binder в текущий конфиг
+            module.render_qt_settings(content_layout, get_default_config(w_type), binder)
             
             content_layout.addStretch()
             scroll.setWidget(content_widget)
-            
-            t_layout = QVBoxLayout(tab_content)
-            t_layout.setContentsMargins(0,0,0,0)
-            t_layout.addWidget(scroll)
-            self.right_panel.addTab(tab_content, "Контент")
+            self.content_stack.addWidget(scroll)
+            panel = (scroll, binder)
+        self.content_panels[w_type] = panel
+        return panel
+
+    def showEvent(self, event):
+        # Visual Builder могли включить в DevTools, пока окно было скрыто
+        self.btn_import.setVisible(self.wm.get_global_setting("use_builder", False))
+        super().showEvent(event)
+
+    def select_widget(self, wid):
+        """Выделить виджет по id (если его прячет фильтр — фильтр сбрасываем)."""
+        row = self.list_model.row_of(wid)
+        if row < 0: return
+        idx = self.list_proxy.mapFromSource(self.list_model.index(row))
+        if not idx.isValid():
+            self.search_edit.clear()
+            self.type_filter.setCurrentIndex(0)
+            idx = self.list_proxy.mapFromSource(self.list_model.index(row))
+        self.list_view.setCurrentIndex(idx)
+        self.list_view.scrollTo(idx)
+
+    def _add_standard_widget(self):
+        w_type = self.type_combo.currentText()
+        if not w_type: return
+        template = get_default_config(w_type)
+        self.select_widget(self.wm.create_widget_from_template(template))
+
+    def _import_custom_widget(self):
+        paths, _ = QFileDialog.getOpenFileNames(self, "Импорт виджетов", "", "Chrono Widget (*.wgt *.json)")
+        if not paths: return
+        from widgets.builder_widget import read_widget_metadata
+        failed = []
+        last_id = None
+        # Все файлы — одним пакетом: одна запись конфига и одно обновление списка
+        with self.wm.batch():
+            for path in paths:
+                root_data = read_widget_metadata(path)
+                if not root_data:
+                    failed.append(Path(path).name)
+                    continue
+                template = get_default_config("custom_builder")
+                template["name"] = root_data.get("name", "Imported Widget")
+                template["width"] = int(root_data.get("width", 300))
+                template["height"] = int(root_data.get("height", 200))
+                template["content"]["file_path"] = path
+                last_id = self.wm.create_widget_from_template(template)
+        if failed:
+            QMessageBox.warning(self, "Ошибка", "Не удалось прочитать файл виджета:\n" + "\n".join(failed))
+        if last_id:
+            self.select_widget(last_id)
+
+    def _delete_widget(self):
+        if not self.current_widget_id: return
+        reply = QMessageBox.question(self, "Удаление", "Удалить виджет безвозвратно?", QMessageBox.Yes | QMessageBox.No)
+        if reply == QMessageBox.Yes:
+            self.apply_queue.flush()
+            self.wm.delete_widget(self.current_widget_id)
+
+    def _toggle_edit_mode(self, active):
+        if not self.current_widget_id: 
+            self.btn_edit_mode.setChecked(False)
+            return
+        self.apply_queue.flush()
+        if active:
+            self.wm.enter_edit_mode(self.current_widget_id)
+        else:
+            self.wm.exit_edit_mode()
+
+    def _on_edit_mode_changed(self, active):
+        # Выход по ESC на оверлее — отжимаем кнопку
+        if not active:
+            self.btn_edit_mode.setChecked(False)
+
+    def _on_selection_changed(self, current, previous=None):
+        self.apply_queue.flush()
+        if not current.isValid(): return
+        wid = current.data(ID_ROLE)
+        cfg = self.list_model.config(wid)
+        if cfg is None or wid == self.current_widget_id: return
+        self.current_widget_id = wid
+        self._load_settings_tabs(cfg)
+
+    def _load_settings_tabs(self, cfg):
+        self.general_binder.load(cfg)
+        
+        panel = self._content_panel(cfg.get("type"))
+        if self.content_binder is not None:
+            self.content_binder.unbind()
+        self.content_binder = None
+        if panel is not None:
+            page, self.content_binder = panel
+            self.content_binder.load(cfg)
+            self.content_stack.setCurrentWidget(page)
+        self.right_panel.setTabVisible(1, panel is not None)
+        self.right_panel.setVisible(True)
+
+    def _unload_settings_tabs(self):
+        self.current_widget_id = None
+        self.general_binder.unbind()
+        if self.content_binder is not None:
+            self.content_binder.unbind()
+            self.content_binder = None
+        self.right_panel.setVisible(False)
 
     # === СЛОТ ОБНОВЛЕНИЯ ИЗВНЕ ===
-    def _on_external_config_update(self, wid, new_cfg):
+    def _on_external_keys_changed(self, wid, keys):
         if wid != self.current_widget_id: return
-        
-        # Обновляем поля, только если значения отличаются (чтобы не спамить)
-        for key in ["x", "y", "width", "height"]:
-            if key in self.geo_inputs:
-                sb = self.geo_inputs[key]
-                val = int(new_cfg.get(key, 0))
-                if sb.value() != val:
-                    sb.blockSignals(True) # ВАЖНО: Блокируем, чтобы не было цикла
-                    sb.setValue(val)
-                    sb.blockSignals(False)
-
-    def _update_val(self, cfg, key, value, refresh_list=False, refresh_geometry=False):
-        cfg[key] = value
-        self.wm.update_widget_config(cfg["id"], cfg)
-        if refresh_list:
-            item = self.list_widget.currentItem()
-            if item: item.setText(f"{value}  [{cfg.get('type')}]")
-        if refresh_geometry:
-            self.wm.update_widget_config(cfg["id"], cfg)
-
-    def _update_nested_val(self, cfg, path, value):
-        keys = path.split('.')
-        target = cfg
-        for k in keys[:-1]: target = target.setdefault(k, {})
-        target[keys[-1]] = value
-        self.wm.update_widget_config(cfg["id"], cfg)
\ No newline at end of file
+        # Не из модели списка: она обновляет свои ссылки только в widgets_changed,
+        # который менеджер шлет уже после этого сигнала
+        new_cfg = self.wm.get_config(wid)
+        if new_cfg is None: return
+        if new_cfg is not self.general_binder.cfg:
+            # Менеджер заменил dict целиком — перепривязываемся к новому
+            self._load_settings_tabs(new_cfg)
+        elif touches(keys, *GEOMETRY_KEYS):
+            # Только поля геометрии (при драге); сигналы редакторов на время load не пишут в конфиг
+            self.general_binder.load(new_cfg, paths=GEOMETRY_KEYS)
+
+    def _on_widgets_changed(self, changes):
+        """Список обновляет сама модель; здесь — только закрыть настройки удаленного виджета."""
+        if self.current_widget_id in changes["removed"]:
+            self._unload_settings_tabs()
+
+    def _update_val(self, cfg, key, value):
+        # Визуальные поля (в т.ч. геометрия) применяются мгновенно, остальное — после паузы
+        self.apply_queue.set_value(cfg, key, value)
+        if key == "name":
+            self.list_model.refresh(cfg["id"])
+
+    def closeEvent(self, event):
+        self.apply_queue.flush()
+        super().closeEvent(event)
\ No newline at end of file
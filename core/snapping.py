@@ -0,0 +1,129 @@
+# ChronoDash - Base Widget
+# Copyright (C) 2025 Overl1te
+
+"""
+Магнитное выравнивание виджетов в режиме редактирования.
+
+SnapIndex хранит линии привязки (левый/центр/правый край по X,
+верх/центр/низ по Y) всех виджетов и экранов в отсортированных списках.
+Запрос «ближайшая линия в пределах N пикселей» — это bisect, поэтому
+даже при сотнях виджетов выравнивание на каждый кадр драга почти бесплатно.
+
+Прямоугольники — кортежи (left, top, right, bottom), right/bottom
+не включительно: у соприкасающихся виджетов общая линия.
+"""
+
+import bisect
+
+SNAP_DISTANCE = 8
+
+EDGE_MIN = "min"        # left / top
+EDGE_CENTER = "center"
+EDGE_MAX = "max"        # right / bottom
+
+MOVE_EDGES = (EDGE_MIN, EDGE_CENTER, EDGE_MAX)
+
+
+def rect_lines(rect):
+    """(l, t, r, b) → {"x": [(линия, span_lo, span_hi), ...], "y": [...]}."""
+    l, t, r, b = rect
+    return {
+        "x": [(l, t, b), ((l + r) // 2, t, b), (r, t, b)],
+        "y": [(t, l, r), ((t + b) // 2, l, r), (b, l, r)],
+    }
+
+
+class SnapIndex:
+    def __init__(self):
+        # Для каждой оси: отсортированные значения линий и параллельный список (владелец, lo, hi)
+        self._keys = {"x": [], "y": []}
+        self._items = {"x": [], "y": []}
+        self._rects = {}
+
+    def __len__(self):
+        return len(self._rects)
+
+    def set_rect(self, owner, rect):
+        if self._rects.get(owner) == rect: return
+        self.remove(owner)
+        self._rects[owner] = rect
+        for axis, lines in rect_lines(rect).items():
+            keys, items = self._keys[axis], self._items[axis]
+            for value, lo, hi in lines:
+                pos = bisect.bisect_right(keys, value)
+                keys.insert(pos, value)
+                items.insert(pos, (owner, lo, hi))
+
+    def remove(self, owner):
+        rect = self._rects.pop(owner, None)
+        if rect is None: return
+        for axis, lines in rect_lines(rect).items():
+            keys, items = self._keys[axis], self._items[axis]
+            for value, _, _ in lines:
+                pos = bisect.bisect_left(keys, value)
+                while pos < len(keys) and keys[pos] == value:
+                    if items[pos][0] == owner:
+                        del keys[pos]
+                        del items[pos]
+                        break
+                    pos += 1
+
+    def remove_prefix(self, prefix: str):
+        for owner in [o for o in self._rects if str(o).startswith(prefix)]:
+            self.remove(owner)
+
+    def nearest(self, axis, value, distance, exclude=()):
+        """
+        Ближайшая линия в пределах distance: (значение, lo, hi) или None.
+        exclude — владельцы, чьи линии не учитываются (сам виджет, его группа).
+        """
+        keys, items = self._keys[axis], self._items[axis]
+        best = None
+        pos = bisect.bisect_left(keys, value - distance)
+        end = bisect.bisect_right(keys, value + distance)
+        for i in range(pos, end):
+            owner, lo, hi = items[i]
+            if owner in exclude: continue
+            if best is None or abs(keys[i] - value) < abs(best[0] - value):
+                best = (keys[i], lo, hi)
+        return best
+
+    def snap(self, rect, x_edges=MOVE_EDGES, y_edges=MOVE_EDGES, exclude=(), distance=SNAP_DISTANCE):
+        """
+        Притягивает прямоугольник к ближайшим линиям.
+
+        x_edges/y_edges — какие края участвуют: при перемещении все три
+        (и сдвигается весь прямоугольник), при ресайзе — только тянущийся край.
+        Возвращает (новый rect, направляющие), направляющая — (ось, линия, lo, hi).
+        """
+        l, t, r, b = rect
+        guides = []
+        bounds = {"x": [l, r], "y": [t, b]}
+
+        for axis, edges in (("x", x_edges), ("y", y_edges)):
+            lo, hi = bounds[axis]
+            candidates = {EDGE_MIN: lo, EDGE_CENTER: (lo + hi) // 2, EDGE_MAX: hi}
+            best = None
+            for edge in edges:
+                hit = self.nearest(axis, candidates[edge], distance, exclude)
+                if hit and (best is None or abs(hit[0] - candidates[edge]) < abs(best[1][0] - candidates[best[0]])):
+                    best = (edge, hit)
+            if best is None: continue
+
+            edge, (line, g_lo, g_hi) = best
+            delta = line - candidates[edge]
+            if len(edges) > 1:
+                bounds[axis] = [lo + delta, hi + delta]
+            elif edge == EDGE_MIN:
+                bounds[axis][0] = lo + delta
+            else:
+                bounds[axis][1] = hi + delta
+            guides.append((axis, line, g_lo, g_hi))
+
+        # Направляющие должны тянуться вдоль уже сдвинутого прямоугольника
+        (l, r), (t, b) = bounds["x"], bounds["y"]
+        guides = [
+            (axis, line, min(lo, t if axis == "x" else l), max(hi, b if axis == "x" else r))
+            for axis, line, lo, hi in guides
+        ]
+        return (l, t, r, b), guides
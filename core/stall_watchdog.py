@@ -0,0 +1,140 @@
+# ChronoDash - Base Widget
+# Copyright (C) 2025 Overl1te
+
+"""
+Сторожевой таймер цикла событий.
+
+GUI-поток раз в полпорога отмечается таймером (heartbeat). Фоновый поток
+следит за отметками: если их нет дольше порога — цикл событий занят
+(синхронный запрос, распаковка .wgt, json.dump большого конфига...).
+В этот момент снимается Python-стек главного потока через
+sys._current_frames(), а когда цикл оживает — зависание с длительностью
+и стеком уходит в лог, в историю и в сигнал stall_detected.
+
+Стек снимается один раз, в момент превышения порога: он показывает, на чем
+цикл стоит, а не что было до этого.
+"""
+
+import sys
+import threading
+import time
+import traceback
+from collections import deque, Counter
+
+from PySide6.QtCore import QObject, QTimer, Signal
+
+from core.log_service import get_logger
+
+DEFAULT_THRESHOLD_MS = 500
+MIN_THRESHOLD_MS = 100
+HISTORY_SIZE = 50           # Сколько последних зависаний хранить со стеками
+STACK_DEPTH = 25            # Кадров стека в отчете
+
+log = get_logger("watchdog")
+
+
+class StallWatchdog(QObject):
+    # {"started": time.time(), "duration_ms", "location", "stack"} — уже в GUI-потоке
+    stall_detected = Signal(dict)
+
+    def __init__(self, threshold_ms=DEFAULT_THRESHOLD_MS):
+        super().__init__()
+        self.threshold_ms = max(MIN_THRESHOLD_MS, int(threshold_ms))
+        self.history = deque(maxlen=HISTORY_SIZE)
+        self.by_location = Counter()   # "файл:строка (функция)" -> количество
+        self.stats = {"count": 0, "total_ms": 0.0, "max_ms": 0.0}
+
+        self._main_ident = threading.main_thread().ident
+        self._last_beat = time.monotonic()
+        self._pending = None      # Снятый стек текущего зависания
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+        self._heartbeat = QTimer(self)
+        self._heartbeat.timeout.connect(self._beat)
+
+    @property
+    def running(self):
+        return self._thread is not None
+
+    def _interval_ms(self):
+        return self.threshold_ms // 2
+
+    def set_threshold(self, threshold_ms):
+        self.threshold_ms = max(MIN_THRESHOLD_MS, int(threshold_ms))
+        if self.running:
+            self._heartbeat.setInterval(self._interval_ms())
+
+    def start(self):
+        if self.running: return
+        self._last_beat = time.monotonic()
+        self._stop.clear()
+        self._heartbeat.start(self._interval_ms())
+        self._thread = threading.Thread(target=self._watch, name="StallWatchdog", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        if not self.running: return
+        self._heartbeat.stop()
+        self._stop.set()
+        self._thread.join(timeout=1.0)
+        self._thread = None
+        with self._lock:
+            self._pending = None
+
+    # --- GUI-поток ---
+    def _beat(self):
+        now = time.monotonic()
+        with self._lock:
+            stalled_s = now - self._last_beat - self._interval_ms() / 1000
+            self._last_beat = now
+            pending, self._pending = self._pending, None
+        if pending is not None:
+            self._record(pending, stalled_s * 1000)
+
+    def _record(self, pending, duration_ms):
+        stall = dict(pending, duration_ms=duration_ms)
+        self.history.append(stall)
+        self.by_location[stall["location"]] += 1
+        self.stats["count"] += 1
+        self.stats["total_ms"] += duration_ms
+        self.stats["max_ms"] = max(self.stats["max_ms"], duration_ms)
+        log.warning(f"[Watchdog] UI stalled for {duration_ms:.0f} ms at {stall['location']}\n{stall['stack']}")
+        self.stall_detected.emit(stall)
+
+    # --- Фоновый поток ---
+    def _watch(self):
+        while not self._stop.wait(self._interval_ms() / 4000):
+            with self._lock:
+                if self._pending is not None: continue
+                lag_ms = (time.monotonic() - self._last_beat) * 1000 - self._interval_ms()
+            if lag_ms < self.threshold_ms: continue
+
+            frame = sys._current_frames().get(self._main_ident)
+            if frame is None: continue
+            summary = traceback.extract_stack(frame, limit=STACK_DEPTH)
+            top = summary[-1] if summary else None
+            pending = {
+                "started": time.time() - lag_ms / 1000,
+                "location": f"{top.filename}:{top.lineno} ({top.name})" if top else "?",
+                "stack": "".join(traceback.format_list(summary)),
+            }
+            del frame
+            with self._lock:
+                self._pending = pending
+
+    def reset_stats(self):
+        self.history.clear()
+        self.by_location.clear()
+        self.stats = {"count": 0, "total_ms": 0.0, "max_ms": 0.0}
+
+
+_watchdog = None
+
+
+def get_stall_watchdog() -> StallWatchdog:
+    global _watchdog
+    if _watchdog is None:
+        _watchdog = StallWatchdog()
+    return _watchdog
@@ -0,0 +1,221 @@
+# ChronoDash - Base Widget
+# Copyright (C) 2025 Overl1te
+
+"""
+Миниатюры виджетов для списка в настройках.
+
+- Ключ миниатюры — хэш конфига без позиции на экране: перетаскивание
+  виджета не делает миниатюру устаревшей, а правка контента — делает.
+- Кэш на диске: <config_dir>/thumbnails/<ключ>.png. Чтение, декодирование,
+  масштабирование и запись PNG идут в пуле IOService (QImage потокобезопасен).
+  Файл устаревшего ключа удаляется, как только виджет получил новый ключ
+  (или был удален), а при запуске каталог урезается до DISK_LIMIT файлов.
+- Отрисовать виджет можно только в GUI-потоке (это QWidget), поэтому промахи
+  рисуются по очереди, не дольше RENDER_BUDGET_MS за один проход цикла событий.
+"""
+
+import hashlib
+import json
+import time
+from collections import OrderedDict, deque
+from pathlib import Path
+
+from PySide6.QtCore import QObject, Signal, QTimer, QSize, Qt, QStandardPaths
+from PySide6.QtGui import QImage
+
+from core.io_service import get_io_service, PRIORITY_LOW
+from core.tracing import traced
+
+THUMB_SIZE = QSize(128, 72)
+THUMB_DIR_NAME = "thumbnails"
+MEMORY_LIMIT = 512          # Сколько миниатюр держать в памяти
+DISK_LIMIT = 2000           # Сколько PNG держать на диске (лишние — самые старые)
+RENDER_BUDGET_MS = 8        # Время на отрисовку за один тик, чтобы не подвешивать интерфейс
+
+# Поля, не влияющие на вид миниатюры
+IGNORED_KEYS = ("x", "y", "id", "name", "opacity", "always_on_top", "click_through")
+
+
+def thumbnail_key(cfg: dict) -> str:
+    visual = {k: v for k, v in cfg.items() if k not in IGNORED_KEYS}
+    raw = json.dumps(visual, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()[:20]
+
+
+def _load_image(path: Path):
+    """Выполняется в рабочем потоке."""
+    if not path.exists():
+        return None
+    image = QImage(str(path))
+    return None if image.isNull() else image
+
+
+def _scale_and_store(image: QImage, path: Path) -> QImage:
+    """Выполняется в рабочем потоке."""
+    thumb = image.scaled(THUMB_SIZE, Qt.KeepAspectRatio, Qt.SmoothTransformation)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    if not thumb.save(str(path), "PNG"):
+        print(f"[Thumbnails] Save error: {path}")
+    return thumb
+
+
+def _delete_files(paths):
+    """Выполняется в рабочем потоке."""
+    for path in paths:
+        try:
+            path.unlink(missing_ok=True)
+        except OSError as e:
+            print(f"[Thumbnails] Delete error: {path}: {e}")
+    return len(paths)
+
+
+def _prune_dir(cache_dir: Path, limit: int) -> int:
+    """Выполняется в рабочем потоке: оставить limit самых свежих PNG."""
+    if not cache_dir.is_dir(): return 0
+    files = sorted(cache_dir.glob("*.png"), key=lambda p: p.stat().st_mtime, reverse=True)
+    return _delete_files(files[limit:])
+
+
+class ThumbnailProvider(QObject):
+    # id виджета, для которого появилась (новая) миниатюра
+    thumbnail_ready = Signal(str)
+
+    def __init__(self, cache_dir: Path):
+        super().__init__()
+        self.cache_dir = cache_dir
+        self.stats = {"memory_hits": 0, "disk_hits": 0, "renders": 0}
+        self._images = OrderedDict()  # ключ -> QImage (LRU)
+        self._keys = {}               # id -> ключ текущего конфига
+        self._stale = {}              # id -> прежний ключ, пока новый не посчитан
+        self._pending = {}            # ключ -> {id, ...}, ждущие загрузки/отрисовки
+        self._render_queue = deque()  # (ключ, cfg)
+
+        self._render_timer = QTimer(self)
+        self._render_timer.setSingleShot(True)
+        self._render_timer.timeout.connect(self._render_some)
+
+    def _path(self, key: str) -> Path:
+        return self.cache_dir / f"{key}.png"
+
+    def invalidate(self, wid):
+        """Конфиг виджета изменился — ключ пересчитаем при следующем запросе."""
+        key = self._keys.pop(wid, None)
+        if key is not None:
+            self._stale.setdefault(wid, key)
+
+    def forget(self, wid):
+        """Виджет удален — его миниатюра больше не нужна."""
+        self.invalidate(wid)
+        self._drop_key(self._stale.pop(wid, None))
+
+    def _drop_key(self, key):
+        """Удалить миниатюру ключа, если ее не использует ни один виджет."""
+        if key is None or key in self._pending: return
+        if key in self._keys.values() or key in self._stale.values(): return
+        self._images.pop(key, None)
+        get_io_service().submit(_delete_files, [self._path(key)],
+                                priority=PRIORITY_LOW, owner=self, tag="thumbnail")
+
+    def prune_disk(self, limit=DISK_LIMIT):
+        get_io_service().submit(_prune_dir, self.cache_dir, limit,
+                                priority=PRIORITY_LOW, owner=self, tag="thumbnail")
+
+    def get(self, wid, cfg):
+        """QImage миниатюры или None (тогда она будет готова позже — см. thumbnail_ready)."""
+        key = self._keys.get(wid)
+        if key is None:
+            key = self._keys[wid] = thumbnail_key(cfg)
+            old = self._stale.pop(wid, None)
+            if old != key:
+                self._drop_key(old)
+
+        image = self._images.get(key)
+        if image is not None:
+            self._images.move_to_end(key)
+            self.stats["memory_hits"] += 1
+            return image
+
+        waiters = self._pending.get(key)
+        if waiters is not None:
+            waiters.add(wid)
+            return None
+        self._pending[key] = {wid}
+        snapshot = json.loads(json.dumps(cfg, default=str))  # рисуем именно эту версию конфига
+        get_io_service().submit(
+            _load_image, self._path(key),
+            on_result=lambda image: self._on_loaded(key, snapshot, image),
+            on_error=lambda e: self._on_loaded(key, snapshot, None),
+            priority=PRIORITY_LOW, owner=self, tag="thumbnail"
+        )
+        return None
+
+    def _on_loaded(self, key, cfg, image):
+        if image is not None:
+            self.stats["disk_hits"] += 1
+            self._store(key, image)
+            return
+        self._render_queue.append((key, cfg))
+        if not self._render_timer.isActive():
+            self._render_timer.start(0)
+
+    @traced("thumbnails.render", "timer")
+    def _render_some(self):
+        from widgets.base_widget import BaseDesktopWidget
+
+        started = time.perf_counter()
+        while self._render_queue and (time.perf_counter() - started) * 1000 < RENDER_BUDGET_MS:
+            key, cfg = self._render_queue.popleft()
+            try:
+                image = BaseDesktopWidget.render_to_pixmap(cfg).toImage()
+            except Exception as e:
+                print(f"[Thumbnails] Render error ({cfg.get('type')}): {e}")
+                self._pending.pop(key, None)
+                continue
+            self.stats["renders"] += 1
+            get_io_service().submit(
+                _scale_and_store, image, self._path(key),
+                on_result=lambda thumb, k=key: self._store(k, thumb),
+                on_error=lambda e, k=key: self._on_store_failed(k, e),
+                priority=PRIORITY_LOW, owner=self, tag="thumbnail"
+            )
+        if self._render_queue:
+            self._render_timer.start(0)
+
+    def _on_store_failed(self, key, error):
+        # Без этого ключ навсегда остался бы в ожидании и миниатюра не появилась бы до перезапуска
+        print(f"[Thumbnails] Scale/store error: {error}")
+        self._pending.pop(key, None)
+
+    def _store(self, key, image):
+        self._images[key] = image
+        self._images.move_to_end(key)
+        while len(self._images) > MEMORY_LIMIT:
+            self._images.popitem(last=False)
+        for wid in self._pending.pop(key, ()):
+            if self._keys.get(wid) == key:
+                self.thumbnail_ready.emit(wid)
+
+    def clear(self):
+        self._images.clear()
+        self._keys.clear()
+        self._stale.clear()
+        self._pending.clear()
+        self._render_queue.clear()
+
+    def clear_disk(self) -> int:
+        """Удалить все PNG из каталога кэша (только свои файлы, сам каталог не трогаем)."""
+        if not self.cache_dir.is_dir(): return 0
+        files = list(self.cache_dir.glob("*.png"))
+        return _delete_files(files)
+
+
+_provider = None
+
+
+def get_thumbnail_provider() -> ThumbnailProvider:
+    global _provider
+    if _provider is None:
+        config_dir = Path(QStandardPaths.writableLocation(QStandardPaths.AppConfigLocation))
+        _provider = ThumbnailProvider(config_dir / THUMB_DIR_NAME)
+        _provider.prune_disk()
+    return _provider
@@ -0,0 +1,205 @@
+# ChronoDash - Base Widget
+# Copyright (C) 2025 Overl1te
+
+"""
+Запись трассы в формате Chrome trace events (открывается в Perfetto
+или chrome://tracing).
+
+Выключено по умолчанию: span() тогда возвращает общий пустой контекст,
+а traced() — одну проверку флага, так что инструментированный код почти
+ничего не теряет. Включается из DevTools, переменной окружения
+CHRONODASH_TRACE=1 или сигналом SIGUSR2 (Linux); SIGUSR1 сохраняет то,
+что накопилось, в <config_dir>/traces/.
+
+Пример:
+    with span("config.save", "io", {"widgets": len(cfg)}):
+        ...
+
+    @traced("clock.tick", "timer")
+    def _start_clock(self): ...
+"""
+
+import contextlib
+import functools
+import json
+import os
+import signal
+import socket
+import threading
+import time
+from collections import deque
+from pathlib import Path
+
+from PySide6.QtCore import QObject, Signal, QSocketNotifier, QStandardPaths
+
+MAX_EVENTS = 200_000        # Кольцевой буфер: при долгой записи старое вытесняется
+TRACE_DIR_NAME = "traces"
+TRACE_ENV = "CHRONODASH_TRACE"
+
+_NULL_SPAN = contextlib.nullcontext()
+
+
+class _Span:
+    __slots__ = ("tracer", "name", "cat", "args", "start")
+
+    def __init__(self, tracer, name, cat, args):
+        self.tracer = tracer
+        self.name = name
+        self.cat = cat
+        self.args = args
+
+    def __enter__(self):
+        self.start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, *exc):
+        self.tracer.add_complete(self.name, self.cat, self.start, time.perf_counter_ns(), self.args)
+        return False
+
+
+class Tracer(QObject):
+    # Путь сохраненного файла трассы (в GUI-потоке)
+    trace_saved = Signal(str)
+    # Запись включена / выключена
+    recording_changed = Signal(bool)
+
+    def __init__(self, trace_dir: Path):
+        super().__init__()
+        self.trace_dir = trace_dir
+        self.enabled = False
+        self._events = deque(maxlen=MAX_EVENTS)  # (name, cat, start_ns, end_ns, tid, args)
+        self._threads = {}                       # tid -> имя потока
+        self._origin_ns = time.perf_counter_ns()
+        self._signal_notifier = None
+
+    def start(self):
+        if self.enabled: return
+        self._events.clear()
+        self._threads.clear()
+        self._origin_ns = time.perf_counter_ns()
+        self.enabled = True
+        print("[Trace] Recording started")
+        self.recording_changed.emit(True)
+
+    def stop(self):
+        if not self.enabled: return
+        self.enabled = False
+        print(f"[Trace] Recording stopped, events: {len(self._events)}")
+        self.recording_changed.emit(False)
+
+    def __len__(self):
+        return len(self._events)
+
+    def add_complete(self, name, cat, start_ns, end_ns, args=None):
+        # deque.append атомарен, запись идет и из рабочих потоков IOService
+        tid = threading.get_ident()
+        if tid not in self._threads:
+            thread = threading.current_thread()
+            # Потоки QThreadPool Python не создавал — он зовет их Dummy-N
+            is_pool_thread = isinstance(thread, threading._DummyThread)
+            self._threads[tid] = f"IO worker {len(self._threads)}" if is_pool_thread else thread.name
+        self._events.append((name, cat, start_ns, end_ns, tid, args))
+
+    def _build(self, events, threads):
+        pid = os.getpid()
+        origin = self._origin_ns
+        trace = [{"name": "process_name", "ph": "M", "pid": pid, "args": {"name": "ChronoDash"}}]
+        main_tid = threading.main_thread().ident
+        for tid, name in threads.items():
+            trace.append({"name": "thread_name", "ph": "M", "pid": pid, "tid": tid,
+                          "args": {"name": "GUI" if tid == main_tid else name}})
+        for name, cat, start, end, tid, args in events:
+            event = {"name": name, "cat": cat, "ph": "X", "pid": pid, "tid": tid,
+                     "ts": (start - origin) / 1000, "dur": (end - start) / 1000}
+            if args:
+                event["args"] = args
+            trace.append(event)
+        return {"traceEvents": trace, "displayTimeUnit": "ms"}
+
+    def save(self, path: Path = None):
+        """Сохранить накопленное (запись продолжается). JSON собирается и пишется в пуле IOService."""
+        from core.io_service import get_io_service, PRIORITY_LOW
+
+        if path is None:
+            path = self.trace_dir / time.strftime("trace-%Y%m%d-%H%M%S.json")
+        events, threads = list(self._events), dict(self._threads)
+        if not events:
+            print("[Trace] Nothing to save")
+            return None
+
+        def write():
+            path.parent.mkdir(parents=True, exist_ok=True)
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump(self._build(events, threads), f, ensure_ascii=False)
+            return str(path)
+
+        def done(saved):
+            print(f"[Trace] Saved {len(events)} events: {saved}")
+            self.trace_saved.emit(saved)
+
+        get_io_service().submit(write, on_result=done, priority=PRIORITY_LOW, owner=self, tag="trace")
+        return path
+
+    def install_signal_handlers(self):
+        """
+        SIGUSR1 — сохранить трассу, SIGUSR2 — начать/остановить запись.
+        Python обрабатывает сигналы только между байткодами, а цикл Qt сидит
+        в C++, поэтому будим его через wakeup-fd и QSocketNotifier.
+        """
+        if not hasattr(signal, "SIGUSR1") or self._signal_notifier is not None: return
+        reader, writer = socket.socketpair()
+        reader.setblocking(False)
+        writer.setblocking(False)
+        signal.set_wakeup_fd(writer.fileno())
+        self._signal_sockets = (reader, writer)
+        self._signal_notifier = QSocketNotifier(reader.fileno(), QSocketNotifier.Read, self)
+        self._signal_notifier.activated.connect(self._drain_signal_socket)
+        signal.signal(signal.SIGUSR1, lambda *_: self.save())
+        signal.signal(signal.SIGUSR2, lambda *_: self.stop() if self.enabled else self.start())
+
+    def _drain_signal_socket(self):
+        # Обработчики уже вызвал Python — здесь только вычищаем байты пробуждения
+        try:
+            while self._signal_sockets[0].recv(64): pass
+        except OSError:
+            pass
+
+
+_tracer = None
+
+
+def get_tracer() -> Tracer:
+    global _tracer
+    if _tracer is None:
+        config_dir = Path(QStandardPaths.writableLocation(QStandardPaths.AppConfigLocation))
+        _tracer = Tracer(config_dir / TRACE_DIR_NAME)
+    return _tracer
+
+
+def span(name, cat="app", args=None):
+    """Контекст-менеджер отрезка трассы; без записи — общий пустой контекст."""
+    tracer = _tracer
+    if tracer is None or not tracer.enabled:
+        return _NULL_SPAN
+    return _Span(tracer, name, cat, args)
+
+
+def traced(name, cat="app"):
+    """Декоратор: весь вызов функции — один отрезок трассы."""
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            tracer = _tracer
+            if tracer is None or not tracer.enabled:
+                return fn(*args, **kwargs)
+            start = time.perf_counter_ns()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                tracer.add_complete(name, cat, start, time.perf_counter_ns())
+        return wrapper
+    return decorator
+
+
+def trace_enabled_by_env() -> bool:
+    return os.environ.get(TRACE_ENV, "").lower() in ("1", "true", "yes", "on")
@@ -10,6 +10,7 @@ from PySide6.QtWidgets import (
 from PySide6.QtGui import QIcon, QAction, QFont, QPixmap, QColor, QPainter
 from PySide6.QtCore import QTimer, Qt
 from core.updater import UpdateChecker
+from core.io_service import get_io_service
 
 # Импортируем наше окно настроек
 from core.settings_window import SettingsWindow
@@ -218,6 +219,9 @@ class TrayApp:
 
     def _quit_app(self):
         print("Завершение работы...")
+        # Правки из настроек, ждущие паузы в наборе, применяем до остановки виджетов
+        if self.settings_window:
+            self.settings_window.apply_queue.flush()
         self.wm.stop_all_widgets()
         
         if self.settings_window:
@@ -227,7 +231,9 @@ class TrayApp:
             # Отключаем событие закрытия, чтобы не спрашивал второй раз
             self.fallback_window.closeEvent = lambda e: e.accept()
             self.fallback_window.close()
-            
+        
+        # Снимаем очередь сетевых задач и ждем уже запущенные
+        get_io_service().shutdown()
         QApplication.quit()
 
     def run(self):
@@ -0,0 +1,162 @@
+# ChronoDash - Base Widget
+# Copyright (C) 2025 Overl1te
+
+"""
+Модель списка виджетов для окна настроек.
+
+WidgetListModel смотрит на конфиги WidgetManager и обновляется точечно
+по сигналу widgets_changed: вставка/удаление строк блоками и dataChanged
+только для переименованных виджетов — без пересоздания всего списка.
+Строки адресуются по id виджета, а не по индексу в конфиге.
+
+Миниатюры (DecorationRole) берутся из ThumbnailProvider: пока ее нет,
+строка показывается без картинки и перерисовывается по thumbnail_ready.
+
+WidgetFilterProxy — поиск по имени/типу и фильтр по типу.
+"""
+
+from PySide6.QtCore import Qt, QAbstractListModel, QModelIndex, QSortFilterProxyModel
+
+from core.config_diff import touches
+from core.thumbnails import get_thumbnail_provider, IGNORED_KEYS
+
+ID_ROLE = Qt.UserRole
+TYPE_ROLE = Qt.UserRole + 1
+NAME_ROLE = Qt.UserRole + 2
+
+
+def _runs(rows):
+    """[9, 8, 7, 3, 2] → [(7, 9), (2, 3)]: подряд идущие строки удаляем одним блоком."""
+    runs = []
+    for row in sorted(rows, reverse=True):
+        if runs and runs[-1][0] == row + 1:
+            runs[-1][0] = row
+        else:
+            runs.append([row, row])
+    return [tuple(r) for r in runs]
+
+
+class WidgetListModel(QAbstractListModel):
+    def __init__(self, widget_manager, parent=None):
+        super().__init__(parent)
+        self.wm = widget_manager
+        self._ids = []
+        self._cfgs = {}   # id -> cfg (тот же dict, что у менеджера)
+        self._rows = {}   # id -> строка
+        self.thumbnails = get_thumbnail_provider()
+        self.thumbnails.thumbnail_ready.connect(self.refresh)
+        self.reset()
+        self.wm.widgets_changed.connect(self._on_widgets_changed)
+
+    def reset(self):
+        self.beginResetModel()
+        configs = self.wm.get_all_configs()
+        self._ids = [c["id"] for c in configs]
+        self._cfgs = {c["id"]: c for c in configs}
+        self._reindex()
+        self.endResetModel()
+
+    def _reindex(self):
+        self._rows = {wid: row for row, wid in enumerate(self._ids)}
+
+    # --- QAbstractListModel ---
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._ids)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid() or index.row() >= len(self._ids): return None
+        wid = self._ids[index.row()]
+        cfg = self._cfgs.get(wid, {})
+        if role == Qt.DisplayRole:
+            return f"{cfg.get('name', 'Widget')}  [{cfg.get('type', '?')}]"
+        if role == ID_ROLE:
+            return wid
+        if role == TYPE_ROLE:
+            return cfg.get("type", "")
+        if role == NAME_ROLE:
+            return cfg.get("name", "")
+        if role == Qt.DecorationRole:
+            return self.thumbnails.get(wid, cfg)
+        return None
+
+    # --- Доступ по id ---
+    def row_of(self, wid) -> int:
+        return self._rows.get(wid, -1)
+
+    def config(self, wid):
+        return self._cfgs.get(wid)
+
+    def refresh(self, wid):
+        """Перерисовать строку (например, имя правится в настройках до сохранения)."""
+        row = self.row_of(wid)
+        if row >= 0:
+            idx = self.index(row)
+            self.dataChanged.emit(idx, idx)
+
+    def _on_widgets_changed(self, changes):
+        removed = [self._rows[wid] for wid in changes["removed"] if wid in self._rows]
+        for first, last in _runs(removed):
+            self.beginRemoveRows(QModelIndex(), first, last)
+            for wid in self._ids[first:last + 1]:
+                self._cfgs.pop(wid, None)
+                self.thumbnails.forget(wid)
+            del self._ids[first:last + 1]
+            self.endRemoveRows()
+        if removed:
+            self._reindex()
+
+        added = set(changes["added"]) - self._rows.keys()
+        if added:
+            # Новые виджеты менеджер дописывает в конец конфига
+            new_cfgs = [c for c in self.wm.get_all_configs() if c["id"] in added]
+            first = len(self._ids)
+            self.beginInsertRows(QModelIndex(), first, first + len(new_cfgs) - 1)
+            for cfg in new_cfgs:
+                self._rows[cfg["id"]] = len(self._ids)
+                self._ids.append(cfg["id"])
+                self._cfgs[cfg["id"]] = cfg
+            self.endInsertRows()
+
+        keys = changes.get("keys", {})
+        for wid, cfg in changes["updated"].items():
+            if wid not in self._rows: continue
+            self._cfgs[wid] = cfg  # Менеджер мог заменить dict целиком
+            changed = keys.get(wid)
+            # Миниатюру перерисовываем только для виджетов с изменившимся видом
+            looks_changed = changed is None or any(p.split(".")[0] not in IGNORED_KEYS for p in changed)
+            if looks_changed:
+                self.thumbnails.invalidate(wid)
+            if looks_changed or touches(changed, "name", "type"):
+                self.refresh(wid)
+
+
+class WidgetFilterProxy(QSortFilterProxyModel):
+    """Все слова запроса должны встречаться в имени или типе; плюс необязательный фильтр по типу."""
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._tokens = []
+        self._type = ""
+
+    def set_query(self, text: str):
+        tokens = text.casefold().split()
+        if tokens == self._tokens: return
+        self._tokens = tokens
+        self.invalidateFilter()
+
+    def set_type(self, w_type: str):
+        if w_type == self._type: return
+        self._type = w_type
+        self.invalidateFilter()
+
+    def is_filtering(self) -> bool:
+        return bool(self._tokens or self._type)
+
+    def filterAcceptsRow(self, source_row, source_parent):
+        if not self.is_filtering(): return True
+        idx = self.sourceModel().index(source_row, 0, source_parent)
+        w_type = idx.data(TYPE_ROLE) or ""
+        if self._type and w_type != self._type:
+            return False
+        haystack = f"{idx.data(NAME_ROLE) or ''} {w_type}".casefold()
+        return all(token in haystack for token in self._tokens)
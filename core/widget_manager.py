@@ -1,33 +1,71 @@
 import json
+from contextlib import contextmanager
 from pathlib import Path
 import uuid
-from PySide6.QtCore import QTimer, QObject, Signal
-from core.edit_overlay import EditOverlay
+from PySide6.QtCore import QTimer, QObject, Signal, Qt, QRect
+from PySide6.QtGui import QGuiApplication
+from core.config_diff import diff_paths, snapshot, GEOMETRY_KEYS
+from core.edit_overlay import EditOverlaySet
+from core.log_service import get_logger
+from core.tracing import traced
 from core.registry import get_module
+from core.snapping import SnapIndex
+from core.window_attacher import get_window_tracker
+
+log = get_logger("widgets")
 
 class WidgetManager(QObject):
     # Сигнал: (widget_id, new_config)
     widget_config_updated = Signal(str, dict)
+    # Какие пути конфига изменились: (widget_id, frozenset{"x", "content.file_path", ...})
+    widget_keys_changed = Signal(str, object)
+    # Пакетное обновление: {widget_id: new_config} — один сигнал на всю группу
+    widgets_config_updated = Signal(dict)
+    # Сводка изменений набора виджетов:
+    # {"added": [id], "removed": [id], "updated": {id: cfg}, "keys": {id: {пути}}}.
+    # Вне batch() — на каждую операцию, внутри — один раз при commit_batch().
+    widgets_changed = Signal(dict)
+    # Вход (True) и выход (False) из режима редактирования
+    edit_mode_changed = Signal(bool)
 
     def __init__(self, config_path: Path):
         super().__init__()
         self.config_path = config_path
         self.widgets = {}
         self.config = []
-        self.overlay = None
+        self.overlay = None  # EditOverlaySet: создается при первом входе в редактирование и переиспользуется
         self.editing_widget_id = None
+        # Выделение в режиме редактирования (первый — тот, с которого начали)
+        self.selected_ids = []
+        self._group_start = None  # {wid: QRect} остальных виджетов группы на старте драга
+        # Линии привязки всех виджетов и экранов (для выравнивания в режиме редактирования)
+        self.snap_index = SnapIndex()
+        # Пакетный режим: сохранение и сигналы откладываются до commit_batch()
+        self._batch_depth = 0
+        self._batch_dirty = False
+        self._changes = self._empty_changes()
+        # Снимки конфигов на момент последнего применения — база для diff (настройки правят dict на месте)
+        self._snapshots = {}
         self.app_settings = {
             "autostart": False,
             "force_x11": True,
             "gpu_acceleration": True,
             "use_builder": False, # Дефолт
-            "dev_mode": False
+            "dev_mode": False,
+            "snap_to_guides": True
         }
         self._load()
 
     def get_all_configs(self):
         return self.config
 
+    def get_config(self, wid):
+        """Текущий dict конфига виджета (менеджер мог заменить его целиком) или None."""
+        for c in self.config:
+            if c["id"] == wid:
+                return c
+        return None
+
     def _load(self):
         if not self.config_path.exists():
             self.config = []
@@ -44,7 +82,71 @@ class WidgetManager(QObject):
         except:
             self.config = []
 
+    # === BATCH ===
+    @staticmethod
+    def _empty_changes():
+        return {"added": [], "removed": [], "updated": {}, "keys": {}}
+
+    def begin_batch(self):
+        self._batch_depth += 1
+
+    def commit_batch(self):
+        """Закрывает пакет; на внешнем уровне — одно сохранение и одна сводка изменений."""
+        if self._batch_depth == 0: return
+        self._batch_depth -= 1
+        if self._batch_depth: return
+
+        changes, self._changes = self._changes, self._empty_changes()
+        if self._batch_dirty:
+            self._batch_dirty = False
+            self._save()
+        if changes["updated"]:
+            self.widgets_config_updated.emit(changes["updated"])
+            for wid, keys in changes["keys"].items():
+                self.widget_keys_changed.emit(wid, keys)
+        if any(changes.values()):
+            self.widgets_changed.emit(changes)
+
+    @contextmanager
+    def batch(self):
+        """
+        with wm.batch(): ... — любые create/delete/update внутри дают
+        одну запись конфига и один widgets_changed, даже при ошибке в середине.
+        """
+        self.begin_batch()
+        try:
+            yield self
+        finally:
+            self.commit_batch()
+
+    def _record(self, kind, wid, cfg=None, keys=frozenset()):
+        """Запоминает изменение; вне пакета сразу рассылает его."""
+        changes = self._changes
+        if kind == "updated":
+            if wid not in changes["added"]:
+                changes["updated"][wid] = cfg
+                changes["keys"][wid] = changes["keys"].get(wid, frozenset()) | keys
+        elif kind == "removed" and wid in changes["added"]:
+            changes["added"].remove(wid)  # Создали и удалили в одном пакете — ничего не было
+            changes["updated"].pop(wid, None)
+            changes["keys"].pop(wid, None)
+        else:
+            changes[kind].append(wid)
+            changes["updated"].pop(wid, None)
+            changes["keys"].pop(wid, None)
+
+        if self._batch_depth == 0:
+            self._changes = self._empty_changes()
+            if kind == "updated":
+                self.widget_config_updated.emit(wid, cfg)
+                self.widget_keys_changed.emit(wid, keys)
+            self.widgets_changed.emit(changes)
+
+    @traced("config.save", "io")
     def _save(self):
+        if self._batch_depth:
+            self._batch_dirty = True
+            return
         try:
             export_data = {
                 "global": self.app_settings,
@@ -55,7 +157,8 @@ class WidgetManager(QObject):
             
             with open(self.config_path, "w", encoding="utf-8") as f:
                 json.dump(export_data, f, indent=2, ensure_ascii=False)
-            print("[WidgetManager] Config saved successfully.")
+            # Сохранение идет на каждую правку — в обычном логе это только шум
+            log.debug("[WidgetManager] Config saved successfully.")
         except Exception as e:
             print(f"[WidgetManager] Save error: {e}")
 
@@ -63,15 +166,36 @@ class WidgetManager(QObject):
         new_cfg = template.copy()
         new_cfg["id"] = str(uuid.uuid4())
         self.config.append(new_cfg)
+        self._snapshots[new_cfg["id"]] = snapshot(new_cfg)
         self._save()
         self._create_widget_instance(new_cfg)
+        self._record("added", new_cfg["id"])
+        return new_cfg["id"]
         
     def delete_widget(self, wid):
-        if wid in self.widgets:
-            self.widgets[wid].close()
-            del self.widgets[wid]
-        self.config = [c for c in self.config if c["id"] != wid]
-        self._save()
+        self.delete_widgets([wid])
+
+    def delete_widgets(self, wids):
+        """Удаляет несколько виджетов: один проход по конфигу и одно сохранение."""
+        wids = set(wids)
+        if self.editing_widget_id and wids & set(self.selected_ids):
+            self.exit_edit_mode()
+        with self.batch():
+            for wid in wids:
+                self._detach_from_window(wid)
+                self.snap_index.remove(wid)
+                self._snapshots.pop(wid, None)
+                if wid in self.widgets:
+                    self.widgets[wid].close()
+                    del self.widgets[wid]
+            removed = [c["id"] for c in self.config if c["id"] in wids]
+            self.config = [c for c in self.config if c["id"] not in wids]
+            for wid in removed:
+                self._record("removed", wid)
+            self._save()
+
+    def delete_all_widgets(self):
+        self.delete_widgets([c["id"] for c in self.config])
 
     def _create_widget_instance(self, cfg):
         module = get_module(cfg.get("type"))
@@ -82,17 +206,47 @@ class WidgetManager(QObject):
         else:
             return 
             
-        w.config_changed.connect(self.update_widget_config)
+        self._snapshots[cfg["id"]] = snapshot(cfg)
+        w.config_changed.connect(self._on_widget_config_changed)
+        w.geometry_preview.connect(self._on_geometry_preview)
+        w.drag_frame.connect(self._on_drag_frame)
+        w.selection_toggled.connect(self.toggle_selection)
         self.widgets[cfg["id"]] = w
         w.show()
+        self._index_widget(cfg["id"], w)
         
-        # Windows attachment (если нужно)
-        try:
-            from core.window_attacher import attach_loop
-            import threading
-            if cfg.get("attach_to_window", {}).get("enabled", False):
-                threading.Thread(target=attach_loop, args=(w, cfg), daemon=True).start()
-        except: pass
+        # Привязка к окну (общий трекер, если платформа поддерживает)
+        tracker = get_window_tracker()
+        if tracker:
+            tracker.attach(cfg["id"], w, cfg)
+
+    def _index_widget(self, wid, w):
+        geo = w.geometry()
+        self.snap_index.set_rect(wid, (geo.x(), geo.y(), geo.x() + geo.width(), geo.y() + geo.height()))
+
+    def _index_screens(self):
+        """Края и центры экранов — тоже линии привязки (экраны могли смениться)."""
+        self.snap_index.remove_prefix("screen:")
+        for i, screen in enumerate(QGuiApplication.screens()):
+            geo = screen.availableGeometry()
+            self.snap_index.set_rect(f"screen:{i}", (geo.x(), geo.y(), geo.x() + geo.width(), geo.y() + geo.height()))
+
+    def _snap(self, wid, rect, x_edges, y_edges):
+        """snap_handler редактируемого виджета: выравнивание + направляющие на оверлее."""
+        # Alt — временно без привязки
+        if (not self.app_settings.get("snap_to_guides", True)
+                or QGuiApplication.keyboardModifiers() & Qt.AltModifier):
+            guides = []
+        else:
+            rect, guides = self.snap_index.snap(rect, x_edges, y_edges, exclude=set(self.selected_ids) | {wid})
+        if self.overlay:
+            self.overlay.set_guides(guides)
+        return rect
+
+    def _detach_from_window(self, wid):
+        tracker = get_window_tracker()
+        if tracker:
+            tracker.detach(wid)
 
     def load_and_create_all_widgets(self):
         print(f"[WidgetManager] Loading {len(self.config)} widgets...")
@@ -106,26 +260,28 @@ class WidgetManager(QObject):
         print("[WidgetManager] Saving state before exit...")
         
         # 1. СИНХРОНИЗАЦИЯ: Принудительно забираем актуальные координаты у живых окон
-        for wid, w in self.widgets.items():
-            if not w.isVisible(): continue
-            
-            # Получаем геометрию прямо из окна
-            geo = w.geometry()
-            
-            # Находим соответствующий конфиг в списке и обновляем его
-            for c in self.config:
-                if c["id"] == wid:
-                    c["x"] = geo.x()
-                    c["y"] = geo.y()
-                    c["width"] = geo.width()
-                    c["height"] = geo.height()
-                    break
+        with self.batch():
+            by_id = {c["id"]: c for c in self.config}
+            for wid, w in self.widgets.items():
+                if not w.isVisible() or wid not in by_id: continue
+                
+                # Получаем геометрию прямо из окна
+                geo = w.geometry()
+                new_geo = {"x": geo.x(), "y": geo.y(), "width": geo.width(), "height": geo.height()}
+                c = by_id[wid]
+                keys = frozenset(k for k, v in new_geo.items() if c.get(k) != v)
+                if keys:
+                    c.update(new_geo)
+                    self._snapshots[wid] = snapshot(c)
+                    self._record("updated", wid, c, keys)
         
-        # 2. СОХРАНЕНИЕ: Пишем обновленный конфиг на диск
-        self._save()
+            # 2. СОХРАНЕНИЕ: Пишем обновленный конфиг на диск (один раз, при выходе из пакета)
+            self._save()
 
         # 3. ОЧИСТКА: Закрываем окна
-        for w in self.widgets.values():
+        for wid, w in self.widgets.items():
+            self._detach_from_window(wid)
+            self.snap_index.remove(wid)
             w.close()
             w.deleteLater()
         self.widgets.clear()
@@ -140,13 +296,100 @@ class WidgetManager(QObject):
                 break
         if not found: return
 
+        # Что именно поменялось с прошлого применения (ничего — нечего применять и сохранять)
+        keys = frozenset(diff_paths(self._snapshots.get(wid, {}), new_data))
+        if not keys: return
+        self._snapshots[wid] = snapshot(new_data)
+
         # 2. Обновляем инстанс (если пришло из настроек)
-        if wid in self.widgets:
-            self.widgets[wid].update_config(new_data)
+        self._apply_to_instance(wid, new_data, keys)
         
         # 3. Сохраняем на диск
         self._save()
-        self.widget_config_updated.emit(wid, new_data)
+        self._record("updated", wid, new_data, keys)
+
+    def preview_widget_config(self, wid, new_data):
+        """Мгновенно показывает визуальные поля (без update_config, записи на диск и сигналов)."""
+        w = self.widgets.get(wid)
+        if w is None: return
+        w.apply_visual(new_data)
+        self._index_widget(wid, w)
+
+    def update_widgets_config(self, updates: dict):
+        """
+        Пакетное обновление нескольких виджетов одной транзакцией:
+        все изменения применяются в памяти и к инстансам, затем одно
+        сохранение на диск и один сигнал widgets_config_updated.
+        """
+        with self.batch():
+            for wid, new_data in updates.items():
+                self.update_widget_config(wid, new_data)
+
+    def _apply_to_instance(self, wid, new_data, keys=None):
+        if wid in self.widgets:
+            self.widgets[wid].update_config(new_data, keys)
+            tracker = get_window_tracker()
+            if tracker:
+                tracker.update(wid, self.widgets[wid], new_data)
+            self._index_widget(wid, self.widgets[wid])
+        if self.overlay and wid in self.selected_ids:
+            self.overlay.set_guides([])
+
+    def _on_widget_config_changed(self, wid, new_data):
+        """Конфиг от самого виджета (конец драга): для группы — одна транзакция на всех."""
+        self._group_start = None
+        if wid in self.selected_ids and len(self.selected_ids) > 1:
+            self.update_widgets_config(self._selection_geometry_updates())
+        else:
+            self.update_widget_config(wid, new_data)
+
+    def _selection_geometry_updates(self) -> dict:
+        """Актуальная геометрия выделенных окон → {wid: cfg}."""
+        updates = {}
+        for c in self.config:
+            if c["id"] in self.selected_ids and c["id"] in self.widgets:
+                geo = self.widgets[c["id"]].geometry()
+                c["x"] = geo.x()
+                c["y"] = geo.y()
+                c["width"] = geo.width()
+                c["height"] = geo.height()
+                updates[c["id"]] = c
+        return updates
+
+    def _on_drag_frame(self, wid, start, geo):
+        """Ведущий виджет группы сдвинулся/изменился — остальные повторяют те же смещения краев."""
+        if wid not in self.selected_ids or len(self.selected_ids) < 2: return
+        if self._group_start is None:
+            self._group_start = {
+                other: self.widgets[other].geometry()
+                for other in self.selected_ids if other != wid and other in self.widgets
+            }
+
+        dl, dt = geo.left() - start.left(), geo.top() - start.top()
+        dr, db = geo.right() - start.right(), geo.bottom() - start.bottom()
+        for other, base in self._group_start.items():
+            w = self.widgets.get(other)
+            if w is None: continue
+            target = QRect(base).adjusted(dl, dt, dr, db)
+            if target.width() < w.min_size or target.height() < w.min_size: continue
+            if target.size() == w.size():
+                w.move(target.topLeft())
+            else:
+                w.setGeometry(target)
+
+    def _on_geometry_preview(self, wid, geo):
+        """
+        Промежуточная геометрия во время драга: обновляем память и подписчиков
+        (поля X/Y в настройках), но не сохраняем — сохранение по отпусканию мыши.
+        """
+        for c in self.config:
+            if c["id"] == wid:
+                keys = frozenset(k for k, v in geo.items() if c.get(k) != v)
+                if not keys: break
+                c.update(geo)
+                self.widget_config_updated.emit(wid, c)
+                self.widget_keys_changed.emit(wid, keys)
+                break
 
     # === EDIT MODE ===
     def enter_edit_mode(self, wid):
@@ -154,40 +397,72 @@ class WidgetManager(QObject):
         if self.editing_widget_id and self.editing_widget_id != wid:
             self.exit_edit_mode()
 
+        entering = self.editing_widget_id is None
         self.editing_widget_id = wid
         target_w = self.widgets[wid]
         
         if not self.overlay:
-            self.overlay = EditOverlay(target_w)
+            self.overlay = EditOverlaySet()
             self.overlay.stop_edit_signal.connect(self.exit_edit_mode)
-            self.overlay.show()
-            self.overlay.grabKeyboard()
-            
-        target_w.set_edit_mode(True)
+            self.overlay.select_at_signal.connect(self._select_at)
+        self.overlay.show_for(target_w)
+
+        self._index_screens()
+        self.selected_ids = []
+        self._add_to_selection(wid)
+        if entering:
+            self.edit_mode_changed.emit(True)
+
+    def _add_to_selection(self, wid):
+        w = self.widgets[wid]
+        self.selected_ids.append(wid)
+        w.snap_handler = self._snap
+        w.set_edit_mode(True)
+
+    def toggle_selection(self, wid):
+        """Ctrl+клик: добавить виджет в группу редактирования или убрать из нее."""
+        if not self.editing_widget_id or wid not in self.widgets: return
+        if wid not in self.selected_ids:
+            self._add_to_selection(wid)
+            return
+        if len(self.selected_ids) == 1: return  # Последний выделенный не снимаем
+
+        self.selected_ids.remove(wid)
+        w = self.widgets[wid]
+        w.snap_handler = None
+        w.set_edit_mode(False)
+        if wid == self.editing_widget_id:
+            self.editing_widget_id = self.selected_ids[0]
+            self.overlay.editing_widget = self.widgets[self.editing_widget_id]
+
+    def _select_at(self, pos):
+        """Ctrl+клик по пустому месту оверлея: ищем невыделенный виджет под курсором."""
+        for wid, w in reversed(list(self.widgets.items())):
+            if wid not in self.selected_ids and w.isVisible() and w.geometry().contains(pos):
+                self.toggle_selection(wid)
+                return
 
     def exit_edit_mode(self):
         if not self.editing_widget_id: return
-        wid = self.editing_widget_id
         
-        # При выходе из режима редактирования тоже сохраняем актуальные координаты
-        if wid in self.widgets:
-            w = self.widgets[wid]
-            w.set_edit_mode(False)
-            
-            geo = w.geometry()
-            for c in self.config:
-                if c["id"] == wid:
-                    c["x"] = geo.x()
-                    c["y"] = geo.y()
-                    c["width"] = geo.width()
-                    c["height"] = geo.height()
-                    self.update_widget_config(wid, c)
-                    break
+        # При выходе из режима редактирования сохраняем актуальные координаты всей группы
+        for wid in self.selected_ids:
+            if wid in self.widgets:
+                w = self.widgets[wid]
+                w.snap_handler = None
+                w.set_edit_mode(False)
+        updates = self._selection_geometry_updates()
+        if len(updates) == 1:
+            self.update_widget_config(*next(iter(updates.items())))
+        else:
+            self.update_widgets_config(updates)
 
         if self.overlay:
-            self.overlay.close()
-            self.overlay = None
+            self.overlay.hide_all()
         self.editing_widget_id = None
+        self.selected_ids = []
+        self._group_start = None
+        self.edit_mode_changed.emit(False)
     
     def get_global_setting(self, key, default=None):
         return self.app_settings.get(key, default)
@@ -2,84 +2,530 @@
 # Copyright (C) 2025 Overl1te
 
 """
-Модуль для привязки виджета к окну другого приложения (только Windows).
+Модуль для привязки виджета к окну другого приложения.
 
 Позволяет «приклеивать» виджет к краю указанного окна (например, к панели задач
-или браузеру). Работает в отдельном потоке, постоянно отслеживая позицию целевого окна.
+или браузеру). Один общий WindowTracker обслуживает все привязанные виджеты
+в одном фоновом потоке:
+  - поиск окна по заголовку кэшируется (title → окно) и сбрасывается,
+    только когда окно пропало; повторный поиск — не чаще LOST_RETRY_S;
+  - виджет двигается, только если прямоугольник окна реально изменился;
+  - без привязанных виджетов поток спит на Condition и не просыпается;
+  - удаленный или отвязанный виджет сразу перестает отслеживаться;
+  - позиция считается в трекере с учетом якоря (углы, края, центр) и смещения,
+    а сам move() выполняется в GUI-потоке: поток трекера только складывает
+    последнюю позицию каждого виджета, и GUI забирает их пачкой за один проход.
+
+Платформенная часть спрятана за WindowBackend: Win32 опрашивается с частотой
+POLL_INTERVAL_S, а X11 работает по событиям (ConfigureNotify/PropertyNotify)
+и без изменений окон не просыпается вовсе. FakeBackend позволяет
+проверять трекер на любой ОС.
 """
 
+import os
 import platform
-import time
+import select
 import threading
+import time
+
+from PySide6.QtCore import QObject, Signal, Slot
+
+POLL_INTERVAL_S = 0.1   # 10 FPS — достаточно плавно и не грузит CPU
+LOST_RETRY_S = 1.0      # Как часто искать заново пропавшее окно
+
+
+class WindowBackend:
+    """
+    Интерфейс доступа к окнам ОС.
+
+    handle — любой хешируемый идентификатор окна;
+    rect — кортеж (x, y, width, height) в экранных координатах.
+
+    event_driven = True означает, что wait() сам просыпается при изменении
+    отслеживаемых окон, и трекеру не нужно опрашивать их по таймеру.
+    """
+
+    event_driven = False
+
+    def find_window(self, title: str):
+        """Первое видимое окно, заголовок которого содержит title (без учета регистра)."""
+        raise NotImplementedError
+
+    def is_window(self, handle) -> bool:
+        raise NotImplementedError
+
+    def get_rect(self, handle):
+        """Прямоугольник окна или None, если окно недоступно."""
+        raise NotImplementedError
+
+    def watch(self, handle):
+        """Подписка на изменения окна (для бэкендов на событиях)."""
+
+    def wait(self, timeout):
+        """
+        Ждет изменений. Опрашивающие бэкенды просто спят timeout секунд;
+        timeout=None — ждать до события или wake().
+        """
+        time.sleep(timeout if timeout is not None else POLL_INTERVAL_S)
+
+    def wake(self):
+        """Прерывает wait() из другого потока (добавили/убрали привязку)."""
+
+
+class FakeBackend(WindowBackend):
+    """Окна в памяти — для проверки трекера без настоящей оконной системы."""
 
-if platform.system() != "Windows":
-    # На других ОС привязка не поддерживается — заглушка
-    def attach_loop(widget, cfg):
-        """Заглушка для не-Windows платформ."""
-        return
+    def __init__(self):
+        self.windows = {}     # handle → [title, rect]
+        self.find_calls = 0
+        self._next = 1
 
-else:
+    def add_window(self, title, rect):
+        handle = self._next
+        self._next += 1
+        self.windows[handle] = [title, tuple(rect)]
+        return handle
+
+    def move_window(self, handle, rect):
+        self.windows[handle][1] = tuple(rect)
+
+    def close_window(self, handle):
+        self.windows.pop(handle, None)
+
+    def find_window(self, title):
+        self.find_calls += 1
+        for handle, (text, _) in self.windows.items():
+            if title.lower() in text.lower():
+                return handle
+        return None
+
+    def is_window(self, handle):
+        return handle in self.windows
+
+    def get_rect(self, handle):
+        win = self.windows.get(handle)
+        return win[1] if win else None
+
+    def wait(self, timeout):
+        time.sleep(0.01 if timeout is None else min(timeout, 0.01))
+
+
+if platform.system() == "Windows":
     import win32gui
-    import win32con
 
-    def _find_hwnd_by_title(title: str):
+    class Win32Backend(WindowBackend):
+        def find_window(self, title):
+            hwnds = []
+            needle = title.lower()
+
+            def enum_callback(hwnd, _):
+                if hwnds: return
+                if win32gui.IsWindowVisible(hwnd):
+                    if needle in win32gui.GetWindowText(hwnd).lower():
+                        hwnds.append(hwnd)
+
+            win32gui.EnumWindows(enum_callback, None)
+            return hwnds[0] if hwnds else None
+
+        def is_window(self, handle):
+            return bool(win32gui.IsWindow(handle))
+
+        def get_rect(self, handle):
+            try:
+                l, t, r, b = win32gui.GetWindowRect(handle)
+            except Exception:
+                return None
+            return (l, t, r - l, b - t)
+
+elif platform.system() == "Linux":
+    try:
+        from Xlib import X, display as xdisplay, error as xerror
+    except ImportError:
+        xdisplay = None
+
+    class X11Backend(WindowBackend):
         """
-        Ищет HWND окна по частичному совпадению заголовка.
+        EWMH-бэкенд: окна ищутся по _NET_CLIENT_LIST и _NET_WM_NAME,
+        движения приходят событиями ConfigureNotify (на само окно и на рамку WM),
+        появление новых окон — PropertyNotify на корне (_NET_CLIENT_LIST).
 
-        Возвращает первый найденный HWND или None.
+        Свое соединение с X-сервером используется только из потока трекера.
         """
-        hwnds = []
 
-        def enum_callback(hwnd, _):
-            if win32gui.IsWindowVisible(hwnd):
-                window_text = win32gui.GetWindowText(hwnd)
-                if title.lower() in window_text.lower():
-                    hwnds.append(hwnd)
+        event_driven = True
 
-        win32gui.EnumWindows(enum_callback, None)
-        return hwnds[0] if hwnds else None
+        def __init__(self):
+            self.dpy = xdisplay.Display()
+            self.root = self.dpy.screen().root
+            atom = self.dpy.intern_atom
+            self.NET_CLIENT_LIST = atom("_NET_CLIENT_LIST")
+            self.NET_WM_NAME = atom("_NET_WM_NAME")
+            self.NET_FRAME_EXTENTS = atom("_NET_FRAME_EXTENTS")
+            self.UTF8_STRING = atom("UTF8_STRING")
+            self.root.change_attributes(event_mask=X.PropertyChangeMask)
+            self.dpy.flush()
+            self._watched = set()
+            self._wake_r, self._wake_w = os.pipe()
 
-    def attach_loop(widget, cfg: dict):
-        """
-        Основной цикл привязки виджета к окну.
+        def _window(self, handle):
+            return self.dpy.create_resource_object("window", handle)
+
+        def _title(self, win):
+            prop = win.get_full_property(self.NET_WM_NAME, self.UTF8_STRING)
+            if prop and prop.value:
+                value = prop.value
+                return value.decode("utf-8", "replace") if isinstance(value, bytes) else str(value)
+            name = win.get_wm_name()
+            if isinstance(name, bytes):
+                return name.decode("latin-1", "replace")
+            return name or ""
+
+        def find_window(self, title):
+            needle = title.lower()
+            try:
+                prop = self.root.get_full_property(self.NET_CLIENT_LIST, X.AnyPropertyType)
+            except xerror.XError:
+                return None
+            for handle in (prop.value if prop else []):
+                try:
+                    win = self._window(handle)
+                    if win.get_attributes().map_state != X.IsViewable:
+                        continue
+                    if needle in self._title(win).lower():
+                        return int(handle)
+                except xerror.XError:
+                    continue  # Окно закрылось, пока мы перебирали список
+            return None
+
+        def is_window(self, handle):
+            try:
+                self._window(handle).get_attributes()
+                return True
+            except xerror.XError:
+                return False
 
-        Запускается в отдельном daemon-потоке. Работает, пока cfg["attach_to_window"]["enabled"] == True.
+        def get_rect(self, handle):
+            try:
+                win = self._window(handle)
+                geo = win.get_geometry()
+                pos = self.root.translate_coords(win, 0, 0)
+                x, y, w, h = pos.x, pos.y, geo.width, geo.height
+                # Как GetWindowRect на Windows: прямоугольник вместе с рамкой WM
+                ext = win.get_full_property(self.NET_FRAME_EXTENTS, X.AnyPropertyType)
+                if ext and len(ext.value) == 4:
+                    left, right, top, bottom = ext.value
+                    x, y, w, h = x - left, y - top, w + left + right, h + top + bottom
+                return (x, y, w, h)
+            except xerror.XError:
+                return None
+
+        def watch(self, handle):
+            if handle in self._watched: return
+            mask = X.StructureNotifyMask | X.PropertyChangeMask
+            try:
+                win = self._window(handle)
+                win.change_attributes(event_mask=mask)
+                # WM двигает не само окно, а свою рамку — подписываемся и на нее
+                frame = win
+                while True:
+                    parent = frame.query_tree().parent
+                    if parent.id in (X.NONE, self.root.id): break
+                    frame = parent
+                if frame.id != win.id:
+                    frame.change_attributes(event_mask=X.StructureNotifyMask)
+                self.dpy.flush()
+                self._watched.add(handle)
+            except xerror.XError:
+                pass
+
+        def wait(self, timeout):
+            if not self.dpy.pending_events():
+                ready, _, _ = select.select([self.dpy.fileno(), self._wake_r], [], [], timeout)
+                if self._wake_r in ready:
+                    os.read(self._wake_r, 64)
+            # Разбираем накопившиеся события: сами значения не важны, после
+            # пробуждения трекер перечитает прямоугольники и сравнит с прошлыми
+            while self.dpy.pending_events():
+                event = self.dpy.next_event()
+                if event.type == X.DestroyNotify:
+                    self._watched.discard(event.window.id)
+
+        def wake(self):
+            try:
+                os.write(self._wake_w, b"\0")
+            except OSError:
+                pass
+
+
+# Якорь: (доля по X, доля по Y) — точка окна, к которой прижимается та же точка виджета
+ANCHORS = {
+    "top-left": (0.0, 0.0), "top": (0.5, 0.0), "top-right": (1.0, 0.0),
+    "left": (0.0, 0.5), "center": (0.5, 0.5), "right": (1.0, 0.5),
+    "bottom-left": (0.0, 1.0), "bottom": (0.5, 1.0), "bottom-right": (1.0, 1.0),
+}
+
+
+class _Attachment:
+    """Состояние одного привязанного виджета."""
+
+    __slots__ = ("wid", "on_move", "title", "offset_x", "offset_y", "anchor",
+                 "width", "height", "handle", "last_rect", "next_lookup")
+
+    def __init__(self, wid, on_move, settings: dict, size=(0, 0)):
+        self.wid = wid
+        self.on_move = on_move
+        self.title = settings.get("window_title", "").strip()
+        self.anchor = settings.get("anchor", "top-left")
+        if self.anchor not in ANCHORS:
+            self.anchor = "top-left"
+        self.offset_x = int(settings.get("offset_x", 0))
+        self.offset_y = int(settings.get("offset_y", 0))
+        self.width, self.height = size
+        self.handle = None
+        self.last_rect = None
+        self.next_lookup = 0.0
+
+    def settings_key(self):
+        return (self.title, self.anchor, self.offset_x, self.offset_y)
+
+
+class _MoveDispatcher(QObject):
+    """Живет в GUI-потоке; сигнал из потока трекера приходит сюда через очередь событий."""
+    moves_ready = Signal()
+
+
+class WindowTracker:
+    def __init__(self, backend: WindowBackend, poll_interval_s: float = POLL_INTERVAL_S):
+        self.backend = backend
+        self.poll_interval_s = poll_interval_s
+        self._entries = {}
+        self._title_cache = {}   # заголовок → handle
+        self._cond = threading.Condition()
+        self._thread = None
+        self._stopped = False
+        # wid → виджет, на чей destroyed уже подписались (attach зовут на каждое изменение конфига)
+        self._hooked = {}
+        self.stats = {"lookups": 0, "cache_hits": 0, "moves": 0, "coalesced": 0}
+
+        # Последняя позиция каждого виджета, ожидающая применения в GUI-потоке
+        self._pending_moves = {}
+        self._flush_scheduled = False
+        self._dispatcher = _MoveDispatcher()
+        self._dispatcher.moves_ready.connect(self._flush_moves)
+
+    # === API (GUI-поток) ===
+
+    def attach(self, wid, widget, cfg: dict, on_move=None):
         """
-        if not cfg.get("attach_to_window", {}).get("enabled", False):
+        Начинает отслеживание окна для виджета, если привязка включена в cfg.
+        on_move(x, y) по умолчанию — widget.move; вызывается в GUI-потоке.
+        """
+        settings = cfg.get("attach_to_window", {})
+        if not settings.get("enabled", False) or not settings.get("window_title", "").strip():
+            self.detach(wid)
             return
+        size = (widget.width(), widget.height())
+        entry = _Attachment(wid, on_move or widget.move, settings, size)
+        with self._cond:
+            self._entries[wid] = entry
+            self._ensure_thread()
+            self._cond.notify()
+        self.backend.wake()
+        # Удаленный виджет снимаем с учета сами, даже если менеджер забыл
+        if self._hooked.get(wid) is not widget:
+            self._hooked[wid] = widget
+            widget.destroyed.connect(lambda *_: self._on_widget_destroyed(wid, widget))
 
-        window_title = cfg["attach_to_window"].get("window_title", "").strip()
-        if not window_title:
-            return
+    def _on_widget_destroyed(self, wid, widget):
+        # Под тем же id мог появиться новый виджет — его привязку не трогаем
+        if self._hooked.get(wid) is widget:
+            del self._hooked[wid]
+            self.detach(wid)
 
-        anchor = cfg["attach_to_window"].get("anchor", "top-left")
-        offset_x = cfg["attach_to_window"].get("offset_x", 0)
-        offset_y = cfg["attach_to_window"].get("offset_y", 0)
+    def detach(self, wid):
+        with self._cond:
+            self._entries.pop(wid, None)
+            self._pending_moves.pop(wid, None)
+        self.backend.wake()
 
-        hwnd = None
+    def update(self, wid, widget, cfg: dict):
+        """Конфиг виджета изменился: перепривязываем только если поменялись настройки."""
+        settings = cfg.get("attach_to_window", {})
+        with self._cond:
+            entry = self._entries.get(wid)
+        if entry and settings.get("enabled", False):
+            probe = _Attachment(wid, entry.on_move, settings)
+            if probe.settings_key() == entry.settings_key():
+                size = (int(cfg.get("width", entry.width)), int(cfg.get("height", entry.height)))
+                if size != (entry.width, entry.height):
+                    # Для якорей кроме top-left позиция зависит от размера виджета
+                    with self._cond:
+                        entry.width, entry.height = size
+                        entry.last_rect = None
+                    self.backend.wake()
+                return
+        self.attach(wid, widget, cfg)
 
-        while cfg.get("attach_to_window", {}).get("enabled", False):
-            if not hwnd:
-                hwnd = _find_hwnd_by_title(window_title)
+    def is_tracking(self, wid) -> bool:
+        with self._cond:
+            return wid in self._entries
 
-            if hwnd and win32gui.IsWindow(hwnd):
-                try:
-                    rect = win32gui.GetWindowRect(hwnd)
-                    wx, wy, ww, wh = rect[0], rect[1], rect[2] - rect[0], rect[3] - rect[1]
-
-                    # Поддержка только top-left пока (можно расширить)
-                    if anchor == "top-left":
-                        x = wx + offset_x
-                        y = wy + offset_y
-                    else:
-                        # fallback
-                        x = wx + offset_x
-                        y = wy + offset_y
-
-                    widget.move(int(x), int(y))
-                except Exception:
-                    hwnd = None  # окно исчезло — ищем заново
-            else:
-                hwnd = None
-
-            time.sleep(0.1)  # 10 FPS — достаточно плавно и не грузит CPU
\ No newline at end of file
+    def stop(self):
+        with self._cond:
+            self._stopped = True
+            self._entries.clear()
+            self._pending_moves.clear()
+            self._cond.notify()
+        self.backend.wake()
+
+    # === Фоновый поток ===
+
+    def _ensure_thread(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._stopped = False
+            self._thread = threading.Thread(target=self._run, name="WindowTracker", daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._entries and not self._stopped:
+                    self._cond.wait()
+                if self._stopped:
+                    return
+                entries = list(self._entries.values())
+            self.poll_once(entries)
+            self.backend.wait(self._wait_timeout(entries))
+
+    def _wait_timeout(self, entries):
+        if not self.backend.event_driven:
+            return self.poll_interval_s
+        # Событийный бэкенд будит нас сам; таймаут нужен только для поиска пропавших окон
+        if any(e.handle is None for e in entries):
+            return LOST_RETRY_S
+        return None
+
+    def poll_once(self, entries=None):
+        """Один проход по всем привязкам. Возвращает число поставленных в очередь сдвигов."""
+        if entries is None:
+            with self._cond:
+                entries = list(self._entries.values())
+        now = time.monotonic()
+        moved = 0
+        for entry in entries:
+            handle = self._resolve(entry, now)
+            if handle is None:
+                continue
+            rect = self.backend.get_rect(handle)
+            if rect is None:
+                self._forget_handle(entry)
+                continue
+            if rect == entry.last_rect:
+                continue
+            entry.last_rect = rect
+            x, y = self._position(entry, rect)
+            with self._cond:
+                if self._entries.get(entry.wid) is not entry:
+                    continue  # Виджет отвязали, пока мы считали
+                if entry.wid in self._pending_moves:
+                    self.stats["coalesced"] += 1
+                self._pending_moves[entry.wid] = (x, y)
+            moved += 1
+        if moved:
+            self._schedule_flush()
+        return moved
+
+    def _schedule_flush(self):
+        with self._cond:
+            if self._flush_scheduled:
+                return  # GUI еще не забрал прошлую пачку — новая позиция просто ее перезаписала
+            self._flush_scheduled = True
+        # Эмит из чужого потока → queued connection в GUI-поток
+        self._dispatcher.moves_ready.emit()
+
+    @Slot()
+    def _flush_moves(self):
+        """GUI-поток: применяет только последнюю позицию каждого виджета."""
+        with self._cond:
+            moves, self._pending_moves = self._pending_moves, {}
+            self._flush_scheduled = False
+            entries = {wid: self._entries.get(wid) for wid in moves}
+        for wid, (x, y) in moves.items():
+            entry = entries[wid]
+            if entry is None:
+                continue
+            try:
+                entry.on_move(x, y)
+                self.stats["moves"] += 1
+            except RuntimeError:
+                # C++-объект виджета уже удален
+                self.detach(wid)
+
+    def _resolve(self, entry, now):
+        if entry.handle is not None and self.backend.is_window(entry.handle):
+            return entry.handle
+        if entry.handle is not None:
+            self._forget_handle(entry)
+
+        cached = self._title_cache.get(entry.title)
+        if cached is not None:
+            if self.backend.is_window(cached):
+                self.stats["cache_hits"] += 1
+                entry.handle = cached
+                self.backend.watch(cached)
+                return cached
+            self._title_cache.pop(entry.title, None)
+
+        # Окно не найдено — не перебираем все окна системы на каждом тике
+        if now < entry.next_lookup:
+            return None
+        entry.next_lookup = now + LOST_RETRY_S
+        self.stats["lookups"] += 1
+        handle = self.backend.find_window(entry.title)
+        if handle is not None:
+            self._title_cache[entry.title] = handle
+            entry.handle = handle
+            entry.last_rect = None
+            self.backend.watch(handle)
+        return handle
+
+    def _forget_handle(self, entry):
+        if self._title_cache.get(entry.title) == entry.handle:
+            self._title_cache.pop(entry.title, None)
+        entry.handle = None
+        entry.last_rect = None
+
+    @staticmethod
+    def _position(entry, rect):
+        """Левый верхний угол виджета: точка-якорь виджета совпадает с точкой окна + смещение."""
+        wx, wy, ww, wh = rect
+        fx, fy = ANCHORS[entry.anchor]
+        x = wx + fx * (ww - entry.width) + entry.offset_x
+        y = wy + fy * (wh - entry.height) + entry.offset_y
+        return int(round(x)), int(round(y))
+
+
+def create_backend():
+    """Бэкенд для текущей платформы или None, если привязка не поддерживается."""
+    if platform.system() == "Windows":
+        return Win32Backend()
+    if platform.system() == "Linux" and xdisplay is not None and os.environ.get("DISPLAY"):
+        try:
+            return X11Backend()
+        except Exception as e:
+            print(f"[WindowTracker] X11 backend unavailable: {e}")
+    return None
+
+
+_tracker = None
+
+
+def get_window_tracker():
+    """Общий трекер или None на платформах без поддержки привязки."""
+    global _tracker
+    if _tracker is None:
+        backend = create_backend()
+        if backend is None:
+            return None
+        _tracker = WindowTracker(backend)
+    return _tracker
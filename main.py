@@ -10,6 +10,10 @@ from PySide6.QtCore import QStandardPaths
 # Импортируем наши модули
 from core.widget_manager import WidgetManager
 from core.tray import TrayApp
+from core.log_service import get_log_service
+from core.stall_watchdog import get_stall_watchdog, DEFAULT_THRESHOLD_MS
+from core.tracing import get_tracer, trace_enabled_by_env
+from core.profiling import get_profiler
 
 def main():
     # === 1. Настройка окружения для Linux ===
@@ -33,6 +37,9 @@ def main():
         config_dir = Path(QStandardPaths.writableLocation(QStandardPaths.AppConfigLocation))
         config_dir.mkdir(parents=True, exist_ok=True)
         config_path = config_dir / "widgets.json"
+
+        # Логи: консоль + кольцевой буфер для DevTools + chronodash.log с ротацией
+        get_log_service().install()
         
         if config_path.exists():
             try:
@@ -57,9 +64,24 @@ def main():
         app.setApplicationName("ChronoDash")
         app.setApplicationDisplayName("ChronoDash Desktop Widgets")
 
+        # CHRONODASH_PROFILE=cpu=60,mem — профилирование с запуска (до создания виджетов)
+        get_profiler().start_from_env()
+
         # Менеджер виджетов
         wm = WidgetManager(config_path)
 
+        # Сторожевой таймер: пишет в лог зависания GUI-потока со стеком
+        watchdog = get_stall_watchdog()
+        watchdog.set_threshold(wm.get_global_setting("stall_threshold_ms", DEFAULT_THRESHOLD_MS))
+        if wm.get_global_setting("stall_watchdog", True):
+            watchdog.start()
+
+        # Трасса: CHRONODASH_TRACE=1 — писать с запуска; SIGUSR1/SIGUSR2 — сохранить / вкл-выкл
+        tracer = get_tracer()
+        tracer.install_signal_handlers()
+        if trace_enabled_by_env():
+            tracer.start()
+
         # Трей и управление
         tray = TrayApp(wm)
         
@@ -0,0 +1,40 @@
+# ChronoDash - Base Widget
+# Copyright (C) 2025 Overl1te
+
+import os
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+# Модули приложения импортируются как core.*, widgets.* — от корня репозитория
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+# Виджетам нужен QApplication, но не экран
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PySide6.QtCore import QCoreApplication, QDeadlineTimer, QStandardPaths  # noqa: E402
+from PySide6.QtWidgets import QApplication  # noqa: E402
+
+
+@pytest.fixture(scope="session")
+def qapp():
+    # Кэши и конфиги — в ~/.qttest, а не в настоящем ~/.config
+    QStandardPaths.setTestModeEnabled(True)
+    app = QApplication.instance() or QApplication([])
+    yield app
+    # Рабочие потоки пула не должны пережить интерпретатор
+    from core.io_service import get_io_service
+    get_io_service().shutdown()
+
+
+def wait_until(predicate, timeout_ms=5000):
+    """Крутит цикл событий, пока predicate() не станет истинным."""
+    deadline = QDeadlineTimer(timeout_ms)
+    while not predicate():
+        if deadline.hasExpired():
+            return False
+        QCoreApplication.processEvents()
+        time.sleep(0.005)
+    return True
@@ -0,0 +1,39 @@
+# ChronoDash - Base Widget
+# Copyright (C) 2025 Overl1te
+
+import numpy as np
+
+from core.forecast import ForecastModel, decimate_minmax
+
+T0 = 1_700_000_000 - 1_700_000_000 % 86400
+
+
+def _model(temps, daily_min, daily_max):
+    return ForecastModel({
+        "utc_offset_seconds": 0,
+        "hourly": {"time": [T0 + i * 3600 for i in range(len(temps))], "temperature_2m": temps},
+        "daily": {
+            "time": [T0 + i * 86400 for i in range(len(daily_min))],
+            "temperature_2m_min": daily_min,
+            "temperature_2m_max": daily_max,
+        },
+    })
+
+
+def test_upcoming_labels_render_missing_values_as_dashes():
+    model = _model([1.4, None, -2.6, None], [0], [1])
+    assert model.upcoming_labels(T0, 4) == ["00:00 1°", "01:00 --", "02:00 -3°", "03:00 --"]
+
+
+def test_daily_labels_render_missing_values_as_dashes():
+    model = _model([0.0], [-1.2, None], [None, 5.5])
+    labels = model.daily_labels(2)
+    assert labels[0].endswith(": -1°..--")
+    assert labels[1].endswith(": --..6°")
+
+
+def test_decimate_minmax_skips_nan():
+    values = np.array([1, np.nan, 3, 2, np.nan, np.nan, 5, 0], dtype=np.float32)
+    idx, vals = decimate_minmax(values, 2)
+    assert not np.isnan(vals).any()
+    assert vals.min() == 0 and vals.max() == 5
@@ -0,0 +1,69 @@
+# ChronoDash - Base Widget
+# Copyright (C) 2025 Overl1te
+
+import pytest
+from PySide6.QtCore import QObject
+
+from conftest import wait_until
+from core import geocoding
+from core.geocoding import GeocodingService, LocationCache
+
+
+@pytest.fixture
+def fetched(monkeypatch):
+    """Подменяет запрос к Nominatim; возвращает список запрошенных строк."""
+    calls = []
+
+    def fake_fetch(query):
+        calls.append(query)
+        return [{"name": f"{query} city", "lat": 1.0, "lon": 2.0}]
+
+    monkeypatch.setattr(geocoding, "_fetch_places", fake_fetch)
+    monkeypatch.setattr(geocoding, "MIN_REQUEST_INTERVAL_S", 0.0)
+    return calls
+
+
+@pytest.fixture
+def service(qapp, tmp_path, fetched):
+    return GeocodingService(LocationCache(tmp_path / "cache.json"), max_queries=3)
+
+
+def test_new_search_cancels_previous_query_of_same_owner(service, fetched):
+    owner = QObject()
+    results = []
+    service.search("mos", on_result=lambda p: results.append(("mos", p)), owner=owner)
+    service.search("moscow", on_result=lambda p: results.append(("moscow", p)), owner=owner)
+
+    assert wait_until(lambda: results)
+    assert fetched == ["moscow"]
+    assert [q for q, _ in results] == ["moscow"]
+    assert service.stats["cancelled"] == 1
+    assert not service._pending and not service._by_owner
+
+
+def test_other_owners_keep_their_query(service, fetched):
+    first, second = QObject(), QObject()
+    results = []
+    service.search("paris", on_result=lambda p: results.append("paris"), owner=first)
+    service.search("rome", on_result=lambda p: results.append("rome"), owner=second)
+
+    assert wait_until(lambda: len(results) == 2)
+    assert sorted(fetched) == ["paris", "rome"]
+
+
+def test_prefix_cache_is_bounded_lru(service, fetched):
+    for query in ("a1", "b1", "c1"):
+        done = []
+        service.search(query, on_result=done.append)
+        assert wait_until(lambda: done)
+
+    # Попадание в кэш освежает запрос, вытесняется самый старый — b1
+    service.search("a1", on_result=lambda p: None)
+    done = []
+    service.search("d1", on_result=done.append)
+    assert wait_until(lambda: done)
+
+    assert list(service._entries()) == ["c1", "a1", "d1"]
+    assert service.suggest("b") == []
+    assert [p["name"] for p in service.suggest("a")] == ["a1 city"]
+    assert service.stats["evicted"] == 1
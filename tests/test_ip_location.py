@@ -0,0 +1,153 @@
+# ChronoDash - Base Widget
+# Copyright (C) 2025 Overl1te
+
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from conftest import wait_until
+from core import ip_location
+from core.geocoding import LocationCache
+from core.ip_location import DEFAULT_LOCATION, IP_CACHE_TTL_S, IPLocationResolver
+
+SLOW_DELAY_S = 1.0
+
+# Путь → (задержка, код ответа, тело)
+ROUTES = {
+    "/fast": (0.0, 200, json.dumps({"latitude": 59.94, "longitude": 30.31, "city": "Saint Petersburg"})),
+    "/slow": (SLOW_DELAY_S, 200, json.dumps({"lat": 48.85, "lon": 2.35, "city": "Paris"})),
+    "/failing": (0.0, 500, "Internal Server Error"),
+    "/malformed": (0.0, 200, "{not json"),
+    "/null-island": (0.0, 200, json.dumps({"latitude": 0, "longitude": 0})),
+}
+
+
+class _Handler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        self.server.hits.append(self.path)
+        delay, code, body = ROUTES[self.path]
+        time.sleep(delay)
+        data = body.encode()
+        self.send_response(code)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture(scope="module")
+def server():
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+    httpd.daemon_threads = True
+    httpd.hits = []
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield httpd
+    httpd.shutdown()
+    httpd.server_close()
+
+
+@pytest.fixture
+def use_providers(server, monkeypatch):
+    """use_providers("fast", "slow") — провайдеры на локальном сервере."""
+    server.hits.clear()
+
+    def install(*routes):
+        base = f"http://127.0.0.1:{server.server_address[1]}"
+        monkeypatch.setattr(ip_location, "PROVIDERS", [(r, f"{base}/{r}") for r in routes])
+    return install
+
+
+@pytest.fixture
+def resolver(qapp, tmp_path):
+    return IPLocationResolver(LocationCache(tmp_path / "cache.json"))
+
+
+def _resolve(resolver):
+    results = []
+    resolver.resolve(results.append)
+    assert wait_until(lambda: results, timeout_ms=10_000)
+    return results[0]
+
+
+def test_fastest_valid_provider_wins(resolver, use_providers, server):
+    use_providers("failing", "malformed", "slow", "fast")
+    started = time.monotonic()
+    loc = _resolve(resolver)
+
+    assert loc["source"] == "fast"
+    assert loc["city"] == "Saint Petersburg"
+    assert "fallback" not in loc
+    assert time.monotonic() - started < SLOW_DELAY_S
+    assert resolver._tasks == []
+
+
+def test_slow_provider_answer_is_used_when_others_fail(resolver, use_providers):
+    use_providers("failing", "malformed", "null-island", "slow")
+    loc = _resolve(resolver)
+    assert loc["source"] == "slow"
+    assert (loc["lat"], loc["lon"]) == (48.85, 2.35)
+
+
+def test_concurrent_callers_share_one_race(resolver, use_providers, server):
+    use_providers("fast")
+    results = []
+    resolver.resolve(results.append)
+    resolver.resolve(results.append)
+    assert wait_until(lambda: len(results) == 2)
+    assert results[0] == results[1]
+    assert server.hits == ["/fast"]
+
+
+def test_fresh_cache_skips_network(resolver, use_providers, server):
+    use_providers("fast")
+    first = _resolve(resolver)
+    server.hits.clear()
+
+    results = []
+    resolver.resolve(results.append)
+    # Из кэша ответ приходит синхронно
+    assert results == [first]
+    assert server.hits == []
+    # И переживает перезапуск: кэш лежит в файле
+    reloaded = IPLocationResolver(LocationCache(resolver.cache.path))
+    assert reloaded.cached() == first
+
+
+def test_expired_cache_goes_to_network(resolver, use_providers, server):
+    use_providers("fast")
+    _resolve(resolver)
+    resolver._entry()["ts"] -= IP_CACHE_TTL_S + 1
+    assert resolver.cached() is None
+
+    server.hits.clear()
+    loc = _resolve(resolver)
+    assert loc["source"] == "fast"
+    assert server.hits == ["/fast"]
+
+
+def test_all_failed_without_cache_falls_back_to_default(resolver, use_providers):
+    use_providers("failing", "malformed", "null-island")
+    loc = _resolve(resolver)
+    assert loc["fallback"] is True
+    assert (loc["lat"], loc["lon"]) == (DEFAULT_LOCATION["lat"], DEFAULT_LOCATION["lon"])
+    # Запасной ответ не кэшируется
+    assert resolver.cached(allow_stale=True) is None
+
+
+def test_all_failed_uses_stale_cache(resolver, use_providers):
+    use_providers("fast")
+    _resolve(resolver)
+    resolver._entry()["ts"] -= IP_CACHE_TTL_S + 1
+
+    use_providers("failing", "malformed")
+    loc = _resolve(resolver)
+    assert loc["fallback"] is True
+    assert loc["source"] == "fast"
+    assert loc["city"] == "Saint Petersburg"
@@ -0,0 +1,12 @@
+# ChronoDash - Base Widget
+# Copyright (C) 2025 Overl1te
+
+import pytest
+
+from core.registry import MODULES, get_default_config
+
+
+@pytest.mark.parametrize("type_id", [*MODULES, "unknown_type"])
+def test_default_config_keeps_widget_on_top(type_id):
+    # Тот же дефолт, что у BaseDesktopWidget и у галочки в настройках
+    assert get_default_config(type_id)["always_on_top"] is True
@@ -0,0 +1,68 @@
+# ChronoDash - Base Widget
+# Copyright (C) 2025 Overl1te
+
+import json
+
+import pytest
+from PySide6.QtCore import QCoreApplication
+
+from core.registry import get_default_config
+from core.settings_window import SettingsWindow
+from core.widget_manager import WidgetManager
+
+
+@pytest.fixture
+def manager(qapp, tmp_path):
+    wm = WidgetManager(tmp_path / "widgets.json")
+    yield wm
+    wm.stop_all_widgets()
+    QCoreApplication.processEvents()
+
+
+@pytest.fixture
+def window(manager):
+    win = SettingsWindow(manager)
+    yield win
+    win.close()
+    win.deleteLater()
+
+
+def _saved(manager, wid):
+    data = json.loads(manager.config_path.read_text(encoding="utf-8"))
+    widgets = data["widgets"] if isinstance(data, dict) else data
+    return next(c for c in widgets if c["id"] == wid)
+
+
+def test_edit_drag_edit_keeps_dragged_position(manager, window):
+    wid = manager.create_widget_from_template(get_default_config("clock"))
+    window.select_widget(wid)
+    assert window.current_widget_id == wid
+
+    window.general_binder("name", "Первое имя")
+    window.apply_queue.flush()
+
+    # Конец драга: виджет отдает менеджеру свою копию конфига с новой геометрией
+    widget = manager.widgets[wid]
+    widget.move(500, 400)
+    widget._notify_update()
+    assert window.general_binder.get("x") == 500
+
+    window.general_binder("name", "Второе имя")
+    window.apply_queue.flush()
+
+    assert (widget.x(), widget.y()) == (500, 400)
+    saved = _saved(manager, wid)
+    assert (saved["x"], saved["y"], saved["name"]) == (500, 400, "Второе имя")
+
+
+def test_pending_edit_is_saved_on_quit(qapp, manager, window):
+    wid = manager.create_widget_from_template(get_default_config("clock"))
+    window.select_widget(wid)
+
+    # Выход раньше, чем истек APPLY_DELAY_MS после правки
+    window.general_binder("name", "Перед выходом")
+    assert _saved(manager, wid)["name"] != "Перед выходом"
+    qapp.aboutToQuit.emit()
+
+    assert _saved(manager, wid)["name"] == "Перед выходом"
+    assert manager.widgets[wid].cfg["name"] == "Перед выходом"
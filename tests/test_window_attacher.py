@@ -0,0 +1,184 @@
+# ChronoDash - Base Widget
+# Copyright (C) 2025 Overl1te
+
+import threading
+
+import pytest
+import shiboken6
+from PySide6.QtCore import QCoreApplication
+from PySide6.QtWidgets import QWidget
+
+from conftest import wait_until
+from core.window_attacher import ANCHORS, FakeBackend, WindowTracker, _Attachment
+
+
+def _cfg(title="Editor", anchor="top-left", dx=0, dy=0, enabled=True):
+    return {"attach_to_window": {"enabled": enabled, "window_title": title,
+                                 "anchor": anchor, "offset_x": dx, "offset_y": dy}}
+
+
+@pytest.fixture
+def backend():
+    return FakeBackend()
+
+
+@pytest.fixture
+def tracker(qapp, backend):
+    tracker = WindowTracker(backend)
+    yield tracker
+    tracker.stop()
+
+
+def _add(tracker, wid, cfg, size=(100, 50)):
+    """Привязка без фонового потока: тесты сами зовут poll_once()."""
+    moves = []
+    entry = _Attachment(wid, lambda x, y: moves.append((x, y)), cfg["attach_to_window"], size)
+    tracker._entries[wid] = entry
+    return moves
+
+
+def _poll_from_worker(tracker, fn):
+    """Как в потоке трекера: из чужого потока сдвиги уходят в GUI через очередь событий."""
+    thread = threading.Thread(target=fn)
+    thread.start()
+    thread.join()
+
+
+@pytest.mark.parametrize("anchor, expected", [
+    ("top-left", (110, 215)),
+    ("top", (360, 215)),
+    ("top-right", (610, 215)),
+    ("left", (110, 390)),
+    ("center", (360, 390)),
+    ("right", (610, 390)),
+    ("bottom-left", (110, 565)),
+    ("bottom", (360, 565)),
+    ("bottom-right", (610, 565)),
+])
+def test_anchor_position(anchor, expected):
+    # Окно 600x400 в (100, 200), виджет 100x50, смещение (+10, +15)
+    entry = _Attachment("w", None, _cfg(anchor=anchor, dx=10, dy=15)["attach_to_window"], (100, 50))
+    assert WindowTracker._position(entry, (100, 200, 600, 400)) == expected
+
+
+def test_unknown_anchor_falls_back_to_top_left():
+    entry = _Attachment("w", None, _cfg(anchor="nowhere")["attach_to_window"])
+    assert entry.anchor == "top-left"
+    assert set(ANCHORS) >= {"top-left", "center", "bottom-right"}
+
+
+def test_moves_only_when_window_rect_changes(tracker, backend):
+    handle = backend.add_window("My Editor - file.py", (0, 0, 800, 600))
+    moves = _add(tracker, "w", _cfg(anchor="bottom-right"))
+
+    assert tracker.poll_once() == 1
+    assert tracker.poll_once() == 0  # Окно не двигалось
+    QCoreApplication.processEvents()
+    assert moves == [(700, 550)]
+
+    backend.move_window(handle, (50, 50, 800, 600))
+    assert tracker.poll_once() == 1
+    QCoreApplication.processEvents()
+    assert moves[-1] == (750, 600)
+
+
+def test_window_lookup_is_cached(tracker, backend):
+    backend.add_window("Editor", (0, 0, 300, 300))
+    _add(tracker, "a", _cfg())
+    _add(tracker, "b", _cfg(anchor="center"))
+    for _ in range(5):
+        tracker.poll_once()
+
+    # Второй виджет с тем же заголовком берет окно из кэша
+    assert backend.find_calls == 1
+    assert tracker.stats["lookups"] == 1
+    assert tracker.stats["cache_hits"] == 1
+
+
+def test_lost_window_is_searched_again_at_most_once_per_retry(tracker, backend):
+    handle = backend.add_window("Editor", (0, 0, 300, 300))
+    moves = _add(tracker, "w", _cfg())
+    tracker.poll_once()
+    backend.close_window(handle)
+
+    for _ in range(10):
+        tracker.poll_once()
+    # Окно пропало сразу после первого поиска: повторный — не раньше LOST_RETRY_S
+    assert backend.find_calls == 1
+
+    tracker._entries["w"].next_lookup = 0.0
+    backend.add_window("Editor", (40, 40, 300, 300))
+    assert tracker.poll_once() == 1
+    QCoreApplication.processEvents()
+    assert moves[-1] == (40, 40)
+
+
+def test_moves_are_coalesced_until_gui_flushes(tracker, backend):
+    handle = backend.add_window("Editor", (0, 0, 300, 300))
+    moves = _add(tracker, "w", _cfg())
+    emitted = []
+    tracker._dispatcher.moves_ready.connect(lambda: emitted.append(1))
+
+    def poll():
+        for x in range(5):
+            backend.move_window(handle, (x, 0, 300, 300))
+            tracker.poll_once()
+    _poll_from_worker(tracker, poll)
+
+    assert tracker.stats["coalesced"] == 4
+    QCoreApplication.processEvents()
+    assert len(emitted) == 1
+    # GUI применил только последнюю позицию
+    assert moves == [(4, 0)]
+    assert tracker.stats["moves"] == 1
+
+
+def test_detached_widget_pending_move_is_dropped(tracker, backend):
+    backend.add_window("Editor", (0, 0, 300, 300))
+    moves = _add(tracker, "w", _cfg())
+    _poll_from_worker(tracker, tracker.poll_once)
+    tracker.detach("w")
+    QCoreApplication.processEvents()
+    assert moves == []
+
+
+def test_attach_follows_window_in_background_thread(tracker, backend):
+    handle = backend.add_window("Editor", (100, 100, 400, 300))
+    widget = QWidget()
+    widget.resize(100, 50)
+    tracker.attach("w", widget, _cfg(anchor="bottom-right"))
+    assert wait_until(lambda: widget.pos().x() == 400 and widget.pos().y() == 350)
+
+    backend.move_window(handle, (0, 0, 400, 300))
+    assert wait_until(lambda: widget.pos().x() == 300 and widget.pos().y() == 250)
+
+
+def test_repeated_attach_connects_destroyed_once(tracker, backend):
+    backend.add_window("Editor", (0, 0, 300, 300))
+    widget = QWidget()
+    signal = "2destroyed(QObject*)"
+    tracker.attach("w", widget, _cfg())
+    connected = widget.receivers(signal)
+    for dx in range(1, 5):
+        tracker.attach("w", widget, _cfg(dx=dx))
+    assert widget.receivers(signal) == connected
+
+    shiboken6.delete(widget)
+    assert not tracker.is_tracking("w")
+    assert tracker._hooked == {}
+
+
+def test_old_widget_destruction_keeps_new_attachment(tracker, backend):
+    backend.add_window("Editor", (0, 0, 300, 300))
+    old, new = QWidget(), QWidget()
+    tracker.attach("w", old, _cfg())
+    tracker.attach("w", new, _cfg())
+
+    shiboken6.delete(old)
+    assert tracker.is_tracking("w")
+    shiboken6.delete(new)
+    assert not tracker.is_tracking("w")
+
+
+def test_fake_backend_wait_accepts_none():
+    FakeBackend().wait(None)
@@ -0,0 +1,138 @@
+# ChronoDash - Base Widget
+# Copyright (C) 2025 Overl1te
+
+"""
+X11Backend на настоящем X-сервере: свой Xvfb, а без него — DISPLAY,
+если там не запущен оконный менеджер (он двигает и обрамляет окна сам).
+Если подходящего сервера нет (или нет python-xlib), тесты пропускаются.
+"""
+
+import os
+import platform
+import shutil
+import subprocess
+
+import pytest
+from PySide6.QtWidgets import QWidget
+
+from conftest import wait_until
+from core import window_attacher
+from core.window_attacher import WindowTracker
+
+pytestmark = pytest.mark.skipif(
+    platform.system() != "Linux" or getattr(window_attacher, "xdisplay", None) is None,
+    reason="X11Backend есть только на Linux с python-xlib",
+)
+
+TITLE = "ChronoDash X11 test window"
+
+
+@pytest.fixture(scope="module")
+def x_display():
+    from Xlib import display as xdisplay
+
+    xvfb = shutil.which("Xvfb")
+    if xvfb is None:
+        if not os.environ.get("DISPLAY"):
+            pytest.skip("Нет ни Xvfb, ни DISPLAY")
+        yield os.environ["DISPLAY"]
+        return
+
+    # -displayfd: Xvfb сам выбирает свободный номер дисплея и пишет его в канал
+    read_fd, write_fd = os.pipe()
+    proc = subprocess.Popen(
+        [xvfb, "-displayfd", str(write_fd), "-screen", "0", "1280x1024x24", "-nolisten", "tcp"],
+        pass_fds=(write_fd,), stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    os.close(write_fd)
+    with os.fdopen(read_fd) as f:
+        number = f.readline().strip()
+    if not number:
+        proc.kill()
+        pytest.skip("Xvfb не запустился")
+    display = f":{number}"
+    xdisplay.Display(display).close()
+
+    previous = os.environ.get("DISPLAY")
+    os.environ["DISPLAY"] = display
+    try:
+        yield display
+    finally:
+        if previous is None:
+            del os.environ["DISPLAY"]
+        else:
+            os.environ["DISPLAY"] = previous
+        proc.terminate()
+        proc.wait(timeout=5)
+
+
+@pytest.fixture
+def x_window(x_display):
+    """Окно 300x200 в (50, 60), зарегистрированное в _NET_CLIENT_LIST (WM в тесте нет — делаем это сами)."""
+    from Xlib import X, Xatom, display as xdisplay
+
+    dpy = xdisplay.Display(x_display)
+    root = dpy.screen().root
+    if root.get_full_property(dpy.intern_atom("_NET_SUPPORTING_WM_CHECK"), X.AnyPropertyType):
+        dpy.close()
+        pytest.skip("На дисплее работает оконный менеджер")
+    win = root.create_window(50, 60, 300, 200, 0, X.CopyFromParent, X.InputOutput, X.CopyFromParent)
+    win.change_property(dpy.intern_atom("_NET_WM_NAME"), dpy.intern_atom("UTF8_STRING"), 8, TITLE.encode())
+    win.map()
+    root.change_property(dpy.intern_atom("_NET_CLIENT_LIST"), Xatom.WINDOW, 32, [win.id])
+    dpy.sync()
+    yield dpy, win
+    win.destroy()
+    root.delete_property(dpy.intern_atom("_NET_CLIENT_LIST"))
+    dpy.close()
+
+
+@pytest.fixture
+def tracker(qapp, x_display):
+    backend = window_attacher.X11Backend()
+    tracker = WindowTracker(backend)
+    yield tracker
+    tracker.stop()
+    backend.dpy.close()
+
+
+def _attach(tracker, anchor="bottom-right"):
+    widget = QWidget()
+    widget.resize(100, 50)
+    cfg = {"attach_to_window": {"enabled": True, "window_title": "x11 TEST", "anchor": anchor}}
+    tracker.attach("x11", widget, cfg)
+    return widget
+
+
+def _at(widget, x, y):
+    return lambda: (widget.pos().x(), widget.pos().y()) == (x, y)
+
+
+def test_backend_finds_window_and_reads_rect(tracker, x_window):
+    _, win = x_window
+    backend = tracker.backend
+    assert backend.find_window("x11 test") == win.id
+    assert backend.find_window("no such window") is None
+    assert backend.get_rect(win.id) == (50, 60, 300, 200)
+
+
+def test_widget_follows_window_by_configure_events(tracker, x_window):
+    dpy, win = x_window
+    widget = _attach(tracker)
+    assert wait_until(_at(widget, 50 + 300 - 100, 60 + 200 - 50))
+
+    # Окно найдено — трекер спит без таймаута и просыпается только от событий X
+    with tracker._cond:
+        entries = list(tracker._entries.values())
+    assert tracker._wait_timeout(entries) is None
+    lookups = tracker.stats["lookups"]
+
+    win.configure(x=200, y=100)
+    dpy.sync()
+    assert wait_until(_at(widget, 200 + 300 - 100, 100 + 200 - 50))
+
+    win.configure(width=500, height=400)
+    dpy.sync()
+    assert wait_until(_at(widget, 200 + 500 - 100, 100 + 400 - 50))
+    # Движения пришли событиями, окно заново не искали
+    assert tracker.stats["lookups"] == lookups
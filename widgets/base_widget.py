@@ -3,9 +3,15 @@
 
 from pathlib import Path
 from PySide6.QtWidgets import QWidget
-from PySide6.QtGui import QPainter, QColor, QPen, QIcon, QRegion, QCursor, QPixmap
+from PySide6.QtGui import QPainter, QColor, QPen, QIcon, QRegion, QCursor, QPixmap, QGuiApplication, QFont
 from PySide6.QtCore import Qt, QTimer, QPoint, QRect, Signal
 import platform
+import time
+
+from core.config_diff import touches, GEOMETRY_KEYS, WINDOW_KEYS
+from core.snapping import MOVE_EDGES, EDGE_MIN, EDGE_MAX
+from core.perf_stats import PAINT_STATS
+from core.tracing import span, traced
 
 # --- КОНСТАНТЫ ---
 ACTION_NONE = 0
@@ -23,8 +29,39 @@ AREA_TOP_RIGHT = 6
 AREA_BOTTOM_LEFT = 7
 AREA_BOTTOM_RIGHT = 8
 
+# Какой край тянет каждая зона ресайза (для привязки к направляющим)
+LEFT_AREAS = (AREA_LEFT, AREA_TOP_LEFT, AREA_BOTTOM_LEFT)
+RIGHT_AREAS = (AREA_RIGHT, AREA_TOP_RIGHT, AREA_BOTTOM_RIGHT)
+TOP_AREAS = (AREA_TOP, AREA_TOP_LEFT, AREA_TOP_RIGHT)
+BOTTOM_AREAS = (AREA_BOTTOM, AREA_BOTTOM_LEFT, AREA_BOTTOM_RIGHT)
+
+# Поля конфига, которые можно применить мгновенно, без перезагрузки контента
+VISUAL_KEYS = ("opacity", "x", "y", "width", "height")
+
+# Частота кадров, если экран не сообщил свою
+DEFAULT_REFRESH_HZ = 60
+# Как часто во время драга рассылать предпросмотр геометрии (настройки, менеджер)
+PREVIEW_INTERVAL_S = 0.1
+
+# Платформы, где флаги можно сменить у живого QWindow без пересоздания окна:
+# xcb переключает input shape и _NET_WM_STATE_ABOVE, windows — WS_EX_TRANSPARENT и HWND_TOPMOST
+NATIVE_FLAG_PLATFORMS = {"xcb", "windows", "cocoa"}
+
+# Сколько раз и за сколько мс переключались флаги окна (для DevTools)
+FLAG_SWITCH_STATS = {
+    "native": {"count": 0, "total_ms": 0.0},
+    "recreate": {"count": 0, "total_ms": 0.0},
+}
+
 class BaseDesktopWidget(QWidget):
+    # Финальное изменение конфига (сохраняется на диск)
     config_changed = Signal(str, dict)
+    # Промежуточная геометрия во время драга: только для отображения, без сохранения
+    geometry_preview = Signal(str, dict)
+    # Каждый кадр драга: (id, геометрия на старте драга, текущая) — для группового редактирования
+    drag_frame = Signal(str, QRect, QRect)
+    # Ctrl+клик в режиме редактирования: добавить/убрать из выделения
+    selection_toggled = Signal(str)
 
     def __init__(self, cfg=None, is_preview=False):
         super().__init__()
@@ -42,6 +79,18 @@ class BaseDesktopWidget(QWidget):
         self._drag_start_pos = QPoint()
         self._win_start_geo = QRect()
 
+        # Драг: события мыши только запоминают цель, геометрия применяется раз в кадр
+        self._pending_geo = None
+        self._last_preview = 0.0
+        self._frame_timer = QTimer(self)
+        self._frame_timer.setSingleShot(True)
+        self._frame_timer.setTimerType(Qt.PreciseTimer)
+        self._frame_timer.timeout.connect(self._apply_pending_geometry)
+
+        # Привязка к направляющим: (id, (l, t, r, b), x_edges, y_edges) -> (l, t, r, b).
+        # Выставляет WidgetManager на время редактирования.
+        self.snap_handler = None
+
         self.setAttribute(Qt.WA_TranslucentBackground, True)
         self.setAttribute(Qt.WA_NoSystemBackground, True)
         self.setAttribute(Qt.WA_Hover, True) 
@@ -91,19 +140,27 @@ class BaseDesktopWidget(QWidget):
             self.clearMask()
         super().resizeEvent(event)
 
-    def update_config(self, new_cfg):
+    def update_config(self, new_cfg, changed=None):
+        """
+        changed — пути изменившихся ключей (см. core.config_diff), None — все.
+        Подклассы вызывают super() и сами решают, трогать ли контент.
+        """
         if self._action != ACTION_NONE: return
 
         if self.is_editing:
             for key, value in new_cfg.items():
-                if key not in ["x", "y", "width", "height"]:
+                if key not in GEOMETRY_KEYS:
                     self.cfg[key] = value
             self.update()
             return
 
         self.cfg = new_cfg.copy()
-        self.__apply_flags()
-        self.__apply_opacity()
+        if touches(changed, *WINDOW_KEYS):
+            self.__apply_flags()
+            self.__apply_opacity()
+        if not touches(changed, *GEOMETRY_KEYS):
+            self.update()
+            return
         
         target_w = max(int(self.cfg.get("width", 320)), self.min_size)
         target_h = max(int(self.cfg.get("height", 180)), self.min_size)
@@ -115,14 +172,28 @@ class BaseDesktopWidget(QWidget):
         )
         self.update()
 
+    def apply_visual(self, cfg):
+        """Живой предпросмотр из настроек: только прозрачность и геометрия (VISUAL_KEYS)."""
+        if self._action != ACTION_NONE: return
+        for key in VISUAL_KEYS:
+            if key in cfg: self.cfg[key] = cfg[key]
+        self.__apply_opacity()
+        if self.is_editing: return
+
+        self.setGeometry(
+            int(self.cfg.get("x", self.x())),
+            int(self.cfg.get("y", self.y())),
+            max(int(self.cfg.get("width", 320)), self.min_size),
+            max(int(self.cfg.get("height", 180)), self.min_size)
+        )
+
     def set_edit_mode(self, enabled: bool):
         geo = self.geometry()
         self.is_editing = enabled
         
         if enabled:
-            self.setAttribute(Qt.WA_TransparentForMouseEvents, False)
-            self.setWindowFlags(Qt.FramelessWindowHint | Qt.WindowStaysOnTopHint | Qt.Tool)
-            self.show()
+            self._clear_desktop_parent()
+            self.__apply_flags()
             self.setMouseTracking(True)
             
             # Полный сброс и установка маски при входе
@@ -144,9 +215,12 @@ class BaseDesktopWidget(QWidget):
         self.update()
 
     def __apply_flags(self):
-        flags = Qt.FramelessWindowHint | Qt.WindowStaysOnTopHint | Qt.Tool
+        flags = Qt.FramelessWindowHint | Qt.Tool
         ignore_mouse = False
 
+        if self.is_editing or self.cfg.get("always_on_top", True):
+            flags |= Qt.WindowStaysOnTopHint
+
         if not self.is_preview and not self.is_editing:
             if self.cfg.get("click_through", True):
                 flags |= Qt.WindowTransparentForInput
@@ -156,12 +230,43 @@ class BaseDesktopWidget(QWidget):
                 QTimer.singleShot(0, self._set_desktop_parent)
 
         if self.windowFlags() != flags:
+            self.__switch_flags(flags)
+
+        self.setAttribute(Qt.WA_TransparentForMouseEvents, ignore_mouse)
+
+    def __switch_flags(self, flags):
+        """
+        Меняет флаги окна, по возможности не пересоздавая его.
+
+        QWidget.setWindowFlags уничтожает нативное окно и создает заново
+        (мигание, повторный map на X11). Если окно уже есть и платформа умеет
+        менять флаги на лету, меняем их у QWindow, а QWidget просто
+        сообщаем новые значения через overrideWindowFlags.
+        """
+        started = time.perf_counter()
+        handle = self.windowHandle()
+
+        if handle is None:
+            # Нативного окна еще нет — пересоздавать нечего
+            self.setWindowFlags(flags)
+            return
+
+        if QGuiApplication.platformName() in NATIVE_FLAG_PLATFORMS:
+            self.overrideWindowFlags(flags)
+            handle.setFlags(flags)
+            mode = "native"
+        else:
             geo = self.geometry()
+            was_visible = self.isVisible()
             self.setWindowFlags(flags)
             self.setGeometry(geo)
-            self.show()
+            if was_visible: self.show()
+            mode = "recreate"
 
-        self.setAttribute(Qt.WA_TransparentForMouseEvents, ignore_mouse)
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        FLAG_SWITCH_STATS[mode]["count"] += 1
+        FLAG_SWITCH_STATS[mode]["total_ms"] += elapsed_ms
+        self._log(f"Flags switched ({mode}) in {elapsed_ms:.2f} ms")
 
     def __apply_opacity(self):
         val = 1.0 if self.is_editing else self.cfg.get("opacity", 1.0)
@@ -179,6 +284,14 @@ class BaseDesktopWidget(QWidget):
                 if worker_w: win32gui.SetParent(int(self.winId()), worker_w)
         except: pass
 
+    def _clear_desktop_parent(self):
+        """Отцепляет окно от WorkerW: без пересоздания окна это надо делать явно."""
+        if platform.system() != "Windows" or self.windowHandle() is None: return
+        try:
+            import win32gui
+            win32gui.SetParent(int(self.winId()), 0)
+        except: pass
+
     # ==========================================================================
     #  МАТЕМАТИКА И DRAG&DROP
     # ==========================================================================
@@ -207,6 +320,11 @@ class BaseDesktopWidget(QWidget):
         if not (self.is_editing or self.is_preview): return
         if event.button() != Qt.LeftButton: return
 
+        if self.is_editing and event.modifiers() & Qt.ControlModifier:
+            self.selection_toggled.emit(self.cfg.get("id"))
+            event.accept()
+            return
+
         self.grabMouse() 
 
         self._drag_start_pos = event.globalPos()
@@ -240,54 +358,102 @@ class BaseDesktopWidget(QWidget):
 
         if self._action == ACTION_MOVE:
             new_geo.translate(dx, dy)
-            self.move(new_geo.topLeft())
 
         elif self._action == ACTION_RESIZE:
             area = self._resize_area
             min_s = self.min_size
             
             # --- Расчет геометрии ---
-            if area in [AREA_LEFT, AREA_TOP_LEFT, AREA_BOTTOM_LEFT]:
+            if area in LEFT_AREAS:
                 w = start.width() - dx
                 if w < min_s: new_geo.setLeft(start.right() - min_s + 1)
                 else: new_geo.setLeft(start.left() + dx)
-            elif area in [AREA_RIGHT, AREA_TOP_RIGHT, AREA_BOTTOM_RIGHT]:
+            elif area in RIGHT_AREAS:
                 w = start.width() + dx
                 new_geo.setWidth(max(min_s, w))
 
-            if area in [AREA_TOP, AREA_TOP_LEFT, AREA_TOP_RIGHT]:
+            if area in TOP_AREAS:
                 h = start.height() - dy
                 if h < min_s: new_geo.setTop(start.bottom() - min_s + 1)
                 else: new_geo.setTop(start.top() + dy)
-            elif area in [AREA_BOTTOM, AREA_BOTTOM_LEFT, AREA_BOTTOM_RIGHT]:
+            elif area in BOTTOM_AREAS:
                 h = start.height() + dy
                 new_geo.setHeight(max(min_s, h))
 
-            # --- ПРИМЕНЕНИЕ (Hard Reset) ---
-            # 1. Применяем размеры
+        # Мышь может слать сотни событий в секунду — применяем только последнее, раз в кадр
+        self._pending_geo = new_geo
+        if not self._frame_timer.isActive():
+            self._frame_timer.start(self._frame_interval_ms())
+        event.accept()
+
+    def _frame_interval_ms(self):
+        screen = self.screen()
+        hz = screen.refreshRate() if screen else 0
+        return max(1, int(1000 / (hz if hz > 0 else DEFAULT_REFRESH_HZ)))
+
+    @traced("geometry.frame", "timer")
+    def _apply_pending_geometry(self):
+        """Раз в кадр: одна установка геометрии и маски + редкий предпросмотр."""
+        new_geo = self._pending_geo
+        self._pending_geo = None
+        if new_geo is None: return
+        if self.snap_handler and self._action != ACTION_NONE:
+            new_geo = self._snap_geometry(new_geo)
+        if new_geo == self.geometry(): return
+
+        size_changed = new_geo.size() != self.size()
+        if size_changed:
             self.setGeometry(new_geo)
-            
-            # 2. ЖЕСТКАЯ ПЕРЕРИСОВКА МАСКИ
-            # Как ты и просил: "удаляем и рисуем заново".
-            # Мы не ждем resizeEvent, мы делаем это прямо здесь и сейчас.
+            # ЖЕСТКАЯ ПЕРЕРИСОВКА МАСКИ: не ждем resizeEvent.
+            # Важно: создаем регион по НОВЫМ размерам (w, h),
+            # так как self.rect() может еще не успеть обновиться в недрах Qt.
             if self.is_editing:
-                self.clearMask()
-                # Важно: создаем регион по НОВЫМ размерам (w, h),
-                # так как self.rect() может еще не успеть обновиться в недрах Qt.
-                mask_region = QRegion(0, 0, new_geo.width(), new_geo.height())
-                self.setMask(mask_region)
+                self.setMask(QRegion(0, 0, new_geo.width(), new_geo.height()))
+        else:
+            self.move(new_geo.topLeft())
 
-        self._notify_update()
-        event.accept()
+        if self._action != ACTION_NONE and not self.is_preview:
+            self.drag_frame.emit(self.cfg.get("id"), self._win_start_geo, new_geo)
+
+        now = time.monotonic()
+        if now - self._last_preview >= PREVIEW_INTERVAL_S:
+            self._last_preview = now
+            self._emit_preview()
+
+    def _snap_geometry(self, geo):
+        """Притягивает края к соседям и экрану; при ресайзе двигается только тянущийся край."""
+        if self._action == ACTION_MOVE:
+            x_edges = y_edges = MOVE_EDGES
+        else:
+            area = self._resize_area
+            x_edges = (EDGE_MIN,) if area in LEFT_AREAS else (EDGE_MAX,) if area in RIGHT_AREAS else ()
+            y_edges = (EDGE_MIN,) if area in TOP_AREAS else (EDGE_MAX,) if area in BOTTOM_AREAS else ()
+
+        rect = (geo.x(), geo.y(), geo.x() + geo.width(), geo.y() + geo.height())
+        l, t, r, b = self.snap_handler(self.cfg.get("id"), rect, x_edges, y_edges)
+        if r - l < self.min_size or b - t < self.min_size: return geo
+        return QRect(l, t, r - l, b - t)
+
+    def _emit_preview(self):
+        if self.is_preview: return
+        geo = self.geometry()
+        self.geometry_preview.emit(self.cfg.get("id"), {
+            "x": geo.x(), "y": geo.y(), "width": geo.width(), "height": geo.height()
+        })
 
     def mouseReleaseEvent(self, event):
         if self._action != ACTION_NONE:
+            # Догоняем последнюю позицию, не дожидаясь следующего кадра
+            self._frame_timer.stop()
+            self._apply_pending_geometry()
+
             self._action = ACTION_NONE
             self._resize_area = AREA_CENTER
             
             self.releaseMouse()
             
             self._update_cursor(self._hit_test(event.globalPos()))
+            # В конфиг (и на диск) — только один раз, по отпусканию мыши
             self._notify_update()
             event.accept()
 
@@ -320,6 +486,11 @@ class BaseDesktopWidget(QWidget):
         self.setCursor(cursors.get(area, Qt.ArrowCursor))
 
     def paintEvent(self, event):
+        with span("paintEvent", "paint", {"widget": self.wid_log_id, "type": self.cfg.get("type")}):
+            self._paint(event)
+
+    def _paint(self, event):
+        started = time.perf_counter() if PAINT_STATS.active else None
         painter = QPainter(self)
         try:
             r = self.rect()
@@ -333,11 +504,26 @@ class BaseDesktopWidget(QWidget):
                 painter.fillRect(r, QColor(0, 0, 0, 1)) 
                 self._draw_edit_handles(painter)
                 
-            self.draw_widget(painter)
+            with span("draw_widget", "paint", {"widget": self.wid_log_id}):
+                self.draw_widget(painter)
+            if PAINT_STATS.overlay and not self.is_preview:
+                self._draw_perf_overlay(painter)
         except Exception as e:
             print(f"Paint Error: {e}")
         finally:
             painter.end()
+            if started is not None and not self.is_preview:
+                PAINT_STATS.record(self.cfg.get("id", ""), started, time.perf_counter())
+
+    def _draw_perf_overlay(self, painter: QPainter):
+        # Время текущего кадра еще не известно — показываем прошлый
+        wid = self.cfg.get("id", "")
+        text = f"{PAINT_STATS.fps(wid):.1f} fps | {PAINT_STATS.last_ms(wid):.2f} ms"
+        rect = QRect(2, 2, 150, 16)
+        painter.fillRect(rect, QColor(0, 0, 0, 160))
+        painter.setFont(QFont("Consolas", 8))
+        painter.setPen(QColor("#FFCC00"))
+        painter.drawText(rect.adjusted(4, 0, 0, 0), Qt.AlignVCenter | Qt.AlignLeft, text)
 
     def _draw_edit_handles(self, painter: QPainter):
         rect = self.rect()
@@ -18,6 +18,8 @@ from PySide6.QtGui import (
 )
 from PySide6.QtCore import Qt, QTimer, QRectF, QStandardPaths
 
+from core.config_diff import touches
+from core.tracing import traced
 from widgets.base_widget import BaseDesktopWidget
 
 # --- ХЕЛПЕР ДЛЯ ЧТЕНИЯ МЕТАДАННЫХ ДО СОЗДАНИЯ ---
@@ -62,14 +64,21 @@ class BuilderWidget(BaseDesktopWidget):
         
         if self._has_dynamic_elements() and not self.is_preview:
             self.timer = QTimer(self)
-            self.timer.timeout.connect(self.update)
+            self.timer.timeout.connect(self._tick)
             self.timer.start(1000)
 
-    def update_config(self, new_cfg):
-        super().update_config(new_cfg)
-        self._load_source()
+    def update_config(self, new_cfg, changed=None):
+        super().update_config(new_cfg, changed)
+        # Распаковка .wgt дорогая — только если сменился сам источник
+        if touches(changed, "content.file_path"):
+            self._load_source()
+        self.update()
+
+    @traced("builder.tick", "timer")
+    def _tick(self):
         self.update()
 
+    @traced("wgt.load", "io")
     def _load_source(self):
         content = self.cfg.get("content", {})
         source_path = content.get("file_path", "")
@@ -256,15 +265,15 @@ class BuilderWidget(BaseDesktopWidget):
 
 # === UI НАСТРОЕК (Только отображение пути) ===
 def render_qt_settings(layout, cfg, on_update):
-    content = cfg.get("content", {})
-    
     gb = QGroupBox("Источник")
     l = QVBoxLayout(gb)
     
-    path_lbl = QLabel(content.get("file_path", "Нет файла"))
+    path_lbl = QLabel()
     path_lbl.setWordWrap(True)
     path_lbl.setStyleSheet("color: #44AAFF; font-weight: bold;")
     l.addWidget(path_lbl)
+    # Панель общая для всех виджетов этого типа — подпись берем из привязанного конфига
+    on_update.on_load(lambda c: path_lbl.setText(c.get("content", {}).get("file_path") or "Нет файла"))
     
     # Кнопку "Сменить файл" можно оставить, но лучше пусть удаляют и создают заново
     btn = QPushButton("Сменить файл...")
@@ -287,6 +296,7 @@ def get_default_config():
         "width": 300,
         "height": 200,
         "opacity": 1.0,
+        "always_on_top": True,
         "content": {"file_path": ""}
     }
 
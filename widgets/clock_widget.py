@@ -1,6 +1,8 @@
 # ChronoDash - Base Widget
 # Copyright (C) 2025 Overl1te
 
+from core.config_diff import touches, CONTENT_KEY
+from core.tracing import traced
 from widgets.base_widget import BaseDesktopWidget
 from PySide6.QtGui import QPainter, QFont, QColor
 from PySide6.QtCore import QDateTime, QTimer, Qt
@@ -13,6 +15,7 @@ class ClockWidget(BaseDesktopWidget):
         if not self.is_preview:
             self._start_clock()
 
+    @traced("clock.tick", "timer")
     def _start_clock(self):
         self.update()
         interval = 100 if ".z" in self.format else 1000
@@ -28,9 +31,10 @@ class ClockWidget(BaseDesktopWidget):
         self.color = QColor(col_str)
         if not self.color.isValid(): self.color = QColor("#00FF88")
 
-    def update_config(self, new_cfg):
-        super().update_config(new_cfg)
-        self._apply_content_settings()
+    def update_config(self, new_cfg, changed=None):
+        super().update_config(new_cfg, changed)
+        if touches(changed, CONTENT_KEY):
+            self._apply_content_settings()
         self.update()
 
     def draw_widget(self, painter: QPainter):
@@ -63,41 +67,32 @@ def get_default_config():
 
 # === НОВЫЙ UI НАСТРОЕК (Qt) ===
 def render_qt_settings(layout, cfg, on_update):
-    content = cfg.get("content", {})
-
+    # on_update — ConfigBinder: панель строится один раз на тип и перепривязывается к выбранному виджету
     # Формат
     layout.addWidget(QLabel("Формат времени (Python strftime):"))
-    fmt_edit = QLineEdit(content.get("format", "HH:mm:ss"))
-    fmt_edit.textChanged.connect(lambda v: on_update("content.format", v))
-    layout.addWidget(fmt_edit)
+    layout.addWidget(on_update.bind(QLineEdit(), "content.format", "HH:mm:ss"))
 
     # Размер шрифта
     layout.addWidget(QLabel("Размер шрифта:"))
     sz_spin = QSpinBox()
     sz_spin.setRange(8, 500)
-    sz_spin.setValue(int(content.get("font_size", 64)))
-    sz_spin.valueChanged.connect(lambda v: on_update("content.font_size", v))
-    layout.addWidget(sz_spin)
+    layout.addWidget(on_update.bind(sz_spin, "content.font_size", 64))
 
     # Цвет
     layout.addWidget(QLabel("Цвет текста:"))
-    color_val = content.get("color", "#00FF88")
     
     col_layout = QHBoxLayout()
-    col_edit = QLineEdit(color_val)
+    col_edit = QLineEdit()
     col_btn = QPushButton("Выбрать")
-    col_btn.setStyleSheet(f"background-color: {color_val}; color: black;")
     
     def pick_color():
-        c = QColorDialog.getColor(QColor(color_val))
+        c = QColorDialog.getColor(QColor(col_edit.text()))
         if c.isValid():
-            hex_c = c.name().upper()
-            col_edit.setText(hex_c)
-            col_btn.setStyleSheet(f"background-color: {hex_c}")
-            on_update("content.color", hex_c)
+            col_edit.setText(c.name().upper())
 
     col_btn.clicked.connect(pick_color)
-    col_edit.textChanged.connect(lambda v: on_update("content.color", v))
+    col_edit.textChanged.connect(lambda v: col_btn.setStyleSheet(f"background-color: {v}; color: black;"))
+    on_update.bind(col_edit, "content.color", "#00FF88")
     
     col_layout.addWidget(col_edit)
     col_layout.addWidget(col_btn)
@@ -105,8 +100,6 @@ def render_qt_settings(layout, cfg, on_update):
 
     # Шрифт
     layout.addWidget(QLabel("Семейство шрифта:"))
-    font_edit = QLineEdit(content.get("font_family", "Segoe UI"))
-    font_edit.textChanged.connect(lambda v: on_update("content.font_family", v))
-    layout.addWidget(font_edit)
+    layout.addWidget(on_update.bind(QLineEdit(), "content.font_family", "Segoe UI"))
 
 WidgetClass = ClockWidget
\ No newline at end of file
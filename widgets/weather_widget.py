@@ -1,27 +1,50 @@
 # ChronoDash - Base Widget
 # Copyright (C) 2025 Overl1te
 
-import threading
 import requests
 import json
+import time
 from pathlib import Path
 
-from PySide6.QtGui import QPainter, QFont, QColor, QPixmap
-from PySide6.QtCore import Qt, QTimer, QDateTime, QByteArray, QStandardPaths
+import numpy as np
+from PySide6.QtGui import QPainter, QPainterPath, QFont, QColor, QPixmap, QPen
+from PySide6.QtCore import Qt, QTimer, QDateTime, QByteArray, QStandardPaths, QRectF, QStringListModel
 from PySide6.QtWidgets import (
     QWidget, QVBoxLayout, QHBoxLayout, QLabel, QLineEdit, 
-    QPushButton, QSpinBox, QCheckBox
+    QPushButton, QSpinBox, QCheckBox, QCompleter
 )
 
 from widgets.base_widget import BaseDesktopWidget
+from core.io_service import get_io_service
+from core.geocoding import get_geocoding_service, normalize_query
+from core.ip_location import get_ip_location_resolver
+from core.refresh_policy import RefreshPolicy
+from core.config_diff import touches, CONTENT_KEY
+from core.session_state import is_user_away
+from core.tracing import traced
+from core.forecast import (
+    ForecastModel, build_request_params, decimate_minmax,
+    MAX_FORECAST_DAYS, RESOLUTION_HOURLY, RESOLUTION_15MIN
+)
 
 # FIX: Добавляем User-Agent, чтобы API не разрывал соединение
 HEADERS = {"User-Agent": "ChronoDash/2.1 (github.com/Overl1te/ChronoDash)"}
 
 OPENMETEO_URL = "https://api.open-meteo.com/v1/forecast"
-NOMINATIM_SEARCH_URL = "https://nominatim.openstreetmap.org/search"
 ICONIFY_URL = "https://api.iconify.design"
 
+# Сетевой поиск города — после паузы в наборе и от N символов
+SEARCH_DEBOUNCE_MS = 600
+SEARCH_MIN_CHARS = 3
+
+DISPLAY_TEXT = "text"
+DISPLAY_CHART = "chart"
+
+# Нет ввода дольше этого — считаем, что пользователь отошел, и не обновляемся
+IDLE_THRESHOLD_S = 10 * 60
+# Как часто перепроверять, вернулся ли пользователь (без сетевых запросов)
+AWAY_RECHECK_S = 5 * 60
+
 class WeatherWidget(BaseDesktopWidget):
     def __init__(self, cfg=None, is_preview=False):
         super().__init__(cfg, is_preview=is_preview)
@@ -35,6 +58,16 @@ class WeatherWidget(BaseDesktopWidget):
         self.hourly_data = []
         self.daily_data = []
         self.error_message = None
+        self._weather_task = None
+        self._location_resolved = False
+        # Таймер сработал, пока виджет был скрыт — обновиться при первом показе
+        self._refresh_on_show = False
+        self.forecast = None
+        self._hourly_index = -1
+        # (ключ, путь температуры, столбики осадков) — пересобирается при новых данных или ресайзе
+        self._chart_cache = None
+        # Уже отрисованный график: сглаженный штрих дорогой, рисуем его один раз
+        self._chart_pixmap = None
 
         std_path = Path(QStandardPaths.writableLocation(QStandardPaths.AppConfigLocation))
         config_dir = Path(self.cfg.get("config_dir", std_path))
@@ -44,20 +77,47 @@ class WeatherWidget(BaseDesktopWidget):
         self.location_cache_file = config_dir / "weather_location_cache.json"
         self.icon_cache = {}
         self.location_cache = {}
+        self._icon_requests = set()
 
         self._load_disk_caches()
         self._apply_content_settings()
+        self.refresh_policy = RefreshPolicy(self.interval * 60)
 
         if not self.is_preview:
-            # Задержка перед первой загрузкой, чтобы UI успел отрисоваться
-            QTimer.singleShot(500, lambda: threading.Thread(target=self._load_weather_data_blocking, daemon=True).start())
             self._start_update_timer()
 
-    def update_config(self, new_cfg: dict):
-        self.cfg = new_cfg.copy()
+    def update_config(self, new_cfg: dict, changed=None):
+        old_source = self._source_key()
+        super().update_config(new_cfg, changed)
+        if not touches(changed, CONTENT_KEY):
+            return
         self._apply_content_settings()
+        self.refresh_policy.interval_s = self.interval * 60
+        if not self.is_preview and old_source != self._source_key():
+            # Сменился город или единицы — старые данные больше не актуальны,
+            # а ответ на уже отправленный запрос применять нельзя
+            if self._weather_task is not None:
+                self._weather_task.cancel()
+                self._weather_task = None
+            self.refresh_policy.last_success = None
+            self._location_resolved = False
+            self._schedule_refresh(0)
         self.update()
 
+    def _source_key(self):
+        """Параметры, при смене которых прогноз надо перезапросить."""
+        return (self.lat, self.lon, self.auto_location, self.units, self.forecast_days, self.resolution)
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        # showEvent может прийти еще из BaseDesktopWidget.__init__
+        if self.is_preview or not hasattr(self, "timer"): return
+        # Пропустили обновление, пока были скрыты, или данные устарели — обновляем сразу
+        if self._weather_task is not None: return
+        if self._refresh_on_show or self.refresh_policy.is_stale():
+            if not self.timer.isActive() or self.timer.remainingTime() > 1000:
+                self._schedule_refresh(0)
+
     def _load_disk_caches(self):
         # Загрузка кэша (упрощена, чтобы не дублировать код, оставь как было или используй этот)
         if self.icon_cache_file.exists():
@@ -80,78 +140,184 @@ class WeatherWidget(BaseDesktopWidget):
         c = self.cfg.get("content", {})
         self.lat = float(c.get("latitude", 55.75))
         self.lon = float(c.get("longitude", 37.61))
+        # Без явно выбранного города — определяем местоположение по IP
+        self.auto_location = bool(c.get("auto_location", "latitude" not in c))
         self.units = c.get("temp_unit", "celsius")
         self.interval = max(5, int(c.get("update_interval_min", 15)))
         self.show_details = c.get("show_details", True)
         self.compact_mode = c.get("compact_mode", False)
+        self.forecast_days = max(1, min(MAX_FORECAST_DAYS, int(c.get("forecast_days", 3))))
+        self.resolution = RESOLUTION_15MIN if c.get("resolution") == RESOLUTION_15MIN else RESOLUTION_HOURLY
+        self.display_mode = DISPLAY_CHART if c.get("display_mode") == DISPLAY_CHART else DISPLAY_TEXT
 
     def _start_update_timer(self):
+        # Одноразовый таймер: следующую задержку каждый раз считает RefreshPolicy
         self.timer = QTimer(self)
-        self.timer.timeout.connect(lambda: threading.Thread(target=self._load_weather_data_blocking, daemon=True).start())
-        self.timer.start(self.interval * 60 * 1000)
-
-    def _load_weather_data_blocking(self):
-        params = {
-            "latitude": self.lat, "longitude": self.lon,
-            "current": "temperature_2m,apparent_temperature,weather_code",
-            "hourly": "temperature_2m,weather_code",
-            "daily": "temperature_2m_max,temperature_2m_min,sunrise,sunset",
-            "timezone": "auto",
-            "forecast_days": 3,
-            "temperature_unit": self.units,
-        }
-        
-        try:
-            # FIX: Добавил headers и увеличил timeout
-            response = requests.get(OPENMETEO_URL, params=params, headers=HEADERS, timeout=15)
-            response.raise_for_status()
-            data = response.json()
-
-            curr = data.get("current", {})
-            t = curr.get("temperature_2m")
-            self.current_temp = f"{round(t)}°" if t is not None else "--"
-            
-            at = curr.get("apparent_temperature")
-            self.feels_like = f"Ощущается {round(at)}°" if at is not None else ""
-            
-            self.current_weather_code = curr.get("weather_code", 0)
-            self.condition = self._get_condition_name(self.current_weather_code)
-            self.location_str = f"Lat: {self.lat:.2f}, Lon: {self.lon:.2f}"
-
-            # Hourly
-            hourly = data.get("hourly", {})
-            times = hourly.get("time", [])
-            temps = hourly.get("temperature_2m", [])
-            now_idx = 0 
-            # (Упрощенный поиск индекса времени)
-            now_str = QDateTime.currentDateTime().toString("yyyy-MM-ddThh:00")
-            for i, val in enumerate(times):
-                if val >= now_str:
-                    now_idx = i
-                    break
-            
-            self.hourly_data = []
-            for i in range(now_idx, min(len(times), now_idx + 6)):
-                t_str = times[i][-5:]
-                self.hourly_data.append(f"{t_str} {round(temps[i])}°")
-
-            # Daily
-            daily = data.get("daily", {})
-            self.daily_data = []
-            for i in range(min(3, len(daily.get("time", [])))):
-                d_str = daily["time"][i][5:].replace("-", ".")
-                mn = round(daily["temperature_2m_min"][i])
-                mx = round(daily["temperature_2m_max"][i])
-                self.daily_data.append(f"{d_str}: {mn}°..{mx}°")
-
-            self.error_message = None
-
-        except Exception as e:
-            print(f"[Weather] Error: {e}")
-            self.error_message = "Ошибка связи"
-            self.current_temp = "?"
-        
-        QTimer.singleShot(0, self.update)
+        self.timer.setSingleShot(True)
+        self.timer.timeout.connect(self._on_refresh_timer)
+        # Задержка перед первой загрузкой, чтобы UI успел отрисоваться
+        self.timer.start(500)
+
+    def _schedule_refresh(self, delay_s):
+        if self.is_preview: return
+        self.timer.start(int(delay_s * 1000))
+
+    @traced("weather.refresh_timer", "timer")
+    def _on_refresh_timer(self):
+        # Скрытый виджет не обновляем и не будим: обновится в showEvent
+        if not self.isVisible():
+            self._refresh_on_show = True
+            return
+        self._refresh_on_show = False
+        if is_user_away(IDLE_THRESHOLD_S):
+            self._schedule_refresh(AWAY_RECHECK_S)
+            return
+        self._request_weather()
+
+    def _request_weather(self):
+        """Ставит загрузку погоды в общую очередь ввода-вывода."""
+        if self._weather_task is not None: return
+        if self.auto_location and not self._location_resolved:
+            get_ip_location_resolver().resolve(self._on_ip_location, owner=self)
+            return
+        self._submit_weather()
+
+    def _submit_weather(self):
+        params = build_request_params(self.lat, self.lon, self.units, self.forecast_days, self.resolution)
+        self._weather_task = get_io_service().submit(
+            _fetch_weather, params, self.resolution,
+            on_result=self._apply_weather, on_error=self._on_weather_error,
+            owner=self, tag=f"weather:{self.wid_log_id}"
+        )
+
+    def _on_ip_location(self, loc):
+        # Пока определяли местоположение, пользователь выбрал город вручную
+        if not self.auto_location: return
+        self.lat, self.lon = loc["lat"], loc["lon"]
+        # Запасные координаты показываем, но при следующем обновлении
+        # снова спрашиваем провайдеров
+        self._location_resolved = not loc.get("fallback")
+        if self._weather_task is None:
+            self._submit_weather()
+
+    def _apply_weather(self, model: ForecastModel):
+        """Применяет разобранный прогноз (вызывается в GUI-потоке)."""
+        curr = model.current
+        t = curr.get("temperature_2m")
+        at = curr.get("apparent_temperature")
+        self.current_temp = f"{round(t)}°" if t is not None else "--"
+        self.feels_like = f"Ощущается {round(at)}°" if at is not None else ""
+        self.current_weather_code = int(curr.get("weather_code") or 0)
+        self.condition = self._get_condition_name(self.current_weather_code)
+        self.location_str = f"Lat: {self.lat:.2f}, Lon: {self.lon:.2f}"
+        self.forecast = model
+        self._hourly_index = -1
+        self._chart_cache = None
+        self._chart_pixmap = None
+        self._refresh_hourly_labels()
+        self.daily_data = model.daily_labels(3)
+        self.error_message = None
+        self._weather_task = None
+        self.refresh_policy.record_success()
+        self._schedule_refresh(self.refresh_policy.next_delay())
+        self.update()
+
+    def _on_weather_error(self, error):
+        self._weather_task = None
+        self.refresh_policy.record_failure()
+        delay = self.refresh_policy.next_delay()
+        print(f"[Weather] Error: {error} (повтор через {delay:.0f} с)")
+        self.error_message = "Ошибка связи"
+        self.current_temp = "?"
+        self._schedule_refresh(delay)
+        self.update()
+
+    def _refresh_hourly_labels(self):
+        """Пересобирает подписи только когда текущий слот прогноза сменился."""
+        if self.forecast is None: return
+        idx = self.forecast.series.index_at(time.time())
+        if idx == self._hourly_index: return
+        self._hourly_index = idx
+        self.hourly_data = self.forecast.upcoming_labels(time.time(), 6)
+
+    def resizeEvent(self, event):
+        self._chart_cache = None
+        self._chart_pixmap = None
+        super().resizeEvent(event)
+
+    def _chart_paths(self, area: QRectF):
+        """
+        Путь графика температуры и прямоугольники осадков для области area.
+
+        Ряд от текущего слота до конца горизонта сжимается min/max-децимацией
+        до ширины области в пикселях, поэтому 16 дней по 15 минут стоят
+        столько же, сколько сутки. Результат кэшируется.
+        """
+        series = self.forecast.series
+        start = series.index_at(time.time())
+        key = (start, area.width(), area.height(), area.x(), area.y())
+        if self._chart_cache and self._chart_cache[0] == key:
+            return self._chart_cache[1], self._chart_cache[2]
+
+        temps = series.temperature[start:]
+        precip = series.precipitation[start:]
+        buckets = max(1, int(area.width()))
+        n = max(1, len(temps) - 1)
+
+        temp_path = QPainterPath()
+        idx, vals = decimate_minmax(temps, buckets)
+        if len(vals):
+            lo, hi = float(np.min(vals)), float(np.max(vals))
+            span = (hi - lo) or 1.0
+            xs = (area.left() + idx / n * area.width()).tolist()
+            ys = (area.bottom() - (vals - lo) / span * area.height()).tolist()
+            temp_path.moveTo(xs[0], ys[0])
+            for x, y in zip(xs[1:], ys[1:]):
+                temp_path.lineTo(x, y)
+
+        precip_bars = []
+        idx, vals = decimate_minmax(np.nan_to_num(precip), buckets)
+        if len(precip) > 2 * buckets:
+            # Для столбика достаточно максимума корзины (вторая точка пары)
+            idx, vals = idx[1::2], vals[1::2]
+        top = float(np.max(vals)) if len(vals) else 0.0
+        if top > 0:
+            # Столбики занимают нижнюю треть графика
+            bar_w = max(1.0, area.width() / max(1, len(vals)))
+            xs = (area.left() + idx / n * area.width()).tolist()
+            hs = (vals / top * area.height() / 3).tolist()
+            for x, h in zip(xs, hs):
+                if h > 0:
+                    precip_bars.append(QRectF(x, area.bottom() - h, bar_w, h))
+
+        self._chart_cache = (key, temp_path, precip_bars)
+        return temp_path, precip_bars
+
+    def _draw_chart(self, painter: QPainter, area: QRectF, col: QColor):
+        temp_path, precip_bars = self._chart_paths(area)
+        key = (self._chart_cache[0], col.rgba())
+        if self._chart_pixmap is None or self._chart_pixmap[0] != key:
+            # Запас по краям, чтобы штрих толщиной 2px не обрезался
+            canvas = area.adjusted(-2, -2, 2, 2)
+            dpr = self.devicePixelRatioF()
+            pix = QPixmap(int(canvas.width() * dpr) + 1, int(canvas.height() * dpr) + 1)
+            pix.setDevicePixelRatio(dpr)
+            pix.fill(Qt.transparent)
+            p = QPainter(pix)
+            p.translate(-canvas.left(), -canvas.top())
+            # Столбики выровнены по осям: drawRects без сглаживания заметно дешевле fillPath
+            p.setPen(Qt.NoPen)
+            p.setBrush(QColor(80, 160, 255, 140))
+            p.drawRects(precip_bars)
+            p.setRenderHint(QPainter.Antialiasing, True)
+            pen = QPen(col)
+            pen.setWidthF(2.0)
+            p.setPen(pen)
+            p.setBrush(Qt.NoBrush)
+            p.drawPath(temp_path)
+            p.end()
+            self._chart_pixmap = (key, pix, canvas.topLeft())
+        painter.drawPixmap(self._chart_pixmap[2], self._chart_pixmap[1])
 
     def _get_condition_name(self, code):
         codes = {0:"Ясно", 1:"Перем. облачность", 2:"Облачно", 3:"Пасмурно", 45:"Туман", 61:"Дождь", 71:"Снег", 95:"Гроза"}
@@ -164,22 +330,29 @@ class WeatherWidget(BaseDesktopWidget):
         
         if name in self.icon_cache: return self.icon_cache[name][1]
         
-        # Загрузка (в основном потоке, если нет кэша - плохо, но допустимо для редких случаев)
-        # Лучше вынести в тред, но для фикса оставим здесь с защитой
-        try:
-            c_hex = self.cfg.get("content", {}).get("color", "#FFFFFF").replace("#", "")
-            url = f"{ICONIFY_URL}/{name}.svg?height=100&color=%23{c_hex}"
-            r = requests.get(url, headers=HEADERS, timeout=2) # Короткий таймаут
-            if r.status_code == 200:
-                bs = QByteArray(r.content)
-                px = QPixmap()
-                if px.loadFromData(bs, "SVG"):
-                    self.icon_cache[name] = (bs, px)
-                    self._save_disk_caches()
-                    return px
-        except: pass
+        # Иконки нет в кэше — грузим в фоне, а пока рисуем без нее
+        if self.is_preview or name in self._icon_requests: return QPixmap()
+        self._icon_requests.add(name)
+        c_hex = self.cfg.get("content", {}).get("color", "#FFFFFF").replace("#", "")
+        url = f"{ICONIFY_URL}/{name}.svg?height=100&color=%23{c_hex}"
+        get_io_service().submit(
+            _fetch_bytes, url,
+            on_result=lambda data, n=name: self._on_icon_loaded(n, data),
+            on_error=lambda e, n=name: self._icon_requests.discard(n),
+            owner=self, tag=f"weather:{self.wid_log_id}"
+        )
         return QPixmap()
 
+    def _on_icon_loaded(self, name, data):
+        self._icon_requests.discard(name)
+        if not data: return
+        bs = QByteArray(data)
+        px = QPixmap()
+        if px.loadFromData(bs, "SVG"):
+            self.icon_cache[name] = (bs, px)
+            self._save_disk_caches()
+            self.update()
+
     def draw_widget(self, painter: QPainter):
         # Если данных нет вообще - не рисуем детали, чтобы не упасть
         if not self.location_str: 
@@ -209,7 +382,12 @@ class WeatherWidget(BaseDesktopWidget):
         painter.drawText(20, 100, f"{self.condition} {self.feels_like}")
         
         # Hourly
-        if self.hourly_data and self.show_details:
+        if self.display_mode == DISPLAY_CHART and self.forecast is not None and self.show_details:
+            area = QRectF(20, 115, max(1, rect.width() - 40), max(1, rect.height() - 135))
+            self._draw_chart(painter, area, col)
+        elif self.show_details:
+            self._refresh_hourly_labels()
+        if self.display_mode != DISPLAY_CHART and self.hourly_data and self.show_details:
             painter.setFont(QFont("Consolas", base_size - 14))
             line = "  ".join(self.hourly_data[:5])
             painter.drawText(20, 140, line)
@@ -225,13 +403,26 @@ class WeatherWidget(BaseDesktopWidget):
             painter.setFont(QFont(font_fam, 12))
             painter.drawText(rect.adjusted(0,0,-10,-10), Qt.AlignBottom | Qt.AlignRight, self.error_message)
 
+# ==============================================================================
+# ФОНОВЫЕ ЗАДАЧИ (выполняются в пуле IOService, виджет не трогают)
+# ==============================================================================
+def _fetch_bytes(url):
+    r = requests.get(url, headers=HEADERS, timeout=5)
+    return r.content if r.status_code == 200 else None
+
+def _fetch_weather(params, resolution):
+    """Загружает прогноз и раскладывает его в numpy-ряды."""
+    response = requests.get(OPENMETEO_URL, params=params, headers=HEADERS, timeout=15)
+    response.raise_for_status()
+    return ForecastModel(response.json(), resolution)
+
 # ==============================================================================
 # UI SETTINGS (Qt)
 # ==============================================================================
 def render_qt_settings(layout, cfg, on_update):
-    c = cfg.get("content", {})
-
-    # Поиск
+    # on_update — ConfigBinder: панель общая для всех погодных виджетов
+    # Поиск: подсказки из кэша мгновенно, сеть — после паузы в наборе.
+    # Сервис берем при каждом вызове: DevTools может сбросить его вместе с кэшем
     search_w = QWidget()
     sh = QHBoxLayout(search_w)
     sh.setContentsMargins(0,0,0,0)
@@ -239,30 +430,66 @@ def render_qt_settings(layout, cfg, on_update):
     sed.setPlaceholderText("Город")
     sbtn = QPushButton("Найти")
     sres = QLabel()
-    
+
+    places_by_name = {}
+    suggest_model = QStringListModel(sed)
+    completer = QCompleter(suggest_model, sed)
+    completer.setCompletionMode(QCompleter.UnfilteredPopupCompletion)
+    sed.setCompleter(completer)
+
+    def show_suggestions(places):
+        places_by_name.clear()
+        for p in places: places_by_name[p["name"]] = p
+        suggest_model.setStringList(list(places_by_name))
+        if places and sed.hasFocus(): completer.complete()
+
+    def apply(place):
+        on_update("content.latitude", place["lat"])
+        on_update("content.longitude", place["lon"])
+        on_update("content.auto_location", False)
+        cb_auto.setChecked(False)
+        sres.setText(f"OK: {place['name'][:15]}")
+
+    def apply_first(places):
+        if not places:
+            sres.setText("Не найдено")
+            return
+        show_suggestions(places)
+        apply(places[0])
+
+    debounce = QTimer(sed)
+    debounce.setSingleShot(True)
+    debounce.setInterval(SEARCH_DEBOUNCE_MS)
+    def if_current(query, fn):
+        # Ответ на текст, который пользователь уже исправил, не показываем
+        def wrapper(*args):
+            if normalize_query(sed.text()) == query: fn(*args)
+        return on_update.for_current(wrapper)
+
+    def search_suggestions():
+        q = normalize_query(sed.text())
+        get_geocoding_service().search(q, on_result=if_current(q, show_suggestions), owner=sres)
+    debounce.timeout.connect(search_suggestions)
+
+    def on_text_edited(text):
+        show_suggestions(get_geocoding_service().suggest(text))
+        if len(normalize_query(text)) >= SEARCH_MIN_CHARS: debounce.start()
+        else: debounce.stop()
+
     def do_search():
-        q = sed.text()
+        q = normalize_query(sed.text())
         if not q: return
+        debounce.stop()
         sres.setText("...")
-        def run():
-            try:
-                r = requests.get(f"{NOMINATIM_SEARCH_URL}?q={q}&format=json&limit=1", headers=HEADERS, timeout=5)
-                d = r.json()
-                if d:
-                    lat, lon = float(d[0]["lat"]), float(d[0]["lon"])
-                    QTimer.singleShot(0, lambda: apply(lat, lon, d[0]["display_name"][:15]))
-                else:
-                    QTimer.singleShot(0, lambda: sres.setText("Не найдено"))
-            except:
-                QTimer.singleShot(0, lambda: sres.setText("Ошибка"))
-        
-        def apply(lat, lon, name):
-            on_update("content.latitude", lat)
-            on_update("content.longitude", lon)
-            sres.setText(f"OK: {name}")
+        # Ответ, пришедший после переключения на другой виджет, не должен менять его координаты
+        get_geocoding_service().search(q, on_result=if_current(q, apply_first),
+                                       on_error=if_current(q, lambda e: sres.setText("Ошибка")), owner=sres)
 
-        threading.Thread(target=run, daemon=True).start()
+    def on_activated(name):
+        if name in places_by_name: apply(places_by_name[name])
 
+    sed.textEdited.connect(on_text_edited)
+    completer.activated[str].connect(on_activated)
     sbtn.clicked.connect(do_search)
     sh.addWidget(sed)
     sh.addWidget(sbtn)
@@ -270,18 +497,43 @@ def render_qt_settings(layout, cfg, on_update):
     layout.addWidget(QLabel("Поиск:"))
     layout.addWidget(search_w)
 
+    def reset_search(_cfg):
+        debounce.stop()
+        sed.clear()
+        sres.clear()
+        show_suggestions([])
+    on_update.on_load(reset_search)
+
+    cb_auto = QCheckBox("Определять местоположение по IP")
+    on_update.bind(cb_auto, "content.auto_location", lambda cfg: "latitude" not in cfg.get("content", {}))
+    layout.addWidget(cb_auto)
+
     # Цвет
     layout.addWidget(QLabel("Цвет (HEX):"))
-    ced = QLineEdit(c.get("color", "#FFFFFF"))
-    ced.textChanged.connect(lambda v: on_update("content.color", v))
-    layout.addWidget(ced)
+    layout.addWidget(on_update.bind(QLineEdit(), "content.color", "#FFFFFF"))
     
     # Размер
     layout.addWidget(QLabel("Размер:"))
     sbox = QSpinBox()
     sbox.setRange(10, 100)
-    sbox.setValue(int(c.get("font_size", 32)))
-    sbox.valueChanged.connect(lambda v: on_update("content.font_size", v))
-    layout.addWidget(sbox)
+    layout.addWidget(on_update.bind(sbox, "content.font_size", 32))
+
+    # Горизонт прогноза
+    layout.addWidget(QLabel("Дней прогноза:"))
+    days_box = QSpinBox()
+    days_box.setRange(1, MAX_FORECAST_DAYS)
+    layout.addWidget(on_update.bind(days_box, "content.forecast_days", 3))
+
+    cb_chart = QCheckBox("График вместо текста")
+    on_update.bind(cb_chart, "content.display_mode", DISPLAY_TEXT,
+                   to_editor=lambda v: v == DISPLAY_CHART,
+                   from_editor=lambda v: DISPLAY_CHART if v else DISPLAY_TEXT)
+    layout.addWidget(cb_chart)
+
+    cb_15 = QCheckBox("Шаг 15 минут")
+    on_update.bind(cb_15, "content.resolution", RESOLUTION_HOURLY,
+                   to_editor=lambda v: v == RESOLUTION_15MIN,
+                   from_editor=lambda v: RESOLUTION_15MIN if v else RESOLUTION_HOURLY)
+    layout.addWidget(cb_15)
 
 WidgetClass = WeatherWidget
\ No newline at end of file